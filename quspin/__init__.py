@@ -1,9 +1,8 @@
-# local modules
-import numpy,dill
-from . import operators
-from . import basis
-from . import tools
+# local modules, the subpackages are imported on first access.
+from ._lazy_import import _lazy_attributes
 
 __version__ = "0.2.8"
 __all__ = ["basis","operators","tools"]
 
+__getattr__,__dir__ = _lazy_attributes(__name__,{"basis":None,"operators":None,"tools":None})
+
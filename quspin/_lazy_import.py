@@ -0,0 +1,46 @@
+import importlib as _importlib
+import sys as _sys
+
+# module level lazy attribute loading (PEP 562) used by the `__init__` files of quspin.
+
+def _lazy_attributes(module_name,attrs):
+	"""Returns the `__getattr__` and `__dir__` functions of a lazily loaded module.
+
+	Parameters
+	-----------
+	module_name : str
+		`__name__` of the module the attributes are loaded for.
+	attrs : dict
+		Maps the public attribute names to the module (relative to `module_name`) defining them. Names
+		mapped to `None` are submodules of `module_name`.
+
+	Notes
+	-----
+	The attribute is imported on first access and then stored in the module, so that `__getattr__` is called
+	only once per name. Python versions without PEP 562 load all attributes immediately.
+
+	"""
+	module = _sys.modules[module_name]
+
+	def __getattr__(name):
+		try:
+			source = attrs[name]
+		except KeyError:
+			raise AttributeError("module {0!r} has no attribute {1!r}".format(module_name,name))
+
+		if source is None:
+			value = _importlib.import_module("."+name,module_name)
+		else:
+			value = getattr(_importlib.import_module(source,module_name),name)
+
+		setattr(module,name,value)
+		return value
+
+	def __dir__():
+		return sorted(set(vars(module)) | set(attrs))
+
+	if _sys.version_info < (3,7):
+		for name in attrs:
+			__getattr__(name)
+
+	return __getattr__,__dir__
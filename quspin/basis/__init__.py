@@ -61,11 +61,33 @@ functions
 
    coherent_state
    photon_Hspace_dim
+   set_basis_cache
 
 """
-from .basis_1d import *
-from .basis_general import *
-from .base import *
-from .lattice import *
-from .photon import *
-from .tensor import *
+# the basis classes are imported on first access, so that the compiled cores are loaded only for the 
+# families of basis which are used.
+from .._lazy_import import _lazy_attributes
+
+_attrs = {
+	"spin_basis_1d":".basis_1d",
+	"boson_basis_1d":".basis_1d",
+	"spinless_fermion_basis_1d":".basis_1d",
+	"spinful_fermion_basis_1d":".basis_1d",
+	"spin_basis_general":".basis_general",
+	"boson_basis_general":".basis_general",
+	"set_basis_cache":".basis_general",
+	"basis":".base",
+	"isbasis":".base",
+	"lattice_basis":".lattice",
+	"photon_basis":".photon",
+	"ho_basis":".photon",
+	"coherent_state":".photon",
+	"photon_Hspace_dim":".photon",
+	"tensor_basis":".tensor",
+	}
+
+__all__ = list(_attrs.keys())
+
+_attrs.update({"basis_1d":None,"basis_general":None})
+
+__getattr__,__dir__ = _lazy_attributes(__name__,_attrs)
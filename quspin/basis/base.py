@@ -78,6 +78,11 @@ class basis(object):
 	def _Op(self,opstr,indx,J,dtype):
 		raise NotImplementedError("basis class: {0} missing implementation of '_Op' required for calculating matrix elements!".format(self.__class__))	
 
+	def _Op_csr(self,terms,dtype):
+		# optional low-level construction of the csr_matrix for a list of terms [(opstr,indx,J),...],
+		# returns None if the basis class does not implement it.
+		return None
+
 	def inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=False,conjugated=False,v_out=None):
 		"""Calculates the action of an operator on a state.
 
@@ -153,23 +158,13 @@ class basis(object):
 		if conjugated:
 			ME = ME.conj()
 
-		# TODO: implement these in low level language.
 		if self._unique_me:
 			v_out[row] += _np.multiply(v_in[col].T,ME).T
 		else:
-			while len(row) > 0:
-				# if there are multiply matrix elements per row as there are for some
-				# symmetries availible then do the indexing for unique elements then
-				# delete them from the list and then repeat until all elements have been 
-				# taken care of. This is less memory efficient but works well for when
-				# there are a few number of matrix elements per row. 
-				row_unique,args = _np.unique(row,return_index=True)
-				col_unique = col[args]
-
-				v_out[row_unique] += _np.multiply(v_in[col_unique].T,ME[args]).T
-				row = _np.delete(row,args)
-				col = _np.delete(col,args)
-				ME = _np.delete(ME,args)
+			# if there are multiple matrix elements per row, as there are for some of the 
+			# symmetries availible, the duplicates are summed up by the sparse matrix product.
+			op = _sp.csr_matrix((ME,(row,col)),shape=(self.Ns,self.Ns))
+			v_out += op.dot(v_in)
 
 		return v_out			
 
@@ -400,6 +395,11 @@ class basis(object):
 	def check_hermitian(self,static,dynamic):
 		"""Checks operator string lists for hermiticity of the combined operator.
 
+		Notes
+		-----
+		The check never waits for user input: if it fails, a `UserWarning` names the offending operator 
+		strings and the `TypeError` raised lists (up to `MAXPRINT`) offending couplings.
+
 		Parameters
 		-----------
 		static: list
@@ -414,48 +414,34 @@ class basis(object):
 		static_list,dynamic_list = self._get_local_lists(static,dynamic)
 		static_expand,static_expand_hc,dynamic_expand,dynamic_expand_hc = self._get_hc_local_lists(static_list,dynamic_list)
 		# calculate non-hermitian elements
-		diff = set( tuple(static_expand) ) - set( tuple(static_expand_hc) )
-		
+		diff = set(static_expand) - set(static_expand_hc)
 		if diff:
-			unique_opstrs = list(set( next(iter(zip(*tuple(diff))))) )
-			warnings.warn("The following static operator strings contain non-hermitian couplings: {}".format(unique_opstrs),UserWarning,stacklevel=3)
-			try:
-				user_input = raw_input("Display all {} non-hermitian couplings? (y or n) ".format(len(diff)) )
-			except NameError:
-				user_input = input("Display all {} non-hermitian couplings? (y or n) ".format(len(diff)) )
-
-			if user_input == 'y':
-				print("   (opstr, indices, coupling)")
-				for i in range(len(diff)):
-					print("{}. {}".format(i+1, list(diff)[i]))
-			raise TypeError("Hamiltonian not hermitian! To turn this check off set check_herm=False in hamiltonian.")
-			
+			odd_ops = _unique_ops(op for op in static_expand if op in diff)
+			warnings.warn("The following static operator strings contain non-hermitian couplings: {}".format(_unique_opstrs(odd_ops)),UserWarning,stacklevel=3)
+			raise TypeError("Hamiltonian not hermitian! To turn this check off set check_herm=False in hamiltonian.\n"+
+				_format_ops(odd_ops," non-hermitian couplings:"))
 			
 		# define arbitrarily complicated weird-ass number
 		t = _np.cos( (_np.pi/_np.exp(0))**( 1.0/_np.euler_gamma ) )
 
-
 		# calculate non-hermitian elements
-		diff = set( tuple(dynamic_expand) ) - set( tuple(dynamic_expand_hc) )
+		diff = set(dynamic_expand) - set(dynamic_expand_hc)
 		if diff:
-			unique_opstrs = list(set( next(iter(zip(*tuple(diff))))) )
-			warnings.warn("The following dynamic operator strings contain non-hermitian couplings: {}".format(unique_opstrs),UserWarning,stacklevel=3)
-			try:
-				user_input = raw_input("Display all {} non-hermitian couplings at time t = {}? (y or n) ".format( len(diff), _np.round(t,5)))
-			except NameError:
-				user_input = input("Display all {} non-hermitian couplings at time t = {}? (y or n) ".format( len(diff), _np.round(t,5)))
-
-			if user_input == 'y':
-				print("   (opstr, indices, coupling(t))")
-				for i in range(len(diff)):
-					print("{}. {}".format(i+1, list(diff)[i]))
-			raise TypeError("Hamiltonian not hermitian! To turn this check off set check_herm=False in hamiltonian.")
+			odd_ops = _unique_ops(op for op in dynamic_expand if op in diff)
+			warnings.warn("The following dynamic operator strings contain non-hermitian couplings: {}".format(_unique_opstrs(odd_ops)),UserWarning,stacklevel=3)
+			raise TypeError("Hamiltonian not hermitian! To turn this check off set check_herm=False in hamiltonian.\n"+
+				_format_ops(odd_ops," non-hermitian couplings at time t = {}:".format(_np.round(t,5)),coupling="coupling(t)"))
 
 		print("Hermiticity check passed!")
 
 	def check_symm(self,static,dynamic):
 		"""Checks operator string lists for the required symmetries of the combined operator.
 
+		Notes
+		-----
+		The check never waits for user input: if it fails, a `UserWarning` names the offending operator 
+		strings and the `TypeError` raised lists (up to `MAXPRINT`) missing and odd couplings.
+
 		Parameters
 		-----------
 		static: list
@@ -473,116 +459,41 @@ class basis(object):
 
 		static_blocks,dynamic_blocks = self._check_symm(static,dynamic)
 
-		# define arbitrarily complicated weird-ass number
-		t = _np.cos( (_np.pi/_np.exp(0))**( 1.0/_np.euler_gamma ) )
+		for kind,blocks in [("static",static_blocks),("dynamic",dynamic_blocks)]:
+			for symm,block in blocks.items():
+				if len(block) == 2:
+					odd_ops,missing_ops = block
+				elif len(block) == 1:
+					odd_ops,(missing_ops,) = (),block
+				else:
+					continue
 
-		for symm in static_blocks.keys():
-			if len(static_blocks[symm]) == 2:
-				odd_ops,missing_ops = static_blocks[symm]
-				ops = list(missing_ops)
-				ops.extend(odd_ops)
-				unique_opstrs = list(set( next(iter(zip(*tuple(ops))))) )
-				if unique_opstrs:
-					unique_missing_ops = []
-					unique_odd_ops = []
-					[ unique_missing_ops.append(ele) for ele in missing_ops if ele not in unique_missing_ops]
-					[ unique_odd_ops.append(ele) for ele in odd_ops if ele not in unique_odd_ops]
-					warnings.warn("The following static operator strings do not obey {0}: {1}".format(symm,unique_opstrs),UserWarning,stacklevel=4)
-					try:
-						user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops) + len(unique_odd_ops)) )
-					except NameError:
-						user_input = input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops) + len(unique_odd_ops)) )
-					if user_input == 'y':
-						print(" these operators are needed for {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_missing_ops):
-							print("{0}. {1}".format(i+1, op))
-						print(" ")
-						print(" these do not obey the {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_odd_ops):
-							print("{0}. {1}".format(i+1, op))
-					raise TypeError("Hamiltonian does not obey {0}! To turn off check, use check_symm=False in hamiltonian.".format(symm))
-
-
-			elif len(static_blocks[symm]) == 1:
-				missing_ops, = static_blocks[symm]
-				unique_opstrs = list(set( next(iter(zip(*tuple(missing_ops))))) )
-				if unique_opstrs:
-					unique_missing_ops = []
-					[ unique_missing_ops.append(ele) for ele in missing_ops if ele not in unique_missing_ops]
-					warnings.warn("The following static operator strings do not obey {0}: {1}".format(symm,unique_opstrs),UserWarning,stacklevel=4)
-					try:
-						user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops)) )
-					except NameError:
-						user_input = input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops)) )
-
-					if user_input == 'y':
-						print(" these operators are needed for {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_missing_ops):
-							print("{0}. {1}".format(i+1, op))
-					raise TypeError("Hamiltonian does not obey {0}! To turn off check, use check_symm=False in hamiltonian.".format(symm))
-			else:
-				continue
-
-
-		for symm in dynamic_blocks.keys():
-			if len(dynamic_blocks[symm]) == 2:
-				odd_ops,missing_ops = dynamic_blocks[symm]
-				ops = list(missing_ops)
-				ops.extend(odd_ops)
-				unique_opstrs = list(set( next(iter(zip(*tuple(ops))))) )
-				if unique_opstrs:
-					unique_missing_ops = []
-					unique_odd_ops = []
-					[ unique_missing_ops.append(ele) for ele in missing_ops if ele not in unique_missing_ops]
-					[ unique_odd_ops.append(ele) for ele in odd_ops if ele not in unique_odd_ops]
-					warnings.warn("The following dynamic operator strings do not obey {0}: {1}".format(symm,unique_opstrs),UserWarning,stacklevel=4)
-					try:
-						user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops) + len(unique_odd_ops)) )
-					except NameError:
-						user_input = input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops) + len(unique_odd_ops)) )
-
-					if user_input == 'y':
-						print(" these operators are missing for {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_missing_ops):
-							print("{0}. {1}".format(i+1, op))
-						print(" ")
-						print(" these do not obey {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_odd_ops):
-							print("{0}. {1}".format(i+1, op))
-					raise TypeError("Hamiltonian does not obey {0}! To turn off check, use check_symm=False in hamiltonian.".format(symm))
-
-
-			elif len(dynamic_blocks[symm]) == 1:
-				missing_ops, = dynamic_blocks[symm]
-				unique_opstrs = list(set( next(iter(zip(*tuple(missing_ops))))) )
-				if unique_opstrs:
-					unique_missing_ops = []
-					[ unique_missing_ops.append(ele) for ele in missing_ops if ele not in unique_missing_ops]
-					warnings.warn("The following dynamic operator strings do not obey {0}: {1}".format(symm,unique_opstrs),UserWarning,stacklevel=4)
-					try:
-						user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops)) )
-					except NameError:
-						user_input = input("Display all {0} couplings? (y or n) ".format(len(unique_missing_ops)) )
-
-					if user_input == 'y':
-						print(" these operators are needed for {}:".format(symm))
-						print("   (opstr, indices, coupling)")
-						for i,op in enumerate(unique_missing_ops):
-							print("{0}. {1}".format(i+1, op))
-					raise TypeError("Hamiltonian does not obey {0}! To turn off check, use check_symm=False in hamiltonian.".format(symm))
-			else:
-				continue
+				missing_ops = _unique_ops(missing_ops)
+				odd_ops = _unique_ops(odd_ops)
+				if not (missing_ops or odd_ops):
+					continue
+
+				unique_opstrs = _unique_opstrs(missing_ops+odd_ops)
+				warnings.warn("The following {0} operator strings do not obey {1}: {2}".format(kind,symm,unique_opstrs),UserWarning,stacklevel=4)
+
+				msg = "Hamiltonian does not obey {0}! To turn off check, use check_symm=False in hamiltonian.".format(symm)
+				if missing_ops:
+					msg += "\n"+_format_ops(missing_ops," these operators are needed for {}:".format(symm))
+				if odd_ops:
+					msg += "\n"+_format_ops(odd_ops," these do not obey the {}:".format(symm))
+
+				raise TypeError(msg)
 
 		print("Symmetry checks passed!")
 
 	def check_pcon(self,static,dynamic):
 		"""Checks operator string lists for particle number (magnetisation) conservartion of the combined operator.
 
+		Notes
+		-----
+		The check never waits for user input: if it fails, a `UserWarning` names the offending operator 
+		strings and the `TypeError` raised lists (up to `MAXPRINT`) offending couplings.
+
 		Parameters
 		-----------
 		static: list
@@ -605,63 +516,23 @@ class basis(object):
 			static_list_exp,dynamic_list_exp = self._consolidate_local_lists(static_list_exp,dynamic_list_exp)
 			con = ""
 
-			odd_ops = []
-			for opstr,indx,J,ii in static_list_exp:	
-				p = opstr.count("+")
-				m = opstr.count("-")
-
-				if (p-m) != 0:
-					for i in ii:
-						if static_list[i] not in odd_ops:
-							odd_ops.append(static_list[i])
-
-
-	
-			if odd_ops:
-				unique_opstrs = list(set( next(iter(zip(*tuple(odd_ops))))) )
-				unique_odd_ops = []
-				[ unique_odd_ops.append(ele) for ele in odd_ops if ele not in unique_odd_ops]
-				warnings.warn("The following static operator strings do not conserve particle number{1}: {0}".format(unique_opstrs,con),UserWarning,stacklevel=4)
-				try:
-					user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(odd_ops)) )
-				except NameError:
-					user_input = input("Display all {0} couplings? (y or n) ".format(len(odd_ops)) )
-
-				if user_input == 'y':
-					print(" these operators do not conserve particle number{0}:".format(con))
-					print("   (opstr, indices, coupling)")
-					for i,op in enumerate(unique_odd_ops):
-						print("{0}. {1}".format(i+1, op))
-				raise TypeError("Hamiltonian does not conserve particle number{0} To turn off check, use check_pcon=False in hamiltonian.".format(con))
-
-			
+			# particle number change of each opstr, every opstr is counted once.
+			dN = {}
+			for kind,op_list,op_list_exp in [("static",static_list,static_list_exp),("dynamic",dynamic_list,dynamic_list_exp)]:
+				odd = set()
+				for op in op_list_exp:
+					opstr = op[0]
+					if opstr not in dN:
+						dN[opstr] = opstr.count("+") - opstr.count("-")
 
+					if dN[opstr] != 0:
+						odd.update(op[-1])
 
-			odd_ops = []
-			for opstr,indx,J,f,f_args,ii in dynamic_list_exp:	
-				p = opstr.count("+")
-				m = opstr.count("-")
-				if (p-m) != 0:
-					for i in ii:
-						if dynamic_list[i] not in odd_ops:
-							odd_ops.append(dynamic_list[i])
-
-	
-			if odd_ops:
-				unique_opstrs = list(set( next(iter(zip(*tuple(odd_ops))))))
-				unique_odd_ops = []
-				[ unique_odd_ops.append(ele) for ele in odd_ops if ele not in unique_odd_ops]
-				warnings.warn("The following static operator strings do not conserve particle number{1}: {0}".format(unique_opstrs,con),UserWarning,stacklevel=4)
-				try:
-					user_input = raw_input("Display all {0} couplings? (y or n) ".format(len(odd_ops)) )
-				except NameError:
-					user_input = input("Display all {0} couplings? (y or n) ".format(len(odd_ops)) )
-				if user_input == 'y':
-					print(" these operators do not conserve particle number{0}:".format(con))
-					print("   (opstr, indices, coupling)")
-					for i,op in enumerate(unique_odd_ops):
-						print("{0}. {1}".format(i+1, op))
-				raise TypeError("Hamiltonian does not conserve particle number{0} To turn off check, use check_pcon=False in hamiltonian.".format(con))
+				if odd:
+					odd_ops = _unique_ops(op_list[i] for i in sorted(odd))
+					warnings.warn("The following {2} operator strings do not conserve particle number{1}: {0}".format(_unique_opstrs(odd_ops),con,kind),UserWarning,stacklevel=4)
+					raise TypeError("Hamiltonian does not conserve particle number{0} To turn off check, use check_pcon=False in hamiltonian.\n".format(con)+
+						_format_ops(odd_ops," these operators do not conserve particle number{0}:".format(con)))
 
 			print("Particle conservation check passed!")
 
@@ -815,3 +686,46 @@ def isbasis(obj):
 	return isinstance(obj,basis)
 
 
+
+
+
+# helpers for the operator list checks: operators are tuples `(opstr,indx,J,...)` which are compared 
+# through hashable keys so that membership tests are set lookups instead of scans over the list.
+def _hashable(obj):
+	if isinstance(obj,(list,tuple)):
+		return tuple(_hashable(ele) for ele in obj)
+	elif isinstance(obj,_np.ndarray):
+		return (obj.dtype.str,obj.shape,obj.tobytes())
+	else:
+		try:
+			hash(obj)
+		except TypeError:
+			return id(obj)
+
+		return obj
+
+def _op_key(op):
+	return (str(op[0]),tuple(op[1]))+tuple(_hashable(ele) for ele in op[2:])
+
+def _op_set(operator_list):
+	return frozenset(_op_key(op) for op in operator_list)
+
+def _unique_ops(ops):
+	unique = {}
+	for op in ops:
+		unique.setdefault(_op_key(op),op)
+
+	return list(unique.values())
+
+def _unique_opstrs(ops):
+	return list(dict.fromkeys(str(op[0]) for op in ops))
+
+def _format_ops(ops,header,coupling="coupling",max_print=MAXPRINT):
+	lines = [header,"   (opstr, indices, {})".format(coupling)]
+	for i,op in enumerate(ops[:max_print]):
+		lines.append("{0}. {1}".format(i+1,op))
+
+	if len(ops) > max_print:
+		lines.append("   ... {0} more couplings not shown.".format(len(ops)-max_print))
+
+	return "\n".join(lines)
@@ -1,3 +1,2 @@
-from . import hcp_basis,hcp_ops
-from . import boson_basis,boson_ops
-from . import spf_basis,spf_ops
+# the compiled cores are imported from their own modules where they are used, such that each basis family only
+# requires (and loads) its own core.
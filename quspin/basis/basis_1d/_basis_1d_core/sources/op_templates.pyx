@@ -1401,6 +1401,26 @@ cdef int z_op_template(basis_type[:] op_pars,basis_type[:] ref_pars,int L,int zb
 
 
 
+# scatters the matrix elements of an operator (as returned by the templates above) into the columns of v_out.
+def inplace_op(index_type[:] row, index_type[:] col, matrix_type[:] ME, matrix_type[:,::1] v_in, 
+               matrix_type[:,::1] v_out, bool transposed):
+    cdef npy_intp N_op = ME.shape[0]
+    cdef npy_intp n_vec = v_in.shape[1]
+    cdef npy_intp i,k,r,c
+    cdef matrix_type me
+
+    with nogil:
+        for i in range(N_op):
+            me = ME[i]
+            if me != me or me == 0: # NaN marks matrix elements to states outside of the basis.
+                continue
 
+            if transposed:
+                r = col[i]
+                c = row[i]
+            else:
+                r = row[i]
+                c = col[i]
 
-
+            for k in range(n_vec):
+                v_out[r,k] += me * v_in[c,k]
@@ -34,6 +34,10 @@ ctypedef fused M2_type:
     NP_UINT16_t
     NP_UINT32_t
 
+ctypedef fused index_type:
+    NP_UINT32_t
+    NP_UINT64_t
+
 ctypedef fused matrix_type:
     float
     double
@@ -1,6 +1,7 @@
 from __future__ import print_function, division
 
 import warnings
+from ..base import _op_key,_op_set
 
 
 
@@ -26,6 +27,7 @@ def flip_sublat(opstr,indx,lat=0):
 
 def check_T(sort_opstr,operator_list,L,a):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 	for i in range(0,L//a,1):
 		for op in operator_list:
 			opstr = str(op[0])
@@ -38,7 +40,7 @@ def check_T(sort_opstr,operator_list,L,a):
 
 			new_op = sort_opstr(new_op)
 			
-			if not (new_op in operator_list):
+			if not (_op_key(new_op) in op_set):
 				missing_ops.append(new_op)
 
 	return missing_ops
@@ -48,6 +50,7 @@ def check_T(sort_opstr,operator_list,L,a):
 
 def check_Z(sort_opstr,operator_list):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 	odd_ops=[]
 	for op in operator_list:
 		opstr = str(op[0])
@@ -66,7 +69,7 @@ def check_Z(sort_opstr,operator_list):
 		new_op = list(op)
 		new_op[0] = new_op[0][:i].replace("+","#").replace("-","+").replace("#","-") + op[0][i:]
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return odd_ops,missing_ops
@@ -75,6 +78,7 @@ def check_Z(sort_opstr,operator_list):
 
 def check_P(sort_opstr,operator_list,L):
 	missing_ops = []
+	op_set = _op_set(operator_list)
 	for op in operator_list:
 		indx = list(op[1])
 		for j,ind in enumerate(indx):
@@ -83,7 +87,7 @@ def check_P(sort_opstr,operator_list,L):
 		new_op = list(op)
 		new_op[1] = indx
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return missing_ops
@@ -93,6 +97,7 @@ def check_P(sort_opstr,operator_list,L):
 
 def check_PZ(sort_opstr,operator_list,L):
 	missing_ops = []
+	op_set = _op_set(operator_list)
 	for op in operator_list:
 		opstr = str(op[0])
 		indx = list(op[1])
@@ -112,7 +117,7 @@ def check_PZ(sort_opstr,operator_list,L):
 		new_op[1] = indx
 		new_op[2] *= sign
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return missing_ops
@@ -124,6 +129,7 @@ def check_PZ(sort_opstr,operator_list,L):
 
 def check_ZA(sort_opstr,operator_list):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 	odd_ops=[]
 
 	for op in operator_list:
@@ -146,7 +152,7 @@ def check_ZA(sort_opstr,operator_list):
 		new_op = sort_opstr(new_op)
 		
 
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return odd_ops,missing_ops
@@ -155,6 +161,7 @@ def check_ZA(sort_opstr,operator_list):
 
 def check_ZB(sort_opstr,operator_list):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 	odd_ops=[]
 
 	for op in operator_list:
@@ -176,7 +183,7 @@ def check_ZB(sort_opstr,operator_list):
 		new_op[0] = new_opstr + opstr[i:]
 		new_op = sort_opstr(new_op)
 
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return odd_ops,missing_ops
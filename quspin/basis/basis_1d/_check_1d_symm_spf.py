@@ -1,6 +1,7 @@
 from __future__ import print_function, division
 
 import warnings
+from ..base import _op_key,_op_set
 
 
 
@@ -12,6 +13,7 @@ import warnings
 
 def check_T(sort_opstr,operator_list,L,a):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 	for i in range(0,L//a,1):
 		for op in operator_list:
 			opstr = str(op[0])
@@ -24,7 +26,7 @@ def check_T(sort_opstr,operator_list,L,a):
 
 			new_op = sort_opstr(new_op)
 			
-			if not (new_op in operator_list):
+			if not (_op_key(new_op) in op_set):
 				missing_ops.append(new_op)
 
 	return missing_ops
@@ -34,6 +36,7 @@ def check_T(sort_opstr,operator_list,L,a):
 
 def check_Z(sort_opstr,operator_list,photon):
 	missing_ops=[]
+	op_set = _op_set(operator_list)
 
 	for op in operator_list:
 		opstr = str(op[0])
@@ -55,7 +58,7 @@ def check_Z(sort_opstr,operator_list,photon):
 		new_op[0] = new_opstr
 		new_op[2] *= (-1)**(N_right*N_left)
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return missing_ops
@@ -64,6 +67,7 @@ def check_Z(sort_opstr,operator_list,photon):
 
 def check_P(sort_opstr,operator_list,L):
 	missing_ops = []
+	op_set = _op_set(operator_list)
 	for op in operator_list:
 		indx = list(op[1])
 		for j,ind in enumerate(indx):
@@ -72,7 +76,7 @@ def check_P(sort_opstr,operator_list,L):
 		new_op = list(op)
 		new_op[1] = indx
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return missing_ops
@@ -82,6 +86,7 @@ def check_P(sort_opstr,operator_list,L):
 
 def check_PZ(sort_opstr,operator_list,L,photon):
 	missing_ops = []
+	op_set = _op_set(operator_list)
 	for op in operator_list:
 		opstr = str(op[0])
 		indx = list(op[1])
@@ -102,7 +107,7 @@ def check_PZ(sort_opstr,operator_list,L,photon):
 		new_op[1] = indx
 		new_op[2] *= (-1)**(N_right*N_left)
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return missing_ops
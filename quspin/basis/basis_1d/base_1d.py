@@ -131,6 +131,7 @@ class basis_1d(lattice_basis):
 			raise ValueError("zA and zB symmetries incompatible with parity symmetry")
 
 		self._blocks_1d = blocks
+		self._inplace_op = ops_module.inplace_op
 		self._unique_me = True
 
 		if count_particles: 
@@ -519,8 +520,9 @@ class basis_1d(lattice_basis):
 		string += self.operators
 		return string 
 
-	def _Op(self,opstr,indx,J,dtype):
-
+	def _op_elements(self,opstr,indx,J,dtype):
+		# matrix elements of the operator for all states, including the ones which vanish or
+		# connect to states outside of the basis (marked with NaN).
 		indx = _np.asarray(indx,dtype=_np.int32)
 		
 		if len(opstr) != len(indx):
@@ -548,12 +550,71 @@ class basis_1d(lattice_basis):
 		error = self._op(row,col,ME,opstr,indx,J,*self._op_args,**self._blocks_1d)
 
 		if error != 0: raise OpstrError(_basis_op_errors[error])
+
+		return ME,row,col
+
+	def _Op(self,opstr,indx,J,dtype):
+
+		ME,row,col = self._op_elements(opstr,indx,J,dtype)
+
+		if self._Ns <= 0:
+			return ME,row,col
+
 		mask = _np.logical_not(_np.logical_or(_np.isnan(ME),_np.abs(ME)==0.0))
 		col = col[mask]
 		row = row[mask]
 		ME = ME[mask]
 
-		return ME,row,col		
+		return ME,row,col
+
+	def inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=False,conjugated=False,v_out=None):
+		# the matrix elements are calculated for all states by the low-level code and added to v_out by a
+		# compiled kernel. Unlike for `basis_general` this is not matrix-free: the matrix elements of the
+		# operator are stored while it is applied, which takes O(Ns) memory.
+		if v_in.__class__ not in [_np.ndarray, _np.matrix]:
+			v_in = _np.asanyarray(v_in)
+
+		if v_in.shape[0] != self.Ns:
+			raise ValueError("dimension mismatch")
+
+		if v_out is None:
+			result_dtype = _np.result_type(v_in.dtype,dtype)
+			v_out = _np.zeros_like(v_in,dtype=result_dtype)
+		else:
+			if v_out.__class__ not in [_np.ndarray, _np.matrix]:
+				v_out = _np.asanyarray(v_out)
+
+			if v_out.shape != v_in.shape:
+				raise ValueError("v_in.shape != v_out.shape")
+
+		if (v_out.dtype not in [_np.float32,_np.float64,_np.complex64,_np.complex128] or
+			_np.result_type(dtype,v_out.dtype) != v_out.dtype or self._basis_type not in [_np.uint32,_np.uint64]):
+			return lattice_basis.inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=transposed,
+												conjugated=conjugated,v_out=v_out)
+
+		ME,row,col = self._op_elements(opstr,indx,J,dtype)
+
+		if self._Ns <= 0 or v_in.size == 0:
+			return v_out
+
+		out = _np.asarray(v_out)
+		ME = ME.astype(out.dtype,copy=False)
+		if conjugated and _np.iscomplexobj(ME):
+			_np.conjugate(ME,out=ME)
+
+		if out.flags["C_CONTIGUOUS"]:
+			out_c = out.reshape((self._Ns,-1))
+		else:
+			out_c = _np.ascontiguousarray(out).reshape((self._Ns,-1))
+
+		v_in_c = _np.ascontiguousarray(v_in,dtype=out.dtype).reshape((self._Ns,-1))
+
+		self._inplace_op(row,col,ME,v_in_c,out_c,transposed)
+
+		if not out.flags["C_CONTIGUOUS"]:
+			out[...] = out_c.reshape(out.shape)
+
+		return v_out
 
 	def get_vec(self,v0,sparse=True):
 		"""Transforms state from symmetry-reduced basis to full (symmetry-free) basis.
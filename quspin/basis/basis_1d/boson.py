@@ -1,5 +1,3 @@
-from ._basis_1d_core import hcp_basis,hcp_ops
-from ._basis_1d_core import boson_basis,boson_ops
 from .base_1d import basis_1d
 import numpy as _np
 
@@ -209,6 +207,7 @@ class boson_basis_1d(basis_1d):
 								"\n\tn: number operator"+
 								"\n\tz: c-symm number operator")
 
+			from ._basis_1d_core import hcp_basis,hcp_ops
 			basis_1d.__init__(self,hcp_basis,hcp_ops,L,Np=Nb_list,pars=pars,count_particles=count_particles,**blocks)
 		else:
 			pars = (L,) + tuple(self._sps**i for i in range(L+1)) + (0,) # flag to turn off higher spin matrix elements for +/- operators
@@ -220,6 +219,7 @@ class boson_basis_1d(basis_1d):
 								"\n\tn: number operator"+
 								"\n\tz: ph-symm number operator")
 
+			from ._basis_1d_core import boson_basis,boson_ops
 			basis_1d.__init__(self,boson_basis,boson_ops,L,Np=Nb_list,pars=pars,count_particles=count_particles,**blocks)
 
 	def __type__(self):
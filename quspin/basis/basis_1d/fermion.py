@@ -1,4 +1,3 @@
-from ._basis_1d_core import hcp_basis,hcp_ops,spf_basis,spf_ops
 from . import _check_1d_symm_spf as _check
 from .base_1d import basis_1d
 from ..base import MAXPRINT
@@ -121,6 +120,7 @@ class spinless_fermion_basis_1d(basis_1d):
 							"\n\tz: c-symm number operator")
 
 		self._allowed_ops = set(["I","+","-","n","z"])
+		from ._basis_1d_core import hcp_basis,hcp_ops
 		basis_1d.__init__(self,hcp_basis,hcp_ops,L,Np=Nf_list,pars=pars,count_particles=count_particles,**blocks)
 		# self._check_symm=None
 
@@ -360,17 +360,18 @@ class spinful_fermion_basis_1d(spinless_fermion_basis_1d,basis_1d):
 							"\n\tz: c-symm number operator")
 
 		self._allowed_ops = set(["I","+","-","n","z"])
+		from ._basis_1d_core import spf_basis,spf_ops
 		basis_1d.__init__(self,spf_basis,spf_ops,L,Np=Nf_list,pars=pars,count_particles=count_particles,**blocks)
 		
 
-	def _Op(self,opstr,indx,J,dtype):
+	def _op_elements(self,opstr,indx,J,dtype):
 		
 		i = opstr.index("|")
 		indx = _np.array(indx,dtype=_np.int32)
 		indx[i:] += self.L
 		opstr=opstr.replace("|","")
 
-		return basis_1d._Op(self,opstr,indx,J,dtype)
+		return basis_1d._op_elements(self,opstr,indx,J,dtype)
 
 	def index(self,up_state,down_state):
 		"""Finds the index of user-defined Fock state in spinful fermion basis.
@@ -1,5 +1,3 @@
-from ._basis_1d_core import hcp_basis,hcp_ops
-from ._basis_1d_core import boson_basis,boson_ops
 from .base_1d import basis_1d
 import numpy as _np
 
@@ -189,6 +187,7 @@ class spin_basis_1d(basis_1d):
 								"\n\tz: z pauli/spin operator")
 
 			self._allowed_ops = set(["I","+","-","x","y","z"])
+			from ._basis_1d_core import hcp_basis,hcp_ops
 			basis_1d.__init__(self,hcp_basis,hcp_ops,L,Np=Nup_list,pars=pars,count_particles=count_particles,**blocks)
 		else:
 			self._pauli = False
@@ -200,12 +199,13 @@ class spin_basis_1d(basis_1d):
 								"\n\tz: z pauli/spin operator")
 
 			self._allowed_ops = set(["I","+","-","z"])
+			from ._basis_1d_core import boson_basis,boson_ops
 			basis_1d.__init__(self,boson_basis,boson_ops,L,Np=Nup_list,pars=pars,count_particles=count_particles,**blocks)
 
 
-	def _Op(self,opstr,indx,J,dtype):
-		ME,row,col = basis_1d._Op(self,opstr,indx,J,dtype)
-		if self._pauli:
+	def _op_elements(self,opstr,indx,J,dtype):
+		ME,row,col = basis_1d._op_elements(self,opstr,indx,J,dtype)
+		if self._pauli and self._Ns > 0:
 			n_ops = len(opstr.replace("I",""))
 			ME *= (1<<n_ops)
 
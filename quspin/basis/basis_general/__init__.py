@@ -1,6 +1,7 @@
 from .spin import spin_basis_general
 from .boson import boson_basis_general
-__all__=["spin_basis_general","boson_basis_general"]
+from .base_general import set_basis_cache
+__all__=["spin_basis_general","boson_basis_general","set_basis_cache"]
 # from .fermion import spinless_fermion_basis_general,spinful_fermion_basis_general
 # __all__=["spin_basis_general","boson_basis_general",
 #  			"spinless_fermion_basis_general","spinful_fermion_basis_general"]
\ No newline at end of file
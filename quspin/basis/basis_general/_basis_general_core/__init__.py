@@ -1,5 +1,2 @@
-from .hcb_core import hcb_basis_core_wrap_32,hcb_basis_core_wrap_64
-from .boson_core import boson_basis_core_wrap_32,boson_basis_core_wrap_64
-from .higher_spin_core import higher_spin_basis_core_wrap_32,higher_spin_basis_core_wrap_64
-# from .spinless_fermion_core import spinless_fermion_basis_core_wrap_32,spinless_fermion_basis_core_wrap_64
-# from .spinful_fermion_core import spinful_fermion_basis_core_wrap_32,spinful_fermion_basis_core_wrap_64
+# the compiled cores are imported from their own modules where they are used, such that each basis family only
+# requires (and loads) its own core.
@@ -73,22 +73,50 @@ cdef class hcb_basis_core_wrap_32(general_basis_core_wrap_32):
 		return Ns_2
 
 
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			Ns = self.make_basis_full[uint8_t](None,None)
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_full(self,uint32_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = (1ull<<self._N)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint32_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns = make_basis(self._basis_core,Ns,mem_MAX,&basis[0],&n[0])
+			Ns = make_basis(self._basis_core,Ns,mem_MAX,basis_ptr,n_ptr)
 
 		return Ns
 
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_pcon(self,int Np,uint32_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = comb(self._N,Np,exact=True)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint32_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
 		cdef uint32_t s  = sum(1<<i for i in range(Np))
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,&basis[0],&n[0])
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
 
 		return Ns
 
@@ -150,22 +178,225 @@ cdef class hcb_basis_core_wrap_64(general_basis_core_wrap_64):
 
 
 
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			Ns = self.make_basis_full[uint8_t](None,None)
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_full(self,uint64_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = (1ull<<self._N)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint64_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns = make_basis(self._basis_core,Ns,mem_MAX,&basis[0],&n[0])
+			Ns = make_basis(self._basis_core,Ns,mem_MAX,basis_ptr,n_ptr)
 
 		return Ns
 
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_pcon(self,int Np,uint64_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = comb(self._N,Np,exact=True)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint64_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
 		cdef uint64_t s = sum(1<<i for i in range(Np))
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,&basis[0],&n[0])
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
 
 		return Ns
 
+
+cdef class hcb_basis_core_wrap_128(general_basis_core_wrap_128):
+	def __cinit__(self,object N,int[:,::1] maps, int[:] pers, int[:] qs):
+		if N > 128:
+			raise ValueError("for 128-bit code N must be <= 128.")
+		self._N = N
+		self._nt = pers.shape[0]
+		self._sps = 2
+		if self._nt>0:
+			self._basis_core = new hcb_basis_core[uint128](N,self._nt,&maps[0,0],&pers[0],&qs[0])
+		else:
+			self._basis_core = new hcb_basis_core[uint128](N)
+
+	@cython.boundscheck(False)
+	def make_basis(self,uint64_t[:,::1] basis,norm_type[:] n,object Np=None,uint8_t[:] count=None):
+		cdef int Ns_1 = 0
+		cdef int Ns_2 = 0
+		cdef int Ns_3 = 0
+		cdef uint8_t np = 0
+		cdef npy_intp i = 0
+		cdef mem_MAX = basis.shape[0]
+
+		if Np is None:
+			raise ValueError("the full H-space of N > 64 sites can not be enumerated, particle conservation is required.")
+		elif type(Np) is int:
+			Ns_2 = self.make_basis_pcon[norm_type](Np,basis,n)
+		else:
+			Np_iter = iter(Np)
+			if count is None:
+				for np in Np_iter:
+					Ns_1 = self.make_basis_pcon[norm_type](np,basis[Ns_2:],n[Ns_2:])
+					if Ns_1 < 0:
+						return Ns_1
+					else:
+						Ns_2 += Ns_1
+
+					if Ns_2 > mem_MAX:
+						return -1
+			else:
+
+				for np in Np_iter:
+					Ns_1 = self.make_basis_pcon[norm_type](np,basis[Ns_2:],n[Ns_2:])
+					if Ns_1 < 0:
+						return Ns_1
+					else:
+						Ns_3 = Ns_2 + Ns_1
+						for i in range(Ns_2,Ns_3,1):
+							count[i] = np
+
+						Ns_2 = Ns_3
+
+					if Ns_2 > mem_MAX:
+						return -1
+
+		return Ns_2
+
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			raise ValueError("the full H-space of N > 64 sites can not be enumerated, particle conservation is required.")
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
+	@cython.boundscheck(False)
+	cdef npy_intp make_basis_pcon(self,int Np,uint64_t[:,::1] basis,norm_type[:] n):
+		cdef npy_intp Ns = comb(self._N,Np,exact=True)
+		cdef npy_intp mem_MAX = 0
+		cdef uint128 * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		cdef uint64_t[::1] s_words = _int_to_words(sum(1<<i for i in range(Np)),2)
+		cdef uint128 s = (<uint128*>&s_words[0])[0]
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = <uint128*>&basis[0,0]
+			n_ptr = &n[0]
+
+		with nogil:
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
+
+		return Ns
+
+
+cdef class hcb_basis_core_wrap_256(general_basis_core_wrap_256):
+	def __cinit__(self,object N,int[:,::1] maps, int[:] pers, int[:] qs):
+		if N > 256:
+			raise ValueError("for 256-bit code N must be <= 256.")
+		self._N = N
+		self._nt = pers.shape[0]
+		self._sps = 2
+		if self._nt>0:
+			self._basis_core = new hcb_basis_core[uint256](N,self._nt,&maps[0,0],&pers[0],&qs[0])
+		else:
+			self._basis_core = new hcb_basis_core[uint256](N)
+
+	@cython.boundscheck(False)
+	def make_basis(self,uint64_t[:,::1] basis,norm_type[:] n,object Np=None,uint8_t[:] count=None):
+		cdef int Ns_1 = 0
+		cdef int Ns_2 = 0
+		cdef int Ns_3 = 0
+		cdef uint8_t np = 0
+		cdef npy_intp i = 0
+		cdef mem_MAX = basis.shape[0]
+
+		if Np is None:
+			raise ValueError("the full H-space of N > 64 sites can not be enumerated, particle conservation is required.")
+		elif type(Np) is int:
+			Ns_2 = self.make_basis_pcon[norm_type](Np,basis,n)
+		else:
+			Np_iter = iter(Np)
+			if count is None:
+				for np in Np_iter:
+					Ns_1 = self.make_basis_pcon[norm_type](np,basis[Ns_2:],n[Ns_2:])
+					if Ns_1 < 0:
+						return Ns_1
+					else:
+						Ns_2 += Ns_1
+
+					if Ns_2 > mem_MAX:
+						return -1
+			else:
+
+				for np in Np_iter:
+					Ns_1 = self.make_basis_pcon[norm_type](np,basis[Ns_2:],n[Ns_2:])
+					if Ns_1 < 0:
+						return Ns_1
+					else:
+						Ns_3 = Ns_2 + Ns_1
+						for i in range(Ns_2,Ns_3,1):
+							count[i] = np
+
+						Ns_2 = Ns_3
+
+					if Ns_2 > mem_MAX:
+						return -1
+
+		return Ns_2
+
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			raise ValueError("the full H-space of N > 64 sites can not be enumerated, particle conservation is required.")
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
+	@cython.boundscheck(False)
+	cdef npy_intp make_basis_pcon(self,int Np,uint64_t[:,::1] basis,norm_type[:] n):
+		cdef npy_intp Ns = comb(self._N,Np,exact=True)
+		cdef npy_intp mem_MAX = 0
+		cdef uint256 * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		cdef uint64_t[::1] s_words = _int_to_words(sum(1<<i for i in range(Np)),4)
+		cdef uint256 s = (<uint256*>&s_words[0])[0]
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = <uint256*>&basis[0,0]
+			n_ptr = &n[0]
+
+		with nogil:
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
+
+		return Ns
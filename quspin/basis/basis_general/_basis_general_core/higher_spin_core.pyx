@@ -90,25 +90,53 @@ cdef class higher_spin_basis_core_wrap_32(general_basis_core_wrap_32):
 
 		return Ns_2
 
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			Ns = self.make_basis_full[uint8_t](None,None)
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_full(self,uint32_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = (self._sps**self._N)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint32_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns = make_basis(self._basis_core,Ns,mem_MAX,&basis[0],&n[0])
+			Ns = make_basis(self._basis_core,Ns,mem_MAX,basis_ptr,n_ptr)
 
 		return Ns
 
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_pcon(self,int Np,uint32_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = H_dim(Np,self._N,self._sps-1)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint32_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
 		cdef int l = Np/(self._sps-1)
 		cdef uint32_t s  = sum((self._sps-1)*self._sps**i for i in range(l))
 		s += (Np%(self._sps-1))*self._sps**l
 
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,&basis[0],&n[0])
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
 
 		return Ns
 
@@ -169,25 +197,53 @@ cdef class higher_spin_basis_core_wrap_64(general_basis_core_wrap_64):
 
 		return Ns_2
 
+	def count_basis(self,object Np=None):
+		cdef npy_intp Ns = 0
+		cdef int np = 0
+
+		if Np is None:
+			Ns = self.make_basis_full[uint8_t](None,None)
+		elif type(Np) is int:
+			Ns = self.make_basis_pcon[uint8_t](Np,None,None)
+		else:
+			for np in Np:
+				Ns += self.make_basis_pcon[uint8_t](np,None,None)
+
+		return Ns
+
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_full(self,uint64_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = (self._sps**self._N)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint64_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns = make_basis(self._basis_core,Ns,mem_MAX,&basis[0],&n[0])
+			Ns = make_basis(self._basis_core,Ns,mem_MAX,basis_ptr,n_ptr)
 
 		return Ns
 
 	@cython.boundscheck(False)
 	cdef npy_intp make_basis_pcon(self,int Np,uint64_t[:] basis,norm_type[:] n):
 		cdef npy_intp Ns = H_dim(Np,self._N,self._sps-1)
-		cdef npy_intp mem_MAX = basis.shape[0]
+		cdef npy_intp mem_MAX = 0
+		cdef uint64_t * basis_ptr = NULL
+		cdef norm_type * n_ptr = NULL
 		cdef int l = Np/(self._sps-1)
 		cdef uint64_t s  = sum((self._sps-1)*self._sps**i for i in range(l))
 		s += (Np%(self._sps-1))*self._sps**l
 
+		if basis is not None: # otherwise the states are only counted.
+			mem_MAX = basis.shape[0]
+			basis_ptr = &basis[0]
+			n_ptr = &n[0]
+
 		with nogil:
-			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,&basis[0],&n[0])
+			Ns =  make_basis_pcon(self._basis_core,Ns,mem_MAX,s,basis_ptr,n_ptr)
 
 		return Ns
 
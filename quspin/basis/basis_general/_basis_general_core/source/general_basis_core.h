@@ -8,6 +8,7 @@
 #include <complex>
 #include <stdlib.h>
 #include "numpy/ndarraytypes.h"
+#include "uint_n.h"
 
 
 template<class I>
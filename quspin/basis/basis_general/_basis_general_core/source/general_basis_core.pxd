@@ -3,6 +3,13 @@ from numpy cimport float32_t,float64_t,complex64_t,complex128_t
 from libcpp cimport bool
 
 
+cdef extern from "uint_n.h":
+	# multi-word states for N > 64, stored as arrays of shape (Ns,words) and dtype uint64.
+	cdef cppclass uint128:
+		uint128() nogil
+	cdef cppclass uint256:
+		uint256() nogil
+
 cdef extern from "general_basis_core.h":
 	cdef cppclass general_basis_core[I]:
 		const int pers[]
@@ -14,12 +21,21 @@ cdef extern from "make_general_basis.h":
 	npy_intp make_basis_pcon[I,J](general_basis_core[I]*,npy_intp,npy_intp,I,I[], J[]) nogil
 
 cdef extern from "general_basis_op.h":
+	void make_state_index[I](const npy_intp,const I[],const int,npy_intp[]) nogil
+	void find_states[I](const npy_intp,const I[],const npy_intp[],const int,const npy_intp,const I[],npy_intp[]) nogil
 	int general_op[I,J,K,T](general_basis_core[I] *B,const int,const char[], const int[],
-						  const double complex, const npy_intp, const I[], const J[], K[], K[], T[]) nogil
+						  const double complex, const npy_intp, const I[], const J[], const npy_intp[], const int, K[], K[], T[]) nogil
+	int general_op_csr_count[I,J,K](general_basis_core[I] *B,const int,const int[],const char[],const int[],
+						  const double complex[], const npy_intp, const I[], const J[], const npy_intp[], const int, K[]) nogil
+	int general_op_csr[I,J,K,T](general_basis_core[I] *B,const int,const int[],const char[],const int[],
+						  const double complex[], const npy_intp, const I[], const J[], const npy_intp[], const int, const K[], K[], T[]) nogil
+	int general_inplace_op[I,J,T](general_basis_core[I] *B,const bool,const bool,const int,const char[], const int[],
+						  const double complex, const npy_intp, const npy_intp, const I[], const J[], const npy_intp[], const int, const T[], T[]) nogil
 
 cdef extern from "general_basis_get_vec.h":
 	bool get_vec_general_dense[I,J,T](general_basis_core[I] *B,const I[],const J[],const npy_intp,
 									const npy_intp,const npy_intp,const T[],T[]) nogil
+	void get_vec_general_orbit[I,J](general_basis_core[I] *B,const I[],const J[],const npy_intp,I[],double complex[]) nogil
 
 ctypedef fused index_type:
 	int8_t
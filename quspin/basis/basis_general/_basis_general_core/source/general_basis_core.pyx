@@ -1,5 +1,6 @@
 from general_basis_core cimport *
 from numpy import pi
+import numpy as _np
 from libc.math cimport cos,sin,abs,sqrt
 import scipy.sparse as _sp
 
@@ -153,14 +154,85 @@ cdef class general_basis_core_wrap_32:
 		pass
 
 	@cython.boundscheck(False)
-	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint32_t[:] basis,norm_type[:] n):
+	def make_state_index(self,uint32_t[:] basis,int shift,npy_intp[:] table):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			make_state_index(Ns,&basis[0],shift,&table[0])
+
+	@cython.boundscheck(False)
+	def find_states(self,uint32_t[:] basis,npy_intp[:] table,int shift,uint32_t[:] states,npy_intp[:] out):
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_states = states.shape[0]
+
+		if Ns == 0 or n_states == 0:
+			return
+
+		with nogil:
+			find_states(Ns,&basis[0],&table[0],shift,n_states,&states[0],&out[0])
+
+	@cython.boundscheck(False)
+	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint32_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
 		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
 		cdef int n_op = indx.shape[0]
 		cdef npy_intp Ns = basis.shape[0]
 		cdef int err = 0;
 		cdef double complex JJ = J
 		with nogil:
-			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,&basis[0],&n[0],&row[0],&col[0],&M[0])
+			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,&basis[0],&n[0],&table[0],shift,&row[0],&col[0],&M[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def op_csr_count(self,index_type[:] indptr,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint32_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		with nogil:
+			err = general_op_csr_count(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,&basis[0],&n[0],&table[0],shift,&indptr[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+
+	@cython.boundscheck(False)
+	def op_csr(self,index_type[:] indptr,index_type[:] indices,dtype[:] data,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint32_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+
+		if indices.shape[0] == 0:
+			return
+
+		with nogil:
+			err = general_op_csr(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,&basis[0],&n[0],&table[0],shift,&indptr[0],&indices[0],&data[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def inplace_op(self,dtype[:,::1] v_in,dtype[:,::1] v_out,bool conjugated,bool transposed,object opstr,int[:] indx,object J,uint32_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_vec = v_in.shape[1]
+		cdef int err = 0;
+		cdef double complex JJ = J
+
+		if Ns == 0 or n_vec == 0:
+			return
+
+		with nogil:
+			err = general_inplace_op(self._basis_core,conjugated,transposed,n_op,&c_opstr[0],&indx[0],JJ,Ns,n_vec,&basis[0],&n[0],&table[0],shift,&v_in[0,0],&v_out[0,0])
 
 		if err == -1:
 			raise ValueError("operator not recognized.")
@@ -180,6 +252,16 @@ cdef class general_basis_core_wrap_32:
 		if not err:
 			raise TypeError("attemping to use real type for complex elements.")
 
+	@cython.boundscheck(False)
+	def get_vec_orbit(self, uint32_t[:] basis, norm_type[:] n, uint32_t[:] states, double complex[:] coeff):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			get_vec_general_orbit(self._basis_core,&basis[0],&n[0],Ns,&states[0],&coeff[0])
+
 	@cython.boundscheck(False)
 	def get_proj(self, uint32_t[:] basis, object Ptype,int8_t[:] sign, dtype[:] c, index_type[:] row, index_type[:] col):
 		cdef npy_intp Ns = basis.shape[0]
@@ -211,14 +293,85 @@ cdef class general_basis_core_wrap_64:
 		pass
 
 	@cython.boundscheck(False)
-	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint64_t[:] basis,norm_type[:] n):
+	def make_state_index(self,uint64_t[:] basis,int shift,npy_intp[:] table):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			make_state_index(Ns,&basis[0],shift,&table[0])
+
+	@cython.boundscheck(False)
+	def find_states(self,uint64_t[:] basis,npy_intp[:] table,int shift,uint64_t[:] states,npy_intp[:] out):
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_states = states.shape[0]
+
+		if Ns == 0 or n_states == 0:
+			return
+
+		with nogil:
+			find_states(Ns,&basis[0],&table[0],shift,n_states,&states[0],&out[0])
+
+	@cython.boundscheck(False)
+	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint64_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
 		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
 		cdef int n_op = indx.shape[0]
 		cdef npy_intp Ns = basis.shape[0]
 		cdef int err = 0;
 		cdef double complex JJ = J
 		with nogil:
-			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,&basis[0],&n[0],&row[0],&col[0],&M[0])
+			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,&basis[0],&n[0],&table[0],shift,&row[0],&col[0],&M[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def op_csr_count(self,index_type[:] indptr,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		with nogil:
+			err = general_op_csr_count(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,&basis[0],&n[0],&table[0],shift,&indptr[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+
+	@cython.boundscheck(False)
+	def op_csr(self,index_type[:] indptr,index_type[:] indices,dtype[:] data,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+
+		if indices.shape[0] == 0:
+			return
+
+		with nogil:
+			err = general_op_csr(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,&basis[0],&n[0],&table[0],shift,&indptr[0],&indices[0],&data[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def inplace_op(self,dtype[:,::1] v_in,dtype[:,::1] v_out,bool conjugated,bool transposed,object opstr,int[:] indx,object J,uint64_t[:] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_vec = v_in.shape[1]
+		cdef int err = 0;
+		cdef double complex JJ = J
+
+		if Ns == 0 or n_vec == 0:
+			return
+
+		with nogil:
+			err = general_inplace_op(self._basis_core,conjugated,transposed,n_op,&c_opstr[0],&indx[0],JJ,Ns,n_vec,&basis[0],&n[0],&table[0],shift,&v_in[0,0],&v_out[0,0])
 
 		if err == -1:
 			raise ValueError("operator not recognized.")
@@ -238,6 +391,16 @@ cdef class general_basis_core_wrap_64:
 		if not err:
 			raise TypeError("attemping to use real type for complex elements.")
 
+	@cython.boundscheck(False)
+	def get_vec_orbit(self, uint64_t[:] basis, norm_type[:] n, uint64_t[:] states, double complex[:] coeff):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			get_vec_general_orbit(self._basis_core,&basis[0],&n[0],Ns,&states[0],&coeff[0])
+
 	@cython.boundscheck(False)
 	def get_proj(self, uint64_t[:] basis, object Ptype, int8_t[:] sign, dtype[:] c, index_type[:] row, index_type[:] col):
 		cdef npy_intp Ns = basis.shape[0]
@@ -259,3 +422,202 @@ cdef class general_basis_core_wrap_64:
 			return get_proj_helper_64[dtype,index_type](self._basis_core,basis,self._nt,self._nt,sign,c,row,col,P)
 
 
+def _int_to_words(object s,int n_words):
+	# multi-word representation of the integer s: most significant 64-bit word first.
+	return _np.array([(s >> (64*(n_words-k-1))) & 0xffffffffffffffff for k in range(n_words)],dtype=_np.uint64)
+
+
+cdef class general_basis_core_wrap_128:
+	# states of 128 bits are stored in arrays of shape (Ns,2) and dtype uint64, see `_int_to_words`.
+	# the full H-space representation (get_vec, get_proj) does not exist for N > 64.
+	cdef int _N
+	cdef int _nt
+	cdef int _sps
+	cdef general_basis_core[uint128] * _basis_core
+
+	def __cinit__(self):
+		pass
+
+	@cython.boundscheck(False)
+	def make_state_index(self,uint64_t[:,::1] basis,int shift,npy_intp[:] table):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			make_state_index(Ns,<uint128*>&basis[0,0],shift,&table[0])
+
+	@cython.boundscheck(False)
+	def find_states(self,uint64_t[:,::1] basis,npy_intp[:] table,int shift,uint64_t[:,::1] states,npy_intp[:] out):
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_states = states.shape[0]
+
+		if Ns == 0 or n_states == 0:
+			return
+
+		with nogil:
+			find_states(Ns,<uint128*>&basis[0,0],&table[0],shift,n_states,<uint128*>&states[0,0],&out[0])
+
+	@cython.boundscheck(False)
+	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		cdef double complex JJ = J
+		with nogil:
+			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,<uint128*>&basis[0,0],&n[0],&table[0],shift,&row[0],&col[0],&M[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def op_csr_count(self,index_type[:] indptr,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		with nogil:
+			err = general_op_csr_count(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,<uint128*>&basis[0,0],&n[0],&table[0],shift,&indptr[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+
+	@cython.boundscheck(False)
+	def op_csr(self,index_type[:] indptr,index_type[:] indices,dtype[:] data,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+
+		if indices.shape[0] == 0:
+			return
+
+		with nogil:
+			err = general_op_csr(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,<uint128*>&basis[0,0],&n[0],&table[0],shift,&indptr[0],&indices[0],&data[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def inplace_op(self,dtype[:,::1] v_in,dtype[:,::1] v_out,bool conjugated,bool transposed,object opstr,int[:] indx,object J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_vec = v_in.shape[1]
+		cdef int err = 0;
+		cdef double complex JJ = J
+
+		if Ns == 0 or n_vec == 0:
+			return
+
+		with nogil:
+			err = general_inplace_op(self._basis_core,conjugated,transposed,n_op,&c_opstr[0],&indx[0],JJ,Ns,n_vec,<uint128*>&basis[0,0],&n[0],&table[0],shift,&v_in[0,0],&v_out[0,0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+
+cdef class general_basis_core_wrap_256:
+	# states of 256 bits are stored in arrays of shape (Ns,4) and dtype uint64, see `_int_to_words`.
+	# the full H-space representation (get_vec, get_proj) does not exist for N > 64.
+	cdef int _N
+	cdef int _nt
+	cdef int _sps
+	cdef general_basis_core[uint256] * _basis_core
+
+	def __cinit__(self):
+		pass
+
+	@cython.boundscheck(False)
+	def make_state_index(self,uint64_t[:,::1] basis,int shift,npy_intp[:] table):
+		cdef npy_intp Ns = basis.shape[0]
+
+		if Ns == 0:
+			return
+
+		with nogil:
+			make_state_index(Ns,<uint256*>&basis[0,0],shift,&table[0])
+
+	@cython.boundscheck(False)
+	def find_states(self,uint64_t[:,::1] basis,npy_intp[:] table,int shift,uint64_t[:,::1] states,npy_intp[:] out):
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_states = states.shape[0]
+
+		if Ns == 0 or n_states == 0:
+			return
+
+		with nogil:
+			find_states(Ns,<uint256*>&basis[0,0],&table[0],shift,n_states,<uint256*>&states[0,0],&out[0])
+
+	@cython.boundscheck(False)
+	def op(self,index_type[:] row,index_type[:] col,dtype[:] M,object opstr,int[:] indx,object J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		cdef double complex JJ = J
+		with nogil:
+			err = general_op(self._basis_core,n_op,&c_opstr[0],&indx[0],JJ,Ns,<uint256*>&basis[0,0],&n[0],&table[0],shift,&row[0],&col[0],&M[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def op_csr_count(self,index_type[:] indptr,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+		with nogil:
+			err = general_op_csr_count(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,<uint256*>&basis[0,0],&n[0],&table[0],shift,&indptr[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+
+	@cython.boundscheck(False)
+	def op_csr(self,index_type[:] indptr,index_type[:] indices,dtype[:] data,object opstr,int[:] indx,int[:] n_ops,double complex[:] J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_terms = n_ops.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef int err = 0;
+
+		if indices.shape[0] == 0:
+			return
+
+		with nogil:
+			err = general_op_csr(self._basis_core,n_terms,&n_ops[0],&c_opstr[0],&indx[0],&J[0],Ns,<uint256*>&basis[0,0],&n[0],&table[0],shift,&indptr[0],&indices[0],&data[0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
+
+	@cython.boundscheck(False)
+	def inplace_op(self,dtype[:,::1] v_in,dtype[:,::1] v_out,bool conjugated,bool transposed,object opstr,int[:] indx,object J,uint64_t[:,::1] basis,norm_type[:] n,npy_intp[:] table,int shift):
+		cdef char[:] c_opstr = bytearray(opstr,"utf-8")
+		cdef int n_op = indx.shape[0]
+		cdef npy_intp Ns = basis.shape[0]
+		cdef npy_intp n_vec = v_in.shape[1]
+		cdef int err = 0;
+		cdef double complex JJ = J
+
+		if Ns == 0 or n_vec == 0:
+			return
+
+		with nogil:
+			err = general_inplace_op(self._basis_core,conjugated,transposed,n_op,&c_opstr[0],&indx[0],JJ,Ns,n_vec,<uint256*>&basis[0,0],&n[0],&table[0],shift,&v_in[0,0],&v_out[0,0])
+
+		if err == -1:
+			raise ValueError("operator not recognized.")
+		elif err == 1:
+			raise TypeError("attemping to use real type for complex matrix elements.")
@@ -109,6 +109,77 @@ bool get_vec_general_dense(general_basis_core<I> *B,
 }
 
 
+template<class I>
+npy_intp get_orbit_rep(general_basis_core<I> *B,
+									 I s,
+								   int &sign,
+							 const int nt,
+							 std::complex<double> c,
+							 	   I states[],
+							 	   std::complex<double> coeff[],
+							 	   npy_intp l,
+							 const int depth)
+{
+	if(nt<=0){
+		states[l] = s;
+		coeff[l] = double(sign) * c;
+		return l+1;
+	}
+	int per = B->pers[depth];
+	double q = (2.0*M_PI*B->qs[depth])/per;
+	std::complex<double> cc = std::exp(std::complex<double>(0,-q));
+
+	if(depth < nt-1){
+		for(int j=0;j<per;j++){
+			l = get_orbit_rep(B,s,sign,nt,c,states,coeff,l,depth+1);
+			c *= cc;
+			s = B->map_state(s,depth,sign);
+		}
+		return l;
+	}
+	else{
+		for(int j=0;j<per;j++){
+			states[l] = s;
+			coeff[l] = double(sign) * c;
+			l++;
+			c *= cc;
+			s = B->map_state(s,depth,sign);
+		}
+		return l;
+	}
+}
+
+
+template<class I,class J>
+void get_vec_general_orbit(general_basis_core<I> *B,
+										 const I basis[],
+										 const J n[],
+										 const npy_intp Ns,
+										 	   I states[],
+										 	   std::complex<double> coeff[])
+{
+	// enumerates the orbit of every representative state: for basis[k] the states of the orbit 
+	// and the corresponding coefficients of the full basis vector are stored starting at 
+	// position k*n_orbit with n_orbit = prod(pers). States appearing multiple times in an orbit 
+	// are not combined.
+	const int nt = B->get_nt();
+
+	npy_intp n_orbit = 1;
+	double norm = 1.0;
+
+	for(int i=0;i<nt;i++){
+		n_orbit *= B->pers[i];
+		norm *= B->pers[i];
+	}
+
+	#pragma omp parallel for schedule(static) firstprivate(norm)
+	for(npy_intp k=0;k<Ns;k++){
+		std::complex<double> c = 1.0/std::sqrt(n[k]*norm);
+		int sign = 1;
+		get_orbit_rep(B,basis[k],sign,nt,c,states,coeff,k*n_orbit,0);
+	}
+}
+
 
 
 #endif
@@ -3,6 +3,9 @@
 
 #include <complex>
 #include <limits>
+#include <vector>
+#include <utility>
+#include <algorithm>
 #include "general_basis_core.h"
 #include "numpy/ndarraytypes.h"
 
@@ -28,6 +31,68 @@ K binary_search(const K N,const I A[],const I s){
 	return -1;
 }
 
+template<class I>
+class state_index
+{
+	// two-level index of the basis states (stored in descending order): the states are binned by 
+	// their leading bits, table[b]:table[b+1] is the range of positions of the states in bin b, 
+	// such that only a short local search is left for every lookup. If table is NULL the lookup
+	// falls back to a binary search over the full basis.
+	const npy_intp Ns;
+	const I * basis;
+	const npy_intp * table;
+	const int shift;
+	const I p_max;
+
+public:
+	state_index(const npy_intp _Ns,const I _basis[],const npy_intp _table[],const int _shift) : 
+	Ns(_Ns), basis(_basis), table(_table), shift(_shift), p_max(_Ns>0 ? (_basis[0] >> _shift) : 0) {}
+
+	npy_intp find(const I s) const {
+		if(table == NULL){
+			return binary_search(Ns,basis,s);
+		}
+
+		const I p = s >> shift;
+		if(Ns <= 0 || p > p_max){
+			return -1;
+		}
+
+		const npy_intp b = state_to_intp(p_max - p);
+		const npy_intp lo = table[b];
+		const npy_intp j = binary_search((npy_intp)(table[b+1]-lo),&basis[lo],s);
+		return (j < 0 ? -1 : lo + j);
+	}
+};
+
+template<class I>
+void make_state_index(const npy_intp Ns,const I basis[],const int shift,npy_intp table[]){
+	// fills the (basis[0] >> shift) + 2 entries of table, see state_index.
+	const I p_max = basis[0] >> shift;
+	const npy_intp n_bins = state_to_intp(p_max) + 1;
+	npy_intp b = 0;
+	table[0] = 0;
+	for(npy_intp i=0;i<Ns;i++){
+		const npy_intp bi = state_to_intp(p_max - (basis[i] >> shift));
+		while(b < bi){
+			table[++b] = i;
+		}
+	}
+	while(b < n_bins){
+		table[++b] = Ns;
+	}
+}
+
+template<class I>
+void find_states(const npy_intp Ns,const I basis[],const npy_intp table[],const int shift,
+				 const npy_intp n_states,const I states[],npy_intp out[]){
+	const state_index<I> index(Ns,basis,table,shift);
+	#pragma omp parallel for schedule(static)
+	for(npy_intp i=0;i<n_states;i++){
+		out[i] = index.find(states[i]);
+	}
+}
+
 template<class T>
 int inline check_imag(std::complex<double> m,std::complex<T> *M){
 	M[0].real(m.real());
@@ -57,12 +122,15 @@ int general_op(general_basis_core<I> *B,
 						  const npy_intp Ns,
 						  const I basis[],
 						  const J n[],
+						  const npy_intp table[],
+						  const int shift,
 						  		K row[],
 						  		K col[],
 						  		T M[]
 						  )
 {
 	const int nt = B->get_nt();
+	const state_index<I> index(Ns,basis,table,shift);
 	int err = 0;
 	int g[128],gg[128];
 	#pragma omp parallel for schedule(static,1) private(g,gg)
@@ -85,7 +153,7 @@ int general_op(general_basis_core<I> *B,
 			K j = i;
 			if(r != basis[i]){
 				I rr = B->ref_state(r,g,gg,sign);
-				j = binary_search(Ns,basis,rr);
+				j = index.find(rr);
 			}
 
 			if(j >= 0){
@@ -116,7 +184,309 @@ int general_op(general_basis_core<I> *B,
 
 
 
+template<class K>
+bool compare_row(const std::pair<K,std::complex<double> > &a,const std::pair<K,std::complex<double> > &b){
+	return a.first < b.first;
+}
+
+template<class I, class J, class K>
+int general_op_column(general_basis_core<I> *B,
+						  const npy_intp i,
+						  const int n_terms,
+						  const int n_ops[],
+						  const char opstr[],
+						  const int indx[],
+						  const std::complex<double> A[],
+						  const npy_intp Ns,
+						  const I basis[],
+						  const J n[],
+						  const state_index<I> &index,
+						  		std::vector<std::pair<K,std::complex<double> > > &buf
+						  )
+{
+	// calculates all matrix elements of column i for the sum of terms and stores them
+	// in buf sorted by row index with duplicate rows summed up and zeros removed.
+	const int nt = B->get_nt();
+	int g[128],gg[128];
+	buf.clear();
+
+	for(int t=0,k0=0;t<n_terms;k0+=n_ops[t++]){
+		I r = basis[i];
+		std::complex<double> m = A[t];
+		int err = B->op(r,m,n_ops[t],&opstr[k0],&indx[k0]);
+
+		if(err != 0){
+			return err;
+		}
+
+		if(std::abs(m)==0){
+			continue;
+		}
+
+		int sign = 1;
+
+		for(int k=0;k<nt;k++){
+			gg[k]=g[k]=0;
+		}
+
+		K j = i;
+		if(r != basis[i]){
+			I rr = B->ref_state(r,g,gg,sign);
+			j = index.find(rr);
+		}
+
+		if(j >= 0){
+			for(int k=0;k<nt;k++){
+				double q = (2.0*M_PI*B->qs[k]*g[k])/B->pers[k];
+				m *= std::exp(std::complex<double>(0,-q));
+			}
+			m *= sign * std::sqrt(double(n[j])/double(n[i]));
+			buf.push_back(std::make_pair(j,m));
+		}
+	}
+
+	std::sort(buf.begin(),buf.end(),compare_row<K>);
+
+	typename std::vector<std::pair<K,std::complex<double> > >::iterator it=buf.begin(),out=buf.begin();
+	while(it!=buf.end()){
+		K j = it->first;
+		std::complex<double> m = 0;
+		for(;it!=buf.end() && it->first==j;++it){
+			m += it->second;
+		}
+		if(std::abs(m)!=0){
+			out->first = j;
+			out->second = m;
+			++out;
+		}
+	}
+	buf.erase(out,buf.end());
+
+	return 0;
+}
+
+
+template<class I, class J, class K>
+int general_op_csr_count(general_basis_core<I> *B,
+						  const int n_terms,
+						  const int n_ops[],
+						  const char opstr[],
+						  const int indx[],
+						  const std::complex<double> A[],
+						  const npy_intp Ns,
+						  const I basis[],
+						  const J n[],
+						  const npy_intp table[],
+						  const int shift,
+						  		K indptr[]
+						  )
+{
+	// first pass: counts the number of nonzero matrix elements in every column, 
+	// indptr[i+1] is set to the number of matrix elements in column i.
+	const state_index<I> index(Ns,basis,table,shift);
+	int err = 0;
+	indptr[0] = 0;
+	#pragma omp parallel
+	{
+		std::vector<std::pair<K,std::complex<double> > > buf;
+		buf.reserve(n_terms);
+
+		#pragma omp for schedule(dynamic,256)
+		for(npy_intp i=0;i<Ns;i++){
+			if(err != 0){
+				continue;
+			}
+
+			int local_err = general_op_column(B,i,n_terms,n_ops,opstr,indx,A,Ns,basis,n,index,buf);
+			indptr[i+1] = buf.size();
+
+			if(local_err != 0){
+				#pragma omp critical
+				err = local_err;
+			}
+		}
+	}
+
+	return err;
+}
+
+
+template<class I, class J, class K, class T>
+int general_op_csr(general_basis_core<I> *B,
+						  const int n_terms,
+						  const int n_ops[],
+						  const char opstr[],
+						  const int indx[],
+						  const std::complex<double> A[],
+						  const npy_intp Ns,
+						  const I basis[],
+						  const J n[],
+						  const npy_intp table[],
+						  const int shift,
+						  const K indptr[],
+						  		K indices[],
+						  		T data[]
+						  )
+{
+	// second pass: fills the compressed columns of the sum of all terms using the 
+	// column pointers calculated from general_op_csr_count.
+	const state_index<I> index(Ns,basis,table,shift);
+	int err = 0;
+	#pragma omp parallel
+	{
+		std::vector<std::pair<K,std::complex<double> > > buf;
+		buf.reserve(n_terms);
+
+		#pragma omp for schedule(dynamic,256)
+		for(npy_intp i=0;i<Ns;i++){
+			if(err != 0){
+				continue;
+			}
+
+			int local_err = general_op_column(B,i,n_terms,n_ops,opstr,indx,A,Ns,basis,n,index,buf);
 
+			K k = indptr[i];
+			for(npy_intp l=0;l<(npy_intp)buf.size() && local_err==0;l++,k++){
+				indices[k] = buf[l].first;
+				local_err = check_imag(buf[l].second,&data[k]);
+			}
+
+			if(local_err != 0){
+				#pragma omp critical
+				err = local_err;
+			}
+		}
+	}
+
+	return err;
+}
+
+
+template<class T>
+int inline add_to_out(const std::complex<double> m,const npy_intp n_vec,const std::complex<T> in[],std::complex<T> out[]){
+	const std::complex<T> ME(m);
+	for(npy_intp k=0;k<n_vec;k++){
+		out[k] += ME * in[k];
+	}
+	return 0;
+}
+
+template<class T>
+int inline add_to_out(const std::complex<double> m,const npy_intp n_vec,const T in[],T out[]){
+	if(std::abs(m.imag())>1.1e-15){
+		return 1;
+	}
+	const T ME = m.real();
+	for(npy_intp k=0;k<n_vec;k++){
+		out[k] += ME * in[k];
+	}
+	return 0;
+}
+
+template<class T>
+int inline atomic_add_to_out(const std::complex<double> m,const npy_intp n_vec,const std::complex<T> in[],std::complex<T> out[]){
+	const std::complex<T> ME(m);
+	for(npy_intp k=0;k<n_vec;k++){
+		const std::complex<T> v = ME * in[k];
+		T * out_v = reinterpret_cast<T*>(&out[k]);
+		#pragma omp atomic
+		out_v[0] += v.real();
+		#pragma omp atomic
+		out_v[1] += v.imag();
+	}
+	return 0;
+}
+
+template<class T>
+int inline atomic_add_to_out(const std::complex<double> m,const npy_intp n_vec,const T in[],T out[]){
+	if(std::abs(m.imag())>1.1e-15){
+		return 1;
+	}
+	const T ME = m.real();
+	for(npy_intp k=0;k<n_vec;k++){
+		const T v = ME * in[k];
+		#pragma omp atomic
+		out[k] += v;
+	}
+	return 0;
+}
+
+
+template<class I, class J, class T>
+int general_inplace_op(general_basis_core<I> *B,
+						  const bool conjugated,
+						  const bool transposed,
+						  const int n_op,
+						  const char opstr[],
+						  const int indx[],
+						  const std::complex<double> A,
+						  const npy_intp Ns,
+						  const npy_intp n_vec,
+						  const I basis[],
+						  const J n[],
+						  const npy_intp table[],
+						  const int shift,
+						  const T v_in[],
+						  		T v_out[]
+						  )
+{
+	// calculates the matrix elements on the fly and adds the action of the operator 
+	// on the columns of v_in to v_out, both arrays are C-contiguous with shape (Ns,n_vec).
+	const int nt = B->get_nt();
+	const state_index<I> index(Ns,basis,table,shift);
+	int err = 0;
+	int g[128],gg[128];
+	#pragma omp parallel for schedule(static) private(g,gg)
+	for(npy_intp i=0;i<Ns;i++){
+		if(err != 0){
+			continue;
+		}
+
+		I r = basis[i];
+		std::complex<double> m = A;
+		int local_err = B->op(r,m,n_op,opstr,indx);
+
+		if(local_err == 0 && std::abs(m) != 0){
+			int sign = 1;
+
+			for(int k=0;k<nt;k++){
+				gg[k]=g[k]=0;
+			}
+
+			npy_intp j = i;
+			if(r != basis[i]){
+				I rr = B->ref_state(r,g,gg,sign);
+				j = index.find(rr);
+			}
+
+			if(j >= 0){
+				for(int k=0;k<nt;k++){
+					double q = (2.0*M_PI*B->qs[k]*g[k])/B->pers[k];
+					m *= std::exp(std::complex<double>(0,-q));
+				}
+				m *= sign * std::sqrt(double(n[j])/double(n[i]));
+
+				if(conjugated){
+					m = std::conj(m);
+				}
+
+				if(transposed){ // row i of the transposed operator only updates v_out[i]
+					local_err = add_to_out(m,n_vec,&v_in[j*n_vec],&v_out[i*n_vec]);
+				}
+				else{ // different states i can be mapped to the same row j
+					local_err = atomic_add_to_out(m,n_vec,&v_in[i*n_vec],&v_out[j*n_vec]);
+				}
+			}
+		}
+
+		if(local_err != 0){
+			#pragma omp critical
+			err = local_err;
+		}
+	}
+
+	return err;
+}
 
 
 
@@ -63,7 +63,7 @@ class hcb_basis_core : public general_basis_core<I>
 			for(int j=n_op-1;j>-1;j--){
 				int ind = general_basis_core<I>::N-indx[j]-1;
 				I b = (one << ind);
-				bool a = bool((r >> ind)&one);
+				bool a = (((r >> ind)&one) != 0);
 				char op = opstr[j];
 				switch(op){
 					case 'z':
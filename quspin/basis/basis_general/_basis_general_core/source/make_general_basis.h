@@ -3,92 +3,95 @@
 
 #include "general_basis_core.h"
 #include "numpy/ndarraytypes.h"
+#include "openmp.h"
 #include <cmath>
 #include <cfloat>
+#include <vector>
+#include <algorithm>
 
 
+// number of states per thread checked in each block of the enumeration.
+#define _MAKE_BASIS_BLOCK 65536
 
 
+inline bool check_norm_isnan(double norm){
+	#if defined(_WIN64)
+		// x64 version
+		return _isnanf(norm) != 0;
+	#elif defined(_WIN32)
+		return _isnan(norm) != 0;
+	#else
+		return std::isnan(norm);
+	#endif
+}
 
+// enumerates MAX states in blocks: the states of a block are generated (for pcon by
+// next_state_pcon starting from s, otherwise consecutive integers starting from s) and
+// checked with check_state in parallel, the representatives are then appended in order.
+// As the states are enumerated in increasing order the basis is written in the same 
+// descending order as the final basis without the need of sorting. If basis == NULL 
+// the representatives are only counted, which gives the exact size of the basis.
 template<class I,class J>
-npy_intp make_basis(general_basis_core<I> *B,npy_intp MAX,npy_intp mem_MAX,I basis[],J n[]){
+npy_intp make_basis_block(general_basis_core<I> *B,npy_intp MAX,npy_intp mem_MAX,I s,const bool pcon,I basis[],J n[]){
+	const npy_intp block_size = std::min((npy_intp)_MAKE_BASIS_BLOCK*omp_get_max_threads(),std::max(MAX,(npy_intp)1));
+	std::vector<I> states(block_size);
+	std::vector<double> norms(block_size);
 	npy_intp Ns = 0;
-	I s = 0;
-	bool unsuff_mem = false;
 
-	while(MAX != 0){
-		if(Ns>=mem_MAX){
-			unsuff_mem = true;
-			break;
+	while(MAX > 0){
+		const npy_intp nb = std::min(block_size,MAX);
+
+		if(pcon){
+			for(npy_intp k=0;k<nb;k++){
+				states[k] = s;
+				s = B->next_state_pcon(s);
+			}
 		}
-		double norm = B->check_state(s);
-		J int_norm = norm;
-
-		#if defined(_WIN64)
-			// x64 version
-			bool isnan = _isnanf(norm) != 0;
-		#elif defined(_WIN32)
-			bool isnan = _isnan(norm) != 0;
-		#else
-			bool isnan = std::isnan(norm);
-		#endif
-		
-		if(!isnan && int_norm>0 ){
-			basis[Ns] = s;
-			n[Ns] = norm;
-			Ns++;
+		else{
+			for(npy_intp k=0;k<nb;k++){
+				states[k] = s + (I)k;
+			}
+			s += (I)nb;
 		}
-		s++;
-		MAX--;
-	}
-
-	if(unsuff_mem){
-		return -1;
-	}
-	else{
-		return Ns;
-	}
-}
-
-template<class I,class J>
-npy_intp make_basis_pcon(general_basis_core<I> *B,npy_intp MAX,npy_intp mem_MAX,I s,I basis[],J n[]){
-	npy_intp Ns = 0;
-	bool unsuff_mem = false;
 
-	while(MAX!=0){
-		if(Ns>=mem_MAX){
-			unsuff_mem = true;
-			break;
+		#pragma omp parallel for schedule(static)
+		for(npy_intp k=0;k<nb;k++){
+			norms[k] = B->check_state(states[k]);
 		}
 
-		double norm = B->check_state(s);
-		J int_norm = norm;
-
-		#if defined(_WIN64)
-			// x64 version
-			bool isnan = _isnanf(norm) != 0;
-		#elif defined(_WIN32)
-			bool isnan = _isnan(norm) != 0;
-		#else
-			bool isnan = std::isnan(norm);
-		#endif
-		
-
-		if(!isnan && int_norm>0 ){
-			basis[Ns] = s;
-			n[Ns] = norm;
-			Ns++;
+		for(npy_intp k=0;k<nb;k++){
+			const double norm = norms[k];
+
+			if(!check_norm_isnan(norm) && (npy_intp)norm>0 ){
+				if(basis != NULL){
+					if(Ns>=mem_MAX){
+						return -1;
+					}
+					basis[Ns] = states[k];
+					n[Ns] = norm;
+				}
+				Ns++;
+			}
 		}
-		s = B->next_state_pcon(s);
-		MAX--;
+		MAX -= nb;
 	}
 
-	if(unsuff_mem){
-		return -1;
-	}
-	else{
-		return Ns;
+	if(basis != NULL){
+		std::reverse(basis,basis+Ns);
+		std::reverse(n,n+Ns);
 	}
+
+	return Ns;
+}
+
+template<class I,class J>
+npy_intp make_basis(general_basis_core<I> *B,npy_intp MAX,npy_intp mem_MAX,I basis[],J n[]){
+	return make_basis_block(B,MAX,mem_MAX,(I)0,false,basis,n);
+}
+
+template<class I,class J>
+npy_intp make_basis_pcon(general_basis_core<I> *B,npy_intp MAX,npy_intp mem_MAX,I s,I basis[],J n[]){
+	return make_basis_block(B,MAX,mem_MAX,s,true,basis,n);
 }
 
 #endif
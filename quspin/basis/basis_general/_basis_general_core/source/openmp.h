@@ -7,6 +7,7 @@
 typedef int omp_int_t;
 inline omp_int_t omp_get_thread_num() { return 0;}
 inline omp_int_t omp_get_num_threads() { return 1;}
+inline omp_int_t omp_get_max_threads() { return 1;}
 #endif
 
 #endif
\ No newline at end of file
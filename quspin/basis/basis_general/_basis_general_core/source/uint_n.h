@@ -0,0 +1,195 @@
+#ifndef _UINT_N_H
+#define _UINT_N_H
+
+#include <stdint.h>
+#include "numpy/ndarraytypes.h"
+
+// fixed width unsigned integer of W 64-bit words used to store the states of systems with more
+// than 64 sites. The words are stored most significant word first, such that an array of states
+// has the same memory layout as a C-contiguous numpy array of shape (Ns,W) and dtype uint64 and
+// the rows of that array compare in the same order as the states. Only the operations needed by
+// the basis cores are implemented, all of them modulo 2^(64*W) like the builtin unsigned types.
+
+
+inline int ctz_64(uint64_t x){
+	// number of trailing zero bits of x != 0.
+	#if defined(__GNUC__)
+		return __builtin_ctzll(x);
+	#else
+		int n = 0;
+		while(!(x&1)){x >>= 1;n++;}
+		return n;
+	#endif
+}
+
+
+template<int W>
+class uint_n
+{
+	public:
+		uint64_t w[W];
+
+		uint_n(){
+			for(int k=0;k<W;k++){w[k] = 0;}
+		}
+
+		uint_n(const unsigned long long v){
+			for(int k=0;k<W-1;k++){w[k] = 0;}
+			w[W-1] = v;
+		}
+
+		// comparisons
+		bool operator==(const uint_n &b) const {
+			for(int k=0;k<W;k++){
+				if(w[k] != b.w[k]){return false;}
+			}
+			return true;
+		}
+
+		bool operator!=(const uint_n &b) const {return !(*this == b);}
+
+		bool operator<(const uint_n &b) const {
+			for(int k=0;k<W;k++){
+				if(w[k] != b.w[k]){return w[k] < b.w[k];}
+			}
+			return false;
+		}
+
+		bool operator>(const uint_n &b) const {return b < *this;}
+		bool operator<=(const uint_n &b) const {return !(b < *this);}
+		bool operator>=(const uint_n &b) const {return !(*this < b);}
+
+		// bitwise operations
+		uint_n& operator&=(const uint_n &b){
+			for(int k=0;k<W;k++){w[k] &= b.w[k];}
+			return *this;
+		}
+
+		uint_n& operator|=(const uint_n &b){
+			for(int k=0;k<W;k++){w[k] |= b.w[k];}
+			return *this;
+		}
+
+		uint_n& operator^=(const uint_n &b){
+			for(int k=0;k<W;k++){w[k] ^= b.w[k];}
+			return *this;
+		}
+
+		uint_n operator~() const {
+			uint_n r;
+			for(int k=0;k<W;k++){r.w[k] = ~w[k];}
+			return r;
+		}
+
+		uint_n& operator<<=(const int n){
+			const int q = n/64, m = n%64;
+			for(int k=0;k<W;k++){
+				const int l = k+q;
+				uint64_t v = 0;
+				if(l < W){
+					v = (m ? (w[l] << m) : w[l]);
+					if(m && l+1 < W){v |= (w[l+1] >> (64-m));}
+				}
+				w[k] = v;
+			}
+			return *this;
+		}
+
+		uint_n& operator>>=(const int n){
+			const int q = n/64, m = n%64;
+			for(int k=W-1;k>=0;k--){
+				const int l = k-q;
+				uint64_t v = 0;
+				if(l >= 0){
+					v = (m ? (w[l] >> m) : w[l]);
+					if(m && l-1 >= 0){v |= (w[l-1] << (64-m));}
+				}
+				w[k] = v;
+			}
+			return *this;
+		}
+
+		// arithmetic
+		uint_n& operator+=(const uint_n &b){
+			uint64_t carry = 0;
+			for(int k=W-1;k>=0;k--){
+				const uint64_t s = w[k] + b.w[k];
+				const uint64_t c = (s < w[k]);
+				w[k] = s + carry;
+				carry = c | (w[k] < s);
+			}
+			return *this;
+		}
+
+		uint_n& operator-=(const uint_n &b){
+			uint64_t borrow = 0;
+			for(int k=W-1;k>=0;k--){
+				const uint64_t d = w[k] - b.w[k];
+				const uint64_t c = (w[k] < b.w[k]);
+				w[k] = d - borrow;
+				borrow = c | (d < borrow);
+			}
+			return *this;
+		}
+
+		uint_n operator-() const {
+			uint_n r;
+			r -= *this;
+			return r;
+		}
+
+		uint_n& operator/=(const uint_n &b){
+			// shift for powers of two (the only case needed by next_state_pcon), long division otherwise.
+			if(b == 0){return *this;}
+
+			if((b & (b - 1)) == 0){
+				return *this >>= b.ctz();
+			}
+
+			uint_n q,r;
+			for(int i=64*W-1;i>=0;i--){
+				r <<= 1;
+				r.w[W-1] |= ((w[W-1-i/64] >> (i%64)) & 1);
+				if(r >= b){
+					r -= b;
+					q.w[W-1-i/64] |= (uint64_t(1) << (i%64));
+				}
+			}
+			return *this = q;
+		}
+
+		int ctz() const {
+			// number of trailing zero bits, 64*W for zero.
+			for(int k=W-1;k>=0;k--){
+				if(w[k]){return 64*(W-1-k) + ctz_64(w[k]);}
+			}
+			return 64*W;
+		}
+
+		uint_n operator&(const uint_n &b) const {return uint_n(*this) &= b;}
+		uint_n operator|(const uint_n &b) const {return uint_n(*this) |= b;}
+		uint_n operator^(const uint_n &b) const {return uint_n(*this) ^= b;}
+		uint_n operator+(const uint_n &b) const {return uint_n(*this) += b;}
+		uint_n operator-(const uint_n &b) const {return uint_n(*this) -= b;}
+		uint_n operator/(const uint_n &b) const {return uint_n(*this) /= b;}
+		uint_n operator<<(const int n) const {return uint_n(*this) <<= n;}
+		uint_n operator>>(const int n) const {return uint_n(*this) >>= n;}
+};
+
+typedef uint_n<2> uint128;
+typedef uint_n<4> uint256;
+
+
+// lowest bits of a state as an index (e.g. into the bins of the state_index table).
+template<class I>
+inline npy_intp state_to_intp(const I s){
+	return (npy_intp)s;
+}
+
+template<int W>
+inline npy_intp state_to_intp(const uint_n<W> &s){
+	return (npy_intp)s.w[W-1];
+}
+
+
+#endif
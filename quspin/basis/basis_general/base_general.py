@@ -1,9 +1,63 @@
 import numpy as _np
 import scipy.sparse as _sp
+from scipy.sparse.csgraph import connected_components
+from numpy.linalg import eigvalsh
 import os
-from ..lattice import lattice_basis
+import hashlib
+from ..lattice import lattice_basis,_state_to_int
+from ..base import _op_key,_op_set
 import warnings
 
+# maximum number of orbit states enumerated at once in the partial trace.
+_MAX_ORBIT_CHUNK = 2**22
+
+def _eigvalsh_blocks(rdm):
+	# eigenvalues (in descending order) of the sparse hermitian matrix `rdm`. The blocks given by the connected 
+	# components of its sparsity pattern (e.g. the particle number sectors of a subsystem) are diagonalised 
+	# separately, such that only the largest block is stored as a dense array.
+	rdm = _sp.csr_matrix(rdm)
+	pattern = _sp.csr_matrix((_np.ones(rdm.nnz),rdm.indices,rdm.indptr),shape=rdm.shape)
+	n_blocks,labels = connected_components(pattern,directed=False)
+
+	sizes = _np.bincount(labels,minlength=n_blocks)
+	order = _np.argsort(labels,kind="stable")
+	offsets = _np.cumsum(sizes)-sizes
+
+	p = [rdm.diagonal()[sizes[labels]==1].real]
+	for b in _np.flatnonzero(sizes>1):
+		block = order[offsets[b]:offsets[b]+sizes[b]]
+		p.append(eigvalsh(rdm[block][:,block].toarray()))
+
+	return _np.sort(_np.concatenate(p))[::-1]
+
+# directory of the on-disk basis cache, `None` disables the cache.
+_basis_cache_dir = None
+
+def set_basis_cache(cache_dir=None):
+	"""Enables (or disables) the on-disk cache for the states of the `..._basis_general` classes.
+
+	Notes
+	-----
+	The cache is keyed by the basis class, the number of sites, the particle sector(s), the on-site 
+	Hilbert space dimension and the symmetry maps with their quantum numbers. The basis states, their 
+	normalisations and (if present) particle numbers are stored as `.npy` files in `cache_dir`. 
+	A cached basis is loaded as copy-on-write memory maps, so that processes on the same node which 
+	build the same basis share the pages of the files instead of holding private copies.
+
+	Parameters
+	-----------
+	cache_dir : str, optional
+		directory to store the cached basis in, created if it does not exist. If `None` the cache is disabled.
+
+	"""
+	global _basis_cache_dir
+	if cache_dir is not None:
+		cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+		if not os.path.isdir(cache_dir):
+			os.makedirs(cache_dir)
+
+	_basis_cache_dir = cache_dir
+
 class GeneralBasisWarning(Warning):
 	pass
 
@@ -71,10 +125,20 @@ def check_symmetry_maps(item1,item2):
 	if not _np.array_equal(sites1,sites2):
 		warnings.warn("using non-commuting symmetries can lead to unwanted behaviour of general basis, make sure that quantum numbers are invariant under non-commuting symmetries!",GeneralBasisWarning,stacklevel=5)
 
+def _states_array(states,basis):
+	# the integers `states` in the storage format of `basis`: 1-dim array for N <= 64, otherwise
+	# array of shape (len(states),words) of 64-bit words, most significant word first.
+	if basis.ndim == 1:
+		return _np.array(states,dtype=basis.dtype)
+
+	n_words = basis.shape[1]
+	return _np.array([[(s >> (64*(n_words-k-1))) & 0xffffffffffffffff for k in range(n_words)] for s in states],dtype=basis.dtype)
+
 class basis_general(lattice_basis):
 	def __init__(self,N,**kwargs):
 		self._unique_me = True
 		self._check_pcon = None
+		self._state_index = None
 
 		if self.__class__ is basis_general:
 			raise TypeError("general_basis class is not to be instantiated.")
@@ -167,13 +231,185 @@ class basis_general(lattice_basis):
 		return string
 
 
+	@classmethod
+	def count_states(cls,*args,**kwargs):
+		"""Counts the number of states of the basis without constructing it.
+
+		Notes
+		-----
+		The states are enumerated and checked against the symmetries in the low-level code, but not stored. 
+		This is useful to estimate the memory requirements of a calculation ahead of time.
+
+		Examples
+		--------
+
+		>>> Ns = spin_basis_general.count_states(N,Nup=N//2,kblock=(T,0))
+
+		Parameters
+		-----------
+		*args, **kwargs:
+			same arguments as the constructor of the basis class.
+
+		Returns
+		--------
+		int
+			number of states in the (symmetry-reduced) basis.
+
+		"""
+		return cls(*args,_count_states=True,**kwargs).Ns
+
 	def _reduce_n_dtype(self):
 		if len(self._n)>0:
 			self._n_dtype = _np.min_scalar_type(self._n.max())
-			self._n = self._n.astype(self._n_dtype)
+			self._n = self._n.astype(self._n_dtype,copy=False)
 
-	def _Op(self,opstr,indx,J,dtype):
+	def _basis_cache_file(self,Np,count_particles):
+		if _basis_cache_dir is None:
+			return None
+
+		if Np is not None and type(Np) is not int:
+			Np = sorted(tuple(_np.atleast_1d(Np_sector).tolist()) for Np_sector in Np)
+
+		key = repr((self.__class__.__name__,self._core.__class__.__name__,self._N,self._sps,Np,count_particles,
+					self._maps.tolist(),self._pers.tolist(),self._qs.tolist()))
+		key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+		return os.path.join(_basis_cache_dir,"basis_"+key)
+
+	def _make_basis(self,basis_type,Np,Ns=None,count_particles=False,count_only=False):
+		# constructs the basis with the low-level code (or loads it from the on-disk cache),
+		# sets `_Ns`, `_basis`, `_n` and, if `count_particles`, `_Np_list`. If `Ns` is None 
+		# the exact size of the basis is obtained from a counting pass before the basis is 
+		# allocated, otherwise `Ns` is used as an upper bound for the size of the basis.
+		if count_only:
+			self._Ns = (self._core.count_basis(Np) if Ns is None else Ns)
+			self._basis = _np.zeros(0,dtype=basis_type)
+			self._n = _np.zeros(0,dtype=self._n_dtype)
+			return
+
+		cache_file = self._basis_cache_file(Np,count_particles)
+		names = ["basis","n"]+(["Np_list"] if count_particles else [])
+
+		if cache_file is not None and all(os.path.isfile(cache_file+"_"+name+".npy") for name in names):
+			self._basis = _np.load(cache_file+"_basis.npy",mmap_mode="c")
+			self._n = _np.load(cache_file+"_n.npy",mmap_mode="c")
+			if count_particles:
+				self._Np_list = _np.load(cache_file+"_Np_list.npy",mmap_mode="c")
+
+			self._Ns = self._basis.shape[0]
+			return
+
+		if Ns is None:
+			Ns = self._core.count_basis(Np)
+
+		basis = _np.zeros(max(Ns,1),dtype=basis_type)
+		n = _np.zeros(max(Ns,1),dtype=self._n_dtype)
+
+		if count_particles:
+			Np_list = _np.zeros(basis.shape[0],dtype=_np.uint8)
+			self._Ns = self._core.make_basis(basis,n,Np=Np,count=Np_list)
+		else:
+			self._Ns = self._core.make_basis(basis,n,Np=Np)
+
+		if self._Ns < 0:
+			raise ValueError("'Ns_block_est' is smaller than the size of the reduced Hilbert-space, please double check that transformation mappings are correct or do not use 'Ns_block_est' to get the exact size of the block.")
+
+		# the low-level code returns each particle sector sorted in descending order, 
+		# only several sectors have to be merged.
+		if Np is None or type(Np) is int:
+			if basis.shape[0] != self._Ns:
+				basis = basis[:self._Ns].copy()
+				n = n[:self._Ns].copy()
+				if count_particles:
+					Np_list = Np_list[:self._Ns].copy()
+
+			self._basis = basis
+			self._n = n
+			if count_particles:
+				self._Np_list = Np_list
+		else:
+			if basis.ndim > 1: # multi-word states, the most significant word is the primary key.
+				ind = _np.lexsort(basis[:self._Ns].T[::-1])[::-1]
+			else:
+				ind = _np.argsort(basis[:self._Ns],kind="mergesort")[::-1]
+			self._basis = basis[ind]
+			self._n = n[ind]
+			if count_particles:
+				self._Np_list = Np_list[ind]
+
+		if cache_file is not None:
+			self._reduce_n_dtype()
+			for name in names:
+				# write to a temporary file first such that other processes never load a partial file.
+				tmp_file = "{}_{}.{}.tmp.npy".format(cache_file,name,os.getpid())
+				_np.save(tmp_file,getattr(self,"_"+name))
+				os.rename(tmp_file,cache_file+"_"+name+".npy")
+
+	def _get_state_index(self):
+		# two-level lookup table used by the low-level code to find the position of a state in the basis:
+		# the states are binned by their leading bits (about 4 states per bin), such that a lookup only
+		# has to search the short range of positions of its bin instead of the full basis. The table is 
+		# built once and rebuilt only if `_basis` is replaced.
+		if self._state_index is None or self._state_index[0] is not self._basis:
+			if self._Ns > 0:
+				s_max = _state_to_int(self._basis[0])
+				shift = max(s_max.bit_length()-max(int(self._Ns).bit_length()-2,1),0)
+				table = _np.zeros((s_max>>shift)+2,dtype=_np.intp)
+				self._core.make_state_index(self._basis,shift,table)
+			else:
+				shift = 0
+				table = _np.zeros(2,dtype=_np.intp)
+
+			self._state_index = (self._basis,table,shift)
+
+		return self._state_index[1:]
+
+	def index(self,s):
+		"""Finds the index of user-defined Fock state in general basis.
+
+		Notes
+		-----
+		Particularly useful for defining initial Fock states through a unit vector in the direction specified
+		by `index()`. 
+
+		Parameters
+		-----------
+		s : {str, int}
+			Defines the Fock state with number of particles (spins) per site in underlying lattice `basis`.
+
+		Returns
+		--------
+		int
+			Position of the Fock state in the lattice basis.
+
+		Examples
+		--------
+		
+		>>> i0 = index("111000") # pick state from basis set
+		>>> print(basis)
+		>>> print(i0)
+		>>> psi = np.zeros(basis.Ns,dtype=np.float64)
+		>>> psi[i0] = 1.0 # define state corresponding to the string "111000"
+
+		"""
+		if type(s) is int:
+			pass
+		elif type(s) is str:
+			s = int(s,self.sps)
+		else:
+			raise ValueError("s must be integer or state")
+
+		if self._Ns > 0 and 0 <= s <= _state_to_int(self._basis[0]):
+			states = _states_array([s],self._basis)
+			indx = _np.zeros(1,dtype=_np.intp)
+			table,shift = self._get_state_index()
+			self._core.find_states(self._basis,table,shift,states,indx)
+			if indx[0] >= 0:
+				return int(indx[0])
+
+		raise ValueError("s must be representive state in basis. ")
 
+	def _check_Op(self,opstr,indx):
 		indx = _np.asarray(indx,dtype=_np.int32)
 
 		if len(opstr) != len(indx):
@@ -186,6 +422,12 @@ class basis_general(lattice_basis):
 		if extra_ops:
 			raise ValueError("unrecognized characters {} in operator string.".format(extra_ops))
 
+		return indx
+
+	def _Op(self,opstr,indx,J,dtype):
+
+		indx = self._check_Op(opstr,indx)
+
 		if self._Ns <= 0:
 			return _np.array([],dtype=dtype),_np.array([],dtype=self._index_type),_np.array([],dtype=self._index_type)
 	
@@ -193,7 +435,7 @@ class basis_general(lattice_basis):
 		row = _np.zeros(self._Ns,dtype=self._index_type)
 		ME = _np.zeros(self._Ns,dtype=dtype)
 
-		self._core.op(row,col,ME,opstr,indx,J,self._basis,self._n)
+		self._core.op(row,col,ME,opstr,indx,J,self._basis,self._n,*self._get_state_index())
 
 		mask = _np.logical_not(_np.logical_or(_np.isnan(ME),_np.abs(ME)==0.0))
 		col = col[mask]
@@ -202,6 +444,86 @@ class basis_general(lattice_basis):
 
 		return ME,row,col	
 
+	def inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=False,conjugated=False,v_out=None):
+		# matrix-free implementation: the matrix elements are calculated on the fly in the 
+		# low-level code and added directly to v_out.
+		indx = self._check_Op(opstr,indx)
+
+		if v_in.__class__ not in [_np.ndarray, _np.matrix]:
+			v_in = _np.asanyarray(v_in)
+
+		if v_in.shape[0] != self.Ns:
+			raise ValueError("dimension mismatch")
+
+		if v_out is None:
+			result_dtype = _np.result_type(v_in.dtype,dtype)
+			v_out = _np.zeros_like(v_in,dtype=result_dtype)
+		else:
+			if v_out.__class__ not in [_np.ndarray, _np.matrix]:
+				v_out = _np.asanyarray(v_out)
+
+			if v_out.shape != v_in.shape:
+				raise ValueError("v_in.shape != v_out.shape")
+
+		if v_out.dtype not in [_np.float32,_np.float64,_np.complex64,_np.complex128]:
+			return lattice_basis.inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=transposed,
+												conjugated=conjugated,v_out=v_out)
+
+		if self._Ns <= 0 or v_in.size == 0:
+			return v_out
+
+		out = _np.asarray(v_out)
+		if out.flags["C_CONTIGUOUS"]:
+			out_c = out.reshape((self._Ns,-1))
+		else:
+			out_c = _np.ascontiguousarray(out).reshape((self._Ns,-1))
+
+		v_in_c = _np.ascontiguousarray(v_in,dtype=out.dtype).reshape((self._Ns,-1))
+
+		self._core.inplace_op(v_in_c,out_c,conjugated,transposed,opstr,indx,J,self._basis,self._n,*self._get_state_index())
+
+		if not out.flags["C_CONTIGUOUS"]:
+			out[...] = out_c.reshape(out.shape)
+
+		return v_out
+
+	def _Op_csr(self,terms,dtype):
+		# builds the sum of all terms in a single call to the low-level code: the first pass counts 
+		# the number of matrix elements per column, the second pass fills the compressed columns.
+		if self._Ns <= 0 or len(terms) == 0:
+			return None
+
+		opstrs = []
+		indxs = []
+		Js = []
+		for opstr,indx,J in terms:
+			indxs.append(self._check_Op(opstr,indx))
+			opstrs.append(opstr)
+			Js.append(J)
+
+		n_ops = _np.array([len(opstr) for opstr in opstrs],dtype=_np.int32)
+		if n_ops.sum() == 0:
+			return None
+
+		opstr = "".join(opstrs)
+		indx = _np.hstack(indxs).astype(_np.int32)
+		J = _np.asarray(Js,dtype=_np.complex128)
+
+		if self._Ns*len(terms) < _np.iinfo(_np.int32).max:
+			index_type = _np.int32
+		else:
+			index_type = _np.int64
+
+		indptr = _np.zeros(self._Ns+1,dtype=index_type)
+		self._core.op_csr_count(indptr,opstr,indx,n_ops,J,self._basis,self._n,*self._get_state_index())
+		_np.cumsum(indptr,out=indptr)
+
+		indices = _np.zeros(indptr[-1],dtype=index_type)
+		data = _np.zeros(indptr[-1],dtype=dtype)
+		self._core.op_csr(indptr,indices,data,opstr,indx,n_ops,J,self._basis,self._n,*self._get_state_index())
+
+		return _sp.csc_matrix((data,indices,indptr),shape=(self._Ns,self._Ns)).tocsr()
+
 	def get_proj(self,dtype):
 		"""Calculates transformation/projector from symmetry-reduced basis to full (symmetry-free) basis.
 
@@ -229,6 +551,9 @@ class basis_general(lattice_basis):
 		>>> print(P.shape)
 
 		"""
+		if self._basis.ndim > 1:
+			raise ValueError("the full H-space representation is not available for N > 64 sites.")
+
 		c = _np.ones_like(self._basis,dtype=dtype)
 		sign = _np.ones_like(self._basis,dtype=_np.int8)
 		c[:] = self._n[:]
@@ -270,6 +595,9 @@ class basis_general(lattice_basis):
 
 		"""
 
+		if self._basis.ndim > 1:
+			raise ValueError("the full H-space representation is not available for N > 64 sites.")
+
 		if not hasattr(v0,"shape"):
 			v0 = _np.asanyarray(v0)
 
@@ -311,6 +639,138 @@ class basis_general(lattice_basis):
 			else:
 				return v_out	
 
+	def _get_site_digits(self,states,sites):
+		# calculates the index in the local Hilbert space of `sites` for the full basis states `states`
+		# using the same ordering as the full basis vector returned by `get_vec`.
+		Ns_full = self._sps**self._N
+		s = _np.array(Ns_full-1,dtype=states.dtype) - states
+		sps = _np.array(self._sps,dtype=states.dtype)
+		index = _np.zeros(states.shape,dtype=_np.min_scalar_type(self._sps**len(sites)))
+		for j in sites:
+			digit = (s // _np.array(self._sps**(self._N-j-1),dtype=states.dtype)) % sps
+			index *= self._sps
+			index += digit.astype(index.dtype)
+
+		return index
+
+	def _reshape_pure_sparse(self,state,sub_sys_A):
+		# builds the sparse matrices psi[a,b] (with a and b labeling the states in subsystems A and B)
+		# for the states stored in the columns of `state` directly from the symmetry-reduced basis. 
+		# The orbits of the representative states are enumerated in chunks such that the full 
+		# H-space representation of the state is never stored.
+		if self._basis.ndim > 1:
+			raise ValueError("the reduced density matrix is not available for N > 64 sites.")
+
+		if state.ndim == 1:
+			state = state.reshape((-1,1))
+
+		sub_sys_B = [i for i in range(self._N) if i not in sub_sys_A]
+		Ns_A = self._sps**len(sub_sys_A)
+		Ns_B = self._sps**len(sub_sys_B)
+		n_vec = state.shape[1]
+
+		n_orbit = int(self._pers.prod())
+		chunk = max(1,_MAX_ORBIT_CHUNK//n_orbit)
+
+		# the matrix elements keep the precision of `state`, they are only complex if the state or the 
+		# coefficients of the orbit are.
+		real_dtype = _np.result_type(state.dtype,_np.float32)
+		complex_dtype = _np.result_type(real_dtype,_np.complex64)
+		if Ns_A*Ns_B <= _np.iinfo(_np.int32).max:
+			index_dtype = _np.int32
+		else:
+			index_dtype = _np.intp
+
+		# each chunk is converted to csr (summing the duplicate entries) and added to the result such that 
+		# only the COO triplets of a single chunk are stored at any time.
+		psi = [_sp.csr_matrix((Ns_A,Ns_B),dtype=real_dtype) for i in range(n_vec)]
+
+		for start in range(0,self._Ns,chunk):
+			stop = min(start+chunk,self._Ns)
+
+			states = _np.zeros((stop-start)*n_orbit,dtype=self._basis.dtype)
+			coeff = _np.zeros((stop-start)*n_orbit,dtype=_np.complex128)
+			self._core.get_vec_orbit(self._basis[start:stop],self._n[start:stop],states,coeff)
+
+			if _np.any(coeff.imag):
+				coeff = coeff.astype(complex_dtype)
+			else:
+				coeff = coeff.real.astype(real_dtype)
+
+			row = self._get_site_digits(states,sub_sys_A).astype(index_dtype)
+			col = self._get_site_digits(states,sub_sys_B).astype(index_dtype)
+			del states
+
+			v = _np.repeat(state[start:stop],n_orbit,axis=0)
+			for i in range(n_vec):
+				psi[i] = psi[i] + _sp.csr_matrix((coeff*v[:,i],(row,col)),shape=(Ns_A,Ns_B))
+
+			del row,col,v
+
+		return psi
+
+	def _partial_trace_pure(self,state,sub_sys_A,return_rdm="A"):
+		# partial trace of pure states calculated without constructing the full H-space representation.
+		psi = self._reshape_pure_sparse(state,sub_sys_A)
+
+		rdm_A,rdm_B = None,None
+		if return_rdm in ["A","both"]:
+			rdm_A = _np.squeeze(_np.stack([v.dot(v.conj().T).toarray() for v in psi]))
+
+		if return_rdm in ["B","both"]:
+			rdm_B = _np.squeeze(_np.stack([v.conj().T.dot(v).toarray() for v in psi]))
+
+		return rdm_A,rdm_B
+
+	def _p_pure(self,state,sub_sys_A,return_rdm=None):
+		# the eigenvalues of the reduced DM are calculated from the smaller of the two subsystems
+		# instead of the SVD of the dense reshaped state. The reduced DM is kept sparse and diagonalised
+		# block by block, it is only converted to a dense array if it is returned.
+		psi = self._reshape_pure_sparse(state,sub_sys_A)
+
+		p_list,rdm_A_list,rdm_B_list = [],[],[]
+		for v in psi:
+			rdm_A = None
+			rdm_B = None
+
+			if return_rdm in ["A","both"] or v.shape[0] <= v.shape[1]:
+				rdm_A = v.dot(v.conj().T)
+
+			if return_rdm in ["B","both"] or v.shape[0] > v.shape[1]:
+				rdm_B = v.conj().T.dot(v)
+
+			if v.shape[0] <= v.shape[1]:
+				p = _eigvalsh_blocks(rdm_A)
+			else:
+				p = _eigvalsh_blocks(rdm_B)
+
+			if return_rdm in ["A","both"]:
+				rdm_A = rdm_A.toarray()
+
+			if return_rdm in ["B","both"]:
+				rdm_B = rdm_B.toarray()
+
+			p_list.append(_np.maximum(p,0))
+			rdm_A_list.append(rdm_A)
+			rdm_B_list.append(rdm_B)
+
+		p = _np.stack(p_list)
+		if state.ndim == 1:
+			p = p[0]
+
+		rdm_A,rdm_B = None,None
+		if return_rdm in ["A","both"]:
+			rdm_A = _np.stack(rdm_A_list)
+			if state.ndim == 1:
+				rdm_A = rdm_A[0]
+
+		if return_rdm in ["B","both"]:
+			rdm_B = _np.stack(rdm_B_list)
+			if state.ndim == 1:
+				rdm_B = rdm_B[0]
+
+		return p + _np.finfo(p.dtype).eps, rdm_A, rdm_B
+
 	def _check_symm(self,static,dynamic,photon_basis=None):
 		if photon_basis is None:
 			basis_sort_opstr = self._sort_opstr
@@ -337,6 +797,7 @@ class basis_general(lattice_basis):
 
 
 def _check_symm_map(map,sort_opstr,operator_list):
+	op_set = _op_set(operator_list)
 	missing_ops=[]
 	odd_ops=[]
 	for op in operator_list:
@@ -361,7 +822,7 @@ def _check_symm_map(map,sort_opstr,operator_list):
 		new_op[2] = J
 
 		new_op = sort_opstr(new_op)
-		if not (new_op in operator_list):
+		if not (_op_key(new_op) in op_set):
 			missing_ops.append(new_op)
 
 	return odd_ops,missing_ops
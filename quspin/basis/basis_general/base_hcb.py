@@ -1,11 +1,10 @@
-from ._basis_general_core import hcb_basis_core_wrap_32,hcb_basis_core_wrap_64
 from .base_general import basis_general
 import numpy as _np
 from scipy.misc import comb
 
 # general basis for hardcore bosons/spin-1/2
 class hcb_basis_general(basis_general):
-	def __init__(self,N,Nb=None,Ns_block_est=None,_Np=None,**kwargs):
+	def __init__(self,N,Nb=None,Ns_block_est=None,_Np=None,_count_states=False,**kwargs):
 		basis_general.__init__(self,N,**kwargs)
 		self._check_pcon = False
 		count_particles = False
@@ -42,54 +41,39 @@ class hcb_basis_general(basis_general):
 
 		if len(self._pers)>0:
 			if Ns_block_est is None:
-				Ns = int(float(Ns)/_np.multiply.reduce(self._pers))*2
+				Ns = None # exact size from counting pass
 			else:
 				if type(Ns_block_est) is not int:
 					raise TypeError("Ns_block_est must be integer value.")
 					
 				Ns = Ns_block_est
 
-		Ns = max(Ns,1000)
+		from ._basis_general_core.hcb_core import hcb_basis_core_wrap_32,hcb_basis_core_wrap_64,hcb_basis_core_wrap_128,hcb_basis_core_wrap_256
 
 		if N<=32:
-			basis = _np.zeros(Ns,dtype=_np.uint32)
-			n     = _np.zeros(Ns,dtype=self._n_dtype)
+			basis_type = _np.uint32
 			self._core = hcb_basis_core_wrap_32(N,self._maps,self._pers,self._qs)
 		elif N<=64:
-			basis = _np.zeros(Ns,dtype=_np.uint64)
-			n     = _np.zeros(Ns,dtype=self._n_dtype)
+			basis_type = _np.uint64
 			self._core = hcb_basis_core_wrap_64(N,self._maps,self._pers,self._qs)
-		else:
-			raise ValueError("system size N must be <=64.")
-
-		self._sps=2
-		if count_particles and (Nb is not None):
-			Np_list = _np.zeros_like(basis,dtype=_np.uint8)
-			self._Ns = self._core.make_basis(basis,n,Np=Nb,count=Np_list)
-			if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-			basis,ind = _np.unique(basis,return_index=True)
-			if self.Ns != basis.shape[0]:
-				basis = basis[1:]
-				ind = ind[1:]
+		elif N<=256:
+			# states are stored as 2 or 4 64-bit words, the basis is an array of shape (Ns,words).
+			if Nb is None:
+				raise ValueError("for system size N > 64 the particle number Nb must be specified.")
 
-			self._basis = basis[::-1].copy()
-			self._n = n[ind[::-1]].copy()
-			self._Np_list = Np_list[ind[::-1]].copy()
+			if N<=128:
+				basis_type = _np.dtype((_np.uint64,(2,)))
+				self._core = hcb_basis_core_wrap_128(N,self._maps,self._pers,self._qs)
+			else:
+				basis_type = _np.dtype((_np.uint64,(4,)))
+				self._core = hcb_basis_core_wrap_256(N,self._maps,self._pers,self._qs)
 		else:
-			self._Ns = self._core.make_basis(basis,n,Np=Nb)
-			if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-			basis,ind = _np.unique(basis,return_index=True)
-			if self.Ns != basis.shape[0]:
-				basis = basis[1:]
-				ind = ind[1:]
-			self._basis = basis[::-1].copy()
-			self._n = n[ind[::-1]].copy()
+			raise ValueError("system size N must be <=256.")
 
+		self._sps=2
 		self._N = N
+		self._make_basis(basis_type,Nb,Ns,count_particles=(count_particles and (Nb is not None)),count_only=_count_states)
+
 		self._index_type = _np.min_scalar_type(-self._Ns)
 		self._allowed_ops=set(["I","x","y","z","+","-","n"])
 		self._reduce_n_dtype()
@@ -1,4 +1,3 @@
-from ._basis_general_core import higher_spin_basis_core_wrap_32,higher_spin_basis_core_wrap_64
 from .base_general import basis_general
 from .boson import H_dim,get_basis_type
 import numpy as _np
@@ -8,7 +7,7 @@ from scipy.misc import comb
 
 # general basis for higher spin representations
 class higher_spin_basis_general(basis_general):
-	def __init__(self,N,Nup=None,sps=None,Ns_block_est=None,_Np=None,**kwargs):
+	def __init__(self,N,Nup=None,sps=None,Ns_block_est=None,_Np=None,_count_states=False,**kwargs):
 		basis_general.__init__(self,N,**kwargs)
 		self._check_pcon = False
 		count_particles = False
@@ -53,7 +52,7 @@ class higher_spin_basis_general(basis_general):
 
 		if len(self._pers)>0:
 			if Ns_block_est is None:
-				Ns = int(float(Ns)/_np.multiply.reduce(self._pers))*sps
+				Ns = None # exact size from counting pass
 			else:
 				if type(Ns_block_est) is not int:
 					raise TypeError("Ns_block_est must be integer value.")
@@ -62,48 +61,19 @@ class higher_spin_basis_general(basis_general):
 
 				Ns = Ns_block_est
 
-		Ns = max(Ns,1000)
+		from ._basis_general_core.higher_spin_core import higher_spin_basis_core_wrap_32,higher_spin_basis_core_wrap_64
+
 		if basis_type==_np.uint32:
-			basis = _np.zeros(Ns,dtype=_np.uint32)
-			n     = _np.zeros(Ns,dtype=self._n_dtype)
 			self._core = higher_spin_basis_core_wrap_32(N,sps,self._maps,self._pers,self._qs)
 		elif basis_type==_np.uint64:
-			basis = _np.zeros(Ns,dtype=_np.uint64)
-			n     = _np.zeros(Ns,dtype=self._n_dtype)
 			self._core = higher_spin_basis_core_wrap_64(N,sps,self._maps,self._pers,self._qs)
 		else:
 			raise ValueError("states can't be represented as 64-bit unsigned integer")
 
 		self._sps=sps
-		if count_particles and (Nup is not None):
-			Np_list = _np.zeros_like(basis,dtype=_np.uint8)
-			self._Ns = self._core.make_basis(basis,n,Np=Nup,count=Np_list)
-			if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-			basis,ind = _np.unique(basis,return_index=True)
-			if self.Ns != basis.shape[0]:
-				basis = basis[1:]
-				ind = ind[1:]
-
-			self._basis = basis[::-1].copy()
-			self._n = n[ind[::-1]].copy()
-			self._Np_list = Np_list[ind[::-1]].copy()
-		else:
-
-			self._Ns = self._core.make_basis(basis,n,Np=Nup)
-			if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-			basis,ind = _np.unique(basis,return_index=True)
-			if self.Ns != basis.shape[0]:
-				basis = basis[1:]
-				ind = ind[1:]
-				
-			self._basis = basis[::-1].copy()
-			self._n = n[ind[::-1]].copy()
-
 		self._N = N
+		self._make_basis(basis_type,Nup,Ns,count_particles=(count_particles and (Nup is not None)),count_only=_count_states)
+
 		self._index_type = _np.min_scalar_type(-self._Ns)
 		self._allowed_ops=set(["I","z","+","-"])
 		self._reduce_n_dtype()
@@ -1,4 +1,3 @@
-from ._basis_general_core import boson_basis_core_wrap_32,boson_basis_core_wrap_64
 from .base_hcb import hcb_basis_general
 from .base_general import basis_general
 import numpy as _np
@@ -111,7 +110,7 @@ class boson_basis_general(hcb_basis_general,basis_general):
 		sps: int, optional
 			Number of states per site (including zero bosons), or on-site Hilbert space dimension.
 		Ns_block_est: int, optional
-			Overwrites the internal estimate of the size of the reduced Hilbert space for the given symmetries. This can be used to help conserve memory if the exact size of the H-space is known ahead of time. 
+			Upper bound for the size of the reduced Hilbert space for the given symmetries. If not given, the exact size is obtained by counting the states before the basis is constructed; giving an upper bound skips this counting pass.
 		**blocks: optional
 			keyword arguments which pass the symmetry generator arrays. For instance:
 
@@ -127,6 +126,8 @@ class boson_basis_general(hcb_basis_general,basis_general):
 		if _Np is not None:
 			blocks.pop("_Np")
 
+		_count_states = blocks.pop("_count_states",False)
+
 		if sps is None:
 
 			if Nb is not None:
@@ -165,7 +166,7 @@ class boson_basis_general(hcb_basis_general,basis_general):
 								"\n\tn: number operator"+
 								"\n\tz: c-symm number operator")
 
-			hcb_basis_general.__init__(self,N,Nb=Nb,_Np=_Np,**blocks)
+			hcb_basis_general.__init__(self,N,Nb=Nb,Ns_block_est=Ns_block_est,_Np=_Np,_count_states=_count_states,**blocks)
 		
 		else:
 
@@ -214,7 +215,7 @@ class boson_basis_general(hcb_basis_general,basis_general):
 
 			if len(self._pers)>0:
 				if Ns_block_est is None:
-					Ns = int(float(Ns)/_np.multiply.reduce(self._pers))*sps
+					Ns = None # exact size from counting pass
 				else:
 					if type(Ns_block_est) is not int:
 						raise TypeError("Ns_block_est must be integer value.")
@@ -222,46 +223,18 @@ class boson_basis_general(hcb_basis_general,basis_general):
 						raise ValueError("Ns_block_est must be an integer > 0")						
 					Ns = Ns_block_est
 
-			Ns = max(Ns,1000)
+			from ._basis_general_core.boson_core import boson_basis_core_wrap_32,boson_basis_core_wrap_64
 
 			if basis_type==_np.uint32:
-				basis = _np.zeros(Ns,dtype=_np.uint32)
-				n     = _np.zeros(Ns,dtype=self._n_dtype)
 				self._core = boson_basis_core_wrap_32(N,self._sps,self._maps,self._pers,self._qs)
 			elif basis_type==_np.uint64:
-				basis = _np.zeros(Ns,dtype=_np.uint64)
-				n     = _np.zeros(Ns,dtype=self._n_dtype)
 				self._core = boson_basis_core_wrap_64(N,self._sps,self._maps,self._pers,self._qs)
 			else:
 				raise ValueError("states can't be represented as 64-bit unsigned integer")
 
-			if count_particles and (Nb_list is not None):
-				Np_list = _np.zeros_like(basis,dtype=_np.uint8)
-				self._Ns = self._core.make_basis(basis,n,Np=Nb,count=Np_list)
-				if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-				basis,ind = _np.unique(basis,return_index=True)
-				if self.Ns != basis.shape[0]:
-					basis = basis[1:]
-					ind = ind[1:]
-
-				self._basis = basis[::-1].copy()
-				self._n = n[ind[::-1]].copy()
-				self._Np_list = Np_list[ind[::-1]].copy()
-			else:
-				self._Ns = self._core.make_basis(basis,n,Np=Nb)
-				if self._Ns < 0:
-					raise ValueError("estimate for size of reduced Hilbert-space is too low, please double check that transformation mappings are correct or use 'Ns_block_est' argument to give an upper bound of the block size.")
-
-				basis,ind = _np.unique(basis,return_index=True)
-				if self.Ns != basis.shape[0]:
-					basis = basis[1:]
-					ind = ind[1:]
-				self._basis = basis[::-1].copy()
-				self._n = n[ind[::-1]].copy()
-
 			self._N = N
+			self._make_basis(basis_type,Nb,Ns,count_particles=(count_particles and (Nb is not None)),count_only=_count_states)
+
 			self._index_type = _np.min_scalar_type(-self._Ns)
 
 			self._reduce_n_dtype()
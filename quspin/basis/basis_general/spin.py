@@ -74,7 +74,7 @@ class spin_basis_general(hcb_basis_general,higher_spin_basis_general):
 		pauli: bool, optional
 			Whether or not to use Pauli or spin-1/2 operators. Requires `S=1/2`.
 		Ns_block_est: int, optional
-			Overwrites the internal estimate of the size of the reduced Hilbert space for the given symmetries. This can be used to help conserve memory if the exact size of the H-space is known ahead of time. 
+			Upper bound for the size of the reduced Hilbert space for the given symmetries. If not given, the exact size is obtained by counting the states before the basis is constructed; giving an upper bound skips this counting pass.
 		**blocks: optional
 			keyword arguments which pass the symmetry generator arrays. For instance:
 
@@ -94,6 +94,8 @@ class spin_basis_general(hcb_basis_general,higher_spin_basis_general):
 		if _Np is not None:
 			blocks.pop("_Np")
 
+		_count_states = blocks.pop("_count_states",False)
+
 		if Nup is not None and m is not None:
 			raise ValueError("Cannot use Nup and m at the same time")
 		if m is not None and Nup is None:
@@ -103,9 +105,9 @@ class spin_basis_general(hcb_basis_general,higher_spin_basis_general):
 			Nup = int((m+S)*N)
 
 		if sps==2:
-			hcb_basis_general.__init__(self,N,Nb=Nup,Ns_block_est=Ns_block_est,_Np=_Np,**blocks)
+			hcb_basis_general.__init__(self,N,Nb=Nup,Ns_block_est=Ns_block_est,_Np=_Np,_count_states=_count_states,**blocks)
 		else:
-			higher_spin_basis_general.__init__(self,N,Nup=Nup,sps=sps,Ns_block_est=Ns_block_est,_Np=_Np,**blocks)
+			higher_spin_basis_general.__init__(self,N,Nup=Nup,sps=sps,Ns_block_est=Ns_block_est,_Np=_Np,_count_states=_count_states,**blocks)
 
 
 		if self._sps <= 2:
@@ -141,6 +143,28 @@ class spin_basis_general(hcb_basis_general,higher_spin_basis_general):
 
 		return ME,row,col
 
+	def inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=False,conjugated=False,v_out=None):
+
+		if self._S == "1/2":
+			if self._pauli:
+				J = J*(1<<len(opstr.replace("I","")))
+
+			return hcb_basis_general.inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=transposed,
+													conjugated=conjugated,v_out=v_out)
+		else:
+			return higher_spin_basis_general.inplace_Op(self,v_in,opstr,indx,J,dtype,transposed=transposed,
+													conjugated=conjugated,v_out=v_out)
+
+	def _Op_csr(self,terms,dtype):
+		
+		if self._S == "1/2":
+			if self._pauli:
+				terms = [(opstr,indx,J*(1<<len(opstr.replace("I","")))) for opstr,indx,J in terms]
+
+			return hcb_basis_general._Op_csr(self,terms,dtype)
+		else:
+			return higher_spin_basis_general._Op_csr(self,terms,dtype)
+
 	def __type__(self):
 		return "<type 'qspin.basis.general_hcb'>"
 
@@ -10,6 +10,17 @@ import warnings
 
 _dtypes={"f":_np.float32,"d":_np.float64,"F":_np.complex64,"D":_np.complex128}
 
+def _state_to_int(s):
+	# states of more than 64 sites are stored as arrays of 64-bit words, most significant word first.
+	if _np.ndim(s) == 0:
+		return int(s)
+
+	s_int = 0
+	for word in s:
+		s_int = (s_int << 64) | int(word)
+
+	return s_int
+
 class lattice_basis(basis):
 	def __init__(self):
 		self._Ns = 0
@@ -180,15 +191,11 @@ class lattice_basis(basis):
 
 		else:
 			if state.ndim==1:
-				# calculate full H-space representation of state
-				state=self.get_vec(state,sparse=False)
-				rdm_A,rdm_B = _lattice_partial_trace_pure(state.T,sub_sys_A,N,sps,return_rdm=return_rdm)
+				rdm_A,rdm_B = self._partial_trace_pure(state,sub_sys_A,return_rdm=return_rdm)
 
 			elif state.ndim==2: 
 				if state.shape[0]!=state.shape[1] or enforce_pure:
-					# calculate full H-space representation of state
-					state=self.get_vec(state,sparse=False)
-					rdm_A,rdm_B = _lattice_partial_trace_pure(state.T,sub_sys_A,N,sps,return_rdm=return_rdm)
+					rdm_A,rdm_B = self._partial_trace_pure(state,sub_sys_A,return_rdm=return_rdm)
 
 				else: 
 					proj = self.get_proj(_dtypes[state.dtype.char])
@@ -224,6 +231,12 @@ class lattice_basis(basis):
 		else:
 			return rdm_A,rdm_B
 
+	def _partial_trace_pure(self,state,sub_sys_A,return_rdm="A"):
+		# partial trace of a pure state (or states stored in the columns of `state`) 
+		# using the full H-space representation of the state.
+		state=self.get_vec(state,sparse=False)
+		return _lattice_partial_trace_pure(state.T,sub_sys_A,self.N,self.sps,return_rdm=return_rdm)
+
 	def _ent_entropy(self,state,sub_sys_A=None,density=True,subsys_ordering=True,return_rdm=None,enforce_pure=False,return_rdm_EVs=False,sparse=False,alpha=1.0,sparse_diag=True,maxiter=None):
 		"""Calculates entanglement entropy of subsystem A and the corresponding reduced density matrix
 
@@ -238,6 +251,11 @@ class lattice_basis(basis):
 		-----
 		Algorithm is based on both partial tracing and sigular value decomposition (SVD), optimised for speed.
 
+		For pure states in a symmetry-reduced `..._basis_general`, the reduced DM of the smaller subsystem is built 
+		as a sparse matrix from the symmetry-reduced state and diagonalised block by block, where the blocks are 
+		the connected components of its sparsity pattern (e.g. the particle number sectors of the subsystem). The
+		largest block is stored as a dense array, and so are the reduced DMs requested by `return_rdm`.
+
 		Parameters
 		-----------
 		state : obj
@@ -598,6 +616,7 @@ class lattice_basis(basis):
 	def _get__str__(self):
 
 		def get_state(b):
+			b = _state_to_int(b)
 			n_space = len(str(self.sps))
 			if self.N <= 64:
 				bits = (int(b)//int(self.sps**(self.N-i-1))%self.sps for i in range(self.N))
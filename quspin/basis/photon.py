@@ -307,7 +307,21 @@ class photon_basis(tensor_basis):
 
 			return ME, row, col	
 
+	def _Op_factors(self,opstr,indx,J,dtype):
+		# factored form of `Op`, only available without total particle number conservation (Nph).
+		if self._check_pcon:
+			raise ValueError("operators of a photon_basis with total particle number Ntot do not factorise into particle and photon parts, use Nph instead.")
 
+		opstr1,opstr2=opstr.split("|")
+
+		if len(opstr1) != len(indx):
+			raise ValueError("The length of indx must be the same length as particle operators in {0},{1}".format(opstr,indx))
+
+		n = len(opstr.replace("|","")) - len(indx)
+		indx = list(indx)
+		indx.extend([0 for i in range(n)])
+
+		return tensor_basis._Op_factors(self,opstr,indx,J,dtype)
 
 	def get_vec(self,v0,sparse=True,Nph=None,full_part=True):
 		"""Transforms state from symmetry-reduced basis to full (symmetry-free) basis.
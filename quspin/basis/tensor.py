@@ -145,25 +145,7 @@ class tensor_basis(basis):
 
 		"""
 
-		# if opstr.count("|") > 1: 
-		# 	raise ValueError("only one '|' charactor allowed in: {0}, {1}".format(opstr,indx))
-
-		if len(opstr)-opstr.count("|") != len(indx):
-			raise ValueError("not enough indices for opstr in: {0}, {1}".format(opstr,indx))
-
-		i = opstr.index("|")
-		indx_left = indx[:i]
-		indx_right = indx[i:]
-
-		opstr_left,opstr_right=opstr.split("|",1)
-
-		if self._basis_left._Ns < self._basis_right._Ns:
-			ME_left,row_left,col_left = self._basis_left.Op(opstr_left,indx_left,J,dtype)
-			ME_right,row_right,col_right = self._basis_right.Op(opstr_right,indx_right,1.0,dtype)
-		else:
-			ME_left,row_left,col_left = self._basis_left.Op(opstr_left,indx_left,1.0,dtype)
-			ME_right,row_right,col_right = self._basis_right.Op(opstr_right,indx_right,J,dtype)
-			
+		(ME_left,row_left,col_left),(ME_right,row_right,col_right) = self._Op_split(opstr,indx,J,dtype)
 
 		n1 = row_left.shape[0]
 		n2 = row_right.shape[0]
@@ -195,6 +177,39 @@ class tensor_basis(basis):
 
 		return ME,row,col
 
+	def _Op_split(self,opstr,indx,J,dtype):
+		# matrix elements of the operators on basis_left and basis_right, the coupling goes to the smaller basis.
+
+		# if opstr.count("|") > 1: 
+		# 	raise ValueError("only one '|' charactor allowed in: {0}, {1}".format(opstr,indx))
+
+		if len(opstr)-opstr.count("|") != len(indx):
+			raise ValueError("not enough indices for opstr in: {0}, {1}".format(opstr,indx))
+
+		i = opstr.index("|")
+		indx_left = indx[:i]
+		indx_right = indx[i:]
+
+		opstr_left,opstr_right=opstr.split("|",1)
+
+		if self._basis_left._Ns < self._basis_right._Ns:
+			left = self._basis_left.Op(opstr_left,indx_left,J,dtype)
+			right = self._basis_right.Op(opstr_right,indx_right,1.0,dtype)
+		else:
+			left = self._basis_left.Op(opstr_left,indx_left,1.0,dtype)
+			right = self._basis_right.Op(opstr_right,indx_right,J,dtype)
+
+		return left,right
+
+	def _Op_factors(self,opstr,indx,J,dtype):
+		"""Returns the factors `(A,B)` of the operator :math:`A\\otimes B` constructed by `Op`, as csr matrices
+		on `basis_left` and `basis_right`. Used by operators stored in factored form (see `hamiltonian`, `kron=True`)."""
+		factors = []
+		for (ME,row,col),b in zip(self._Op_split(opstr,indx,J,dtype),[self._basis_left,self._basis_right]):
+			factors.append(_sp.csr_matrix((ME,(row,col)),shape=(b.Ns,b.Ns),dtype=dtype))
+
+		return tuple(factors)
+
 	def index(self,*states):
 		"""Finds the index of user-defined Fock state in tensor basis.
 
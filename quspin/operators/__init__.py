@@ -49,7 +49,22 @@ functions
    isquantum_LinearOperator
 
 """
-from .hamiltonian_core import *
-from .quantum_operator_core import *
-from .exp_op_core import *
-from .quantum_LinearOperator_core import *
+# the operator classes are imported on first access.
+from .._lazy_import import _lazy_attributes
+
+_attrs = {
+	"hamiltonian":".hamiltonian_core",
+	"ishamiltonian":".hamiltonian_core",
+	"commutator":".hamiltonian_core",
+	"anti_commutator":".hamiltonian_core",
+	"quantum_operator":".quantum_operator_core",
+	"isquantum_operator":".quantum_operator_core",
+	"exp_op":".exp_op_core",
+	"isexp_op":".exp_op_core",
+	"quantum_LinearOperator":".quantum_LinearOperator_core",
+	"isquantum_LinearOperator":".quantum_LinearOperator_core",
+	}
+
+__all__ = list(_attrs.keys())
+
+__getattr__,__dir__ = _lazy_attributes(__name__,_attrs)
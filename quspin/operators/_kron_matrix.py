@@ -0,0 +1,199 @@
+from __future__ import print_function, division
+
+import scipy.sparse as _sp
+import numpy as _np
+
+# factored storage of operators on a tensor product Hilbert space H_left (x) H_right: the operator is kept as a
+# sum of kronecker products A_k (x) B_k of small csr matrices and never formed explicitly. The states are
+# stored in the index order of `tensor_basis`, i.e. the element (i_left,i_right) sits at i_left*Ns_right+i_right.
+
+
+def _identity(Ns,dtype):
+	return _sp.identity(Ns,dtype=dtype,format="csr")
+
+
+def _is_identity(M):
+	Ns = M.shape[0]
+	return (M.nnz == Ns and _np.array_equal(M.indptr,_np.arange(Ns+1)) and
+			_np.array_equal(M.indices,_np.arange(Ns)) and _np.all(M.data == 1))
+
+
+def _factor(M,Ns,dtype):
+	# csr matrix in canonical format, `None` stands for the identity.
+	if M is None:
+		return None
+
+	M = _sp.csr_matrix(M,shape=(Ns,Ns),dtype=dtype,copy=True)
+	M.sum_duplicates()
+	M.eliminate_zeros()
+	if _is_identity(M):
+		return None
+	else:
+		return M
+
+
+def _is_zero(M):
+	return M is not None and M.nnz == 0
+
+
+def _factor_key(M):
+	if M is None:
+		return None
+	else:
+		return (M.indptr.tobytes(),M.indices.tobytes(),M.data.tobytes())
+
+
+def _add_factors(M1,M2,Ns,dtype):
+	M1 = _identity(Ns,dtype) if M1 is None else M1
+	M2 = _identity(Ns,dtype) if M2 is None else M2
+	return _factor(M1+M2,Ns,dtype)
+
+
+def kron_matvec(K,v,a=1.0,out=None,overwrite_out=True):
+	"""Same as `csr_matvec` for operators stored as `_kron_matrix`."""
+	return K.dot(v,a=a,out=out,overwrite_out=overwrite_out)
+
+
+class _kron_matrix(object):
+	"""Sum of kronecker products :math:`\\sum_k A_k\\otimes B_k` of csr matrices acting on the left and right factors
+	of a tensor product Hilbert space.
+
+	The product with a state is computed by reshaping it to `(Ns_left,Ns_right)` and applying the two factors one
+	after the other, which needs :math:`O(\\mathrm{nnz}(A_k)N_{right}+\\mathrm{nnz}(B_k)N_{left})` operations instead
+	of :math:`O(\\mathrm{nnz}(A_k)\\mathrm{nnz}(B_k))`. Terms with the same factor on the larger space are combined
+	into a single term when the object is created and identity factors are skipped.
+
+	"""
+	def __init__(self,Ns_left,Ns_right,dtype,terms=()):
+		self._Ns_left = Ns_left
+		self._Ns_right = Ns_right
+		self._dtype = dtype
+
+		# group the terms on the factor acting on the larger space.
+		group_right = (Ns_right >= Ns_left)
+		groups = {}
+		self._terms = []
+		for A,B in terms:
+			A = _factor(A,Ns_left,dtype)
+			B = _factor(B,Ns_right,dtype)
+			if _is_zero(A) or _is_zero(B):
+				continue
+
+			key = _factor_key(B if group_right else A)
+			if key in groups:
+				i = groups[key]
+				A_i,B_i = self._terms[i]
+				if group_right:
+					self._terms[i] = (_add_factors(A_i,A,Ns_left,dtype),B_i)
+				else:
+					self._terms[i] = (A_i,_add_factors(B_i,B,Ns_right,dtype))
+			else:
+				groups[key] = len(self._terms)
+				self._terms.append((A,B))
+
+		# terms may cancel when they are combined.
+		self._terms = [(A,B) for A,B in self._terms if not (_is_zero(A) or _is_zero(B))]
+
+	@property
+	def shape(self):
+		Ns = self._Ns_left*self._Ns_right
+		return (Ns,Ns)
+
+	@property
+	def dtype(self):
+		return _np.dtype(self._dtype)
+
+	@property
+	def nbytes(self):
+		nbytes = 0
+		for M in [M for term in self._terms for M in term if M is not None]:
+			nbytes += M.data.nbytes + M.indices.nbytes + M.indptr.nbytes
+
+		return nbytes
+
+	@property
+	def T(self):
+		terms = [(None if A is None else A.T,None if B is None else B.T) for A,B in self._terms]
+		return _kron_matrix(self._Ns_left,self._Ns_right,self._dtype,terms)
+
+	def conj(self):
+		terms = [(None if A is None else A.conj(),None if B is None else B.conj()) for A,B in self._terms]
+		return _kron_matrix(self._Ns_left,self._Ns_right,self._dtype,terms)
+
+	def astype(self,dtype):
+		return _kron_matrix(self._Ns_left,self._Ns_right,dtype,self._terms)
+
+	def __mul__(self,other): # self * scalar
+		if not _np.isscalar(other):
+			return NotImplemented
+
+		dtype = _np.result_type(self._dtype,other).type
+		# the scalar goes into the factor on the smaller space.
+		if self._Ns_left <= self._Ns_right:
+			terms = [(other*(_identity(self._Ns_left,dtype) if A is None else A),B) for A,B in self._terms]
+		else:
+			terms = [(A,other*(_identity(self._Ns_right,dtype) if B is None else B)) for A,B in self._terms]
+
+		return _kron_matrix(self._Ns_left,self._Ns_right,dtype,terms)
+
+	def __rmul__(self,other): # scalar * self
+		return self.__mul__(other)
+
+	def __add__(self,other): # self + other
+		if not isinstance(other,_kron_matrix):
+			return NotImplemented
+
+		if (self._Ns_left,self._Ns_right) != (other._Ns_left,other._Ns_right):
+			raise ValueError("kronecker product operators act on different tensor product spaces.")
+
+		dtype = _np.result_type(self._dtype,other._dtype).type
+		return _kron_matrix(self._Ns_left,self._Ns_right,dtype,self._terms+other._terms)
+
+	def dot(self,V,a=1.0,out=None,overwrite_out=True):
+		"""Calculates :math:`out = a K V` (or :math:`out += a K V` for `overwrite_out=False`), where `V` has shape
+		`(Ns,...)`. `out` must be C-contiguous."""
+		V = _np.asarray(V)
+		Nl,Nr = self._Ns_left,self._Ns_right
+
+		if out is None:
+			out = _np.zeros(V.shape,dtype=_np.result_type(self._dtype,V.dtype,a))
+		elif overwrite_out:
+			out.fill(0)
+
+		if V.size == 0:
+			return out
+
+		V_3d = V.reshape((Nl,Nr,-1))
+		out_3d = out.reshape(V_3d.shape)
+		for A,B in self._terms:
+			W = V_3d
+			if A is not None: # the left factor acts on the first axis, no copy of V is needed.
+				W = A.dot(W.reshape((Nl,-1))).reshape(V_3d.shape)
+
+			if B is not None:
+				W = B.dot(W.transpose((1,0,2)).reshape((Nr,-1))).reshape((Nr,Nl,-1)).transpose((1,0,2))
+
+			if a == 1.0:
+				out_3d += W
+			else:
+				out_3d += a*W
+
+		return out
+
+	def tocsr(self):
+		"""Forms the full matrix :math:`\\sum_k A_k\\otimes B_k` in csr format."""
+		H = _sp.csr_matrix(self.shape,dtype=self._dtype)
+		for A,B in self._terms:
+			A = _identity(self._Ns_left,self._dtype) if A is None else A
+			B = _identity(self._Ns_right,self._dtype) if B is None else B
+			H = H + _sp.kron(A,B,format="csr")
+
+		H.sum_duplicates()
+		H.eliminate_zeros()
+		return H
+
+	def toarray(self):
+		return self.tocsr().toarray()
+
+	def __repr__(self):
+		return "<{0}x{1} kronecker product operator of type '{2}' with {3} terms>".format(self.shape[0],self.shape[1],self.dtype,len(self._terms))
@@ -5,6 +5,10 @@ import scipy.sparse as _sp
 import warnings
 import numpy as _np
 from ._functions import function
+from ._kron_matrix import _kron_matrix
+
+# maximum number of matrix elements stored in the coordinate buffers before converting to csr format.
+_MAX_BUFFER_SIZE = 2**24
 
 
 
@@ -143,7 +147,115 @@ def test_function(func,func_args):
 
 
 
-def make_static(basis,static_list,dtype):
+def _nnz_bound(basis):
+	# upper bound on the number of matrix elements returned by `basis.Op` for a single term.
+	if basis._unique_me:
+		return basis.Ns
+	else:
+		return 2*basis.Ns
+
+
+def _assemble_csr(basis,terms,dtype):
+	"""
+	args:
+		basis = the basis used to calculate the matrix elements.
+		terms = [(opstr_1,indx_1,J_1),...,(opstr_n,indx_n,J_n)], list of operator terms to add up.
+		dtype = the low level C-type which the matrix should store its values with.
+	returns:
+		H: a csr_matrix representation of the sum of all terms.
+
+	description:
+		this function preallocates coordinate format buffers for the matrix elements, sized using 
+		the per-term bound on the number of nonzeros returned by basis.Op. The matrix elements of 
+		every term are written into these buffers and the buffers are only converted to csr format 
+		once they are full or when all terms have been processed, such that duplicates are summed 
+		once per buffer instead of once per term. The buffer size is capped by _MAX_BUFFER_SIZE in 
+		order to limit the peak memory during construction. If the basis provides a low-level 
+		implementation for a list of terms (basis._Op_csr) it is used instead.
+	"""
+	Ns = basis.Ns
+	H = basis._Op_csr(terms,dtype)
+	if H is not None:
+		return H
+
+	nterms = len(terms)
+	if nterms > 0 and Ns > 0:
+		bound = _nnz_bound(basis)
+		size = min(nterms*bound,max(bound,_MAX_BUFFER_SIZE))
+
+		if Ns < _np.iinfo(_np.int32).max:
+			index_type = _np.int32
+		else:
+			index_type = _np.int64
+
+		row_buf = _np.zeros(size,dtype=index_type)
+		col_buf = _np.zeros(size,dtype=index_type)
+		ME_buf = _np.zeros(size,dtype=dtype)
+		nnz = 0
+
+		for opstr,indx,J in terms:
+			ME,row,col = basis.Op(opstr,indx,J,dtype)
+			n = len(ME)
+
+			if nnz + n > size: # flush buffer to csr matrix
+				H = _add_coo_buffer(H,ME_buf[:nnz],row_buf[:nnz],col_buf[:nnz],Ns,dtype)
+				nnz = 0
+
+				if n > size: # only happens if the bound for basis.Op is exceeded
+					size = n
+					row_buf = _np.zeros(size,dtype=index_type)
+					col_buf = _np.zeros(size,dtype=index_type)
+					ME_buf = _np.zeros(size,dtype=dtype)
+
+			row_buf[nnz:nnz+n] = row
+			col_buf[nnz:nnz+n] = col
+			ME_buf[nnz:nnz+n] = ME
+			nnz += n
+
+		H = _add_coo_buffer(H,ME_buf[:nnz],row_buf[:nnz],col_buf[:nnz],Ns,dtype)
+		del row_buf,col_buf,ME_buf
+
+	if H is None:
+		H = _sp.csr_matrix((Ns,Ns),dtype=dtype)
+	else:
+		H.eliminate_zeros() # remove all zero matrix elements
+
+	return H
+
+
+def _assemble_kron(basis,terms,dtype):
+	"""
+	args:
+		basis = tensor product basis providing the factors of the operator terms (basis._Op_factors).
+		terms = [(opstr_1,indx_1,J_1),...,(opstr_n,indx_n,J_n)], list of operator terms to add up.
+		dtype = the low level C-type which the matrix should store its values with.
+	returns:
+		H: a _kron_matrix representation of the sum of all terms, the full matrix is never formed.
+	"""
+	if not hasattr(basis,"_Op_factors"):
+		raise TypeError("operators in factored form (kron=True) require a tensor_basis or photon_basis object.")
+
+	Ns_left,Ns_right = basis.basis_left.Ns,basis.basis_right.Ns
+	if Ns_left*Ns_right != basis.Ns:
+		raise ValueError("basis is not the full tensor product of its left and right basis, operators can not be factored.")
+
+	factors = [basis._Op_factors(opstr,indx,J,dtype) for opstr,indx,J in terms]
+	return _kron_matrix(Ns_left,Ns_right,dtype,factors)
+
+
+def _add_coo_buffer(H,ME,row,col,Ns,dtype):
+	# converts the coordinate buffers to csr format (summing duplicates) and adds the result to H.
+	Ht = _sp.coo_matrix((ME,(row,col)),shape=(Ns,Ns),dtype=dtype).tocsr()
+	Ht.sum_duplicates() # sum duplicate matrix elements
+	if H is None:
+		return Ht
+	else:
+		H = H + Ht
+		H.sum_duplicates()
+		return H
+
+
+def make_static(basis,static_list,dtype,kron=False):
 	"""
 	args:
 		static=[[opstr_1,indx_1],...,[opstr_n,indx_n]], list of opstr,indx to add up for static piece of Hamiltonian.
@@ -156,28 +268,21 @@ def make_static(basis,static_list,dtype):
 		this by calling the basis method Op which takes a state in the basis, acts with opstr and returns a matrix 
 		element and the state which it is connected to. This function is called for every opstr in list static and for every 
 		state in the basis until the entire hamiltonian is mapped out. It takes those matrix elements (which need not be 
-		sorted or even unique) and creates a coo_matrix from the scipy.sparse library. It then converts this coo_matrix
-		to a csr_matrix class which has optimal sparse matrix vector multiplication.
+		sorted or even unique) and stores them in preallocated coordinate buffers (see _assemble_csr) which are converted 
+		to a csr_matrix class which has optimal sparse matrix vector multiplication. For kron=True the terms of a 
+		tensor basis are kept in factored form instead (see _assemble_kron).
 	"""
-	Ns=basis.Ns
-	H = _sp.csr_matrix((Ns,Ns),dtype=dtype)
 	static_list = _consolidate_static(static_list)
-	for opstr,indx,J in static_list:
-		# print(opstr,bond)
-		ME,row,col = basis.Op(opstr,indx,J,dtype)
-		Ht=_sp.csr_matrix((ME,(row,col)),shape=(Ns,Ns),dtype=dtype) 
-		H=H+Ht
-		del Ht
-		H.sum_duplicates() # sum duplicate matrix elements
-		H.eliminate_zeros() # remove all zero matrix elements
-	# print()
-	return H 
+	if kron:
+		return _assemble_kron(basis,static_list,dtype)
+	else:
+		return _assemble_csr(basis,static_list,dtype)
 
 
 
 
 
-def make_dynamic(basis,dynamic_list,dtype):
+def make_dynamic(basis,dynamic_list,dtype,kron=False):
 	"""
 	args:
 	dynamic=[[opstr_1,indx_1,func_1,func_1_args],...,[opstr_n,indx_n,func_n,func_n_args]], list of opstr,indx and functions to drive with
@@ -193,28 +298,25 @@ def make_dynamic(basis,dynamic_list,dtype):
 		This function works the same as static, but instead of adding all of the elements 
 		of the dynamic list together, it returns a tuple which contains each individual csr_matrix 
 		representation of all the different driven parts. This way one can construct the time dependent 
-		Hamiltonian simply by looping over the tuple returned by this function. 
+		Hamiltonian simply by looping over the tuple returned by this function. The terms are first 
+		grouped by their drive function such that each driven part is assembled in a single pass.
 	"""
-	Ns=basis.Ns
-	dynamic={}
+	dynamic_terms={}
 	dynamic_list = _consolidate_dynamic(dynamic_list)
 	for opstr,indx,J,f,f_args in dynamic_list:
 		if _np.isscalar(f_args): raise TypeError("function arguments must be array type")
 		test_function(f,f_args)
 
-		#indx = _np.asarray(indx,_np.int32)
-		ME,row,col = basis.Op(opstr,indx,J,dtype)
-		Ht =_sp.csr_matrix((ME,(row,col)),shape=(Ns,Ns),dtype=dtype) 
-
 		func = function(f,tuple(f_args))
-		if func in dynamic:
-			try:
-				dynamic[func] += Ht
-			except:
-				dynamic[func] = dynamic[func] + Ht
+		if func in dynamic_terms:
+			dynamic_terms[func].append((opstr,indx,J))
 		else:
-			dynamic[func] = Ht
+			dynamic_terms[func] = [(opstr,indx,J)]
 
+	assemble = (_assemble_kron if kron else _assemble_csr)
+	dynamic={}
+	for func,terms in dynamic_terms.items():
+		dynamic[func] = assemble(basis,terms,dtype)
 
 	return dynamic
 
@@ -223,16 +325,5 @@ def make_dynamic(basis,dynamic_list,dtype):
 
 
 def make_op(basis,opstr,bonds,dtype):
-	Ns=basis.Ns
-	H=_sp.csr_matrix(([],([],[])),shape=(Ns,Ns),dtype=dtype)
-	for bond in bonds:
-		J=bond[0]
-		indx=bond[1:]
-		ME,row,col = basis.Op(opstr,indx,J,dtype)
-		Ht=_sp.csr_matrix((ME,(row,col)),shape=(Ns,Ns),dtype=dtype) 
-		H=H+Ht
-		del Ht
-		H.sum_duplicates() # sum duplicate matrix elements
-		H.eliminate_zeros() # remove all zero matrix elements
-	
-	return H
+	terms = [(opstr,bond[1:],bond[0]) for bond in bonds]
+	return _assemble_csr(basis,terms,dtype)
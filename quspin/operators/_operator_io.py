@@ -0,0 +1,155 @@
+from __future__ import print_function, division
+
+import scipy.sparse as _sp
+import numpy as _np
+import pickle as _pickle
+import json as _json
+import base64 as _base64
+import os
+
+# on-disk format of the `hamiltonian` and `quantum_operator` classes: the directory `path` holds
+#   * 'manifest.json': class, dtype, shape, basis description and the list of the operator parts. Keys which are not
+#     strings (e.g. tuples or ints of a `quantum_operator`) are stored pickled, next to their repr.
+#   * one raw numpy array per 'indptr', 'indices' and 'data' of every sparse (csr) part, and per dense part.
+#   * 'functions.pickle': the drive functions of the dynamic parts of a `hamiltonian` (stored by reference).
+# the arrays are loaded with `numpy.memmap` (copy-on-write) so that processes sharing the files share one
+# physical copy of the matrices.
+
+_FORMAT_VERSION = 1
+_MANIFEST = "manifest.json"
+_FUNCTIONS = "functions.pickle"
+
+
+def _function_reference(func):
+	f = getattr(func,"_f",None)
+	if f is None or not callable(f):
+		return str(func)
+
+	module = getattr(f,"__module__",None)
+	name = getattr(f,"__qualname__",getattr(f,"__name__",repr(f)))
+	return "{0}.{1}".format(module,name)
+
+
+def _encode_key(key):
+	# strings and `None` survive the round trip through json, other keys are pickled.
+	if key is None or isinstance(key,str):
+		return dict(key=key)
+
+	try:
+		data = _pickle.dumps(key,protocol=2)
+	except (_pickle.PicklingError,AttributeError,TypeError) as e:
+		raise ValueError("operator key {0} can not be saved: {1}".format(repr(key),e))
+
+	return dict(key=repr(key),key_pickle=_base64.b64encode(data).decode("ascii"))
+
+
+def _decode_key(entry):
+	if "key_pickle" in entry:
+		return _pickle.loads(_base64.b64decode(entry["key_pickle"]))
+	else:
+		return entry["key"]
+
+
+def _save_matrix(path,prefix,M):
+	if _sp.issparse(M):
+		M = M.tocsr()
+		entry = dict(name=prefix,format="csr")
+		for attr in ["indptr","indices","data"]:
+			_np.save(os.path.join(path,"{0}_{1}.npy".format(prefix,attr)),getattr(M,attr))
+	else:
+		entry = dict(name=prefix,format="dense")
+		_np.save(os.path.join(path,prefix+".npy"),_np.ascontiguousarray(M))
+
+	return entry
+
+
+def _load_matrix(path,entry,shape,dtype,mmap):
+	mmap_mode = ("c" if mmap else None)
+	prefix = entry["name"]
+	if entry["format"] == "csr":
+		indptr,indices,data = [_np.load(os.path.join(path,"{0}_{1}.npy".format(prefix,attr)),mmap_mode=mmap_mode)
+								for attr in ["indptr","indices","data"]]
+
+		if indptr.shape != (shape[0]+1,) or indices.shape != data.shape or data.dtype != dtype:
+			raise ValueError("operator file '{0}' does not match the manifest.".format(prefix))
+
+		# the arrays are attached directly, the csr_matrix constructor may cast (copy) the index arrays.
+		M = _sp.csr_matrix(shape,dtype=dtype)
+		M.indptr,M.indices,M.data = indptr,indices,data
+		return M
+	elif entry["format"] == "dense":
+		M = _np.load(os.path.join(path,prefix+".npy"),mmap_mode=mmap_mode)
+		if M.shape != tuple(shape) or M.dtype != dtype:
+			raise ValueError("operator file '{0}' does not match the manifest.".format(prefix))
+
+		return M
+	else:
+		raise ValueError("unknown matrix format '{0}' in operator file.".format(entry["format"]))
+
+
+def _save_operator(path,cls,dtype,shape,basis,static,dynamic=()):
+	"""Writes the operator parts `static` (list of `(key,matrix)`) and `dynamic` (list of `(function,matrix)`) to directory `path`."""
+	if not os.path.isdir(path):
+		os.makedirs(path)
+
+	manifest = dict(format_version=_FORMAT_VERSION,cls=cls,dtype=_np.dtype(dtype).name,shape=list(shape),
+					basis=(None if basis is None else repr(basis)))
+
+	manifest["static"] = []
+	for i,(key,M) in enumerate(static):
+		entry = _save_matrix(path,"static_{0}".format(i),M)
+		entry.update(_encode_key(key))
+		manifest["static"].append(entry)
+
+	manifest["dynamic"] = []
+	for i,(func,M) in enumerate(dynamic):
+		entry = _save_matrix(path,"dynamic_{0}".format(i),M)
+		entry["func"] = _function_reference(func)
+		entry["args"] = repr(getattr(func,"_args",()))
+		manifest["dynamic"].append(entry)
+
+	if dynamic:
+		try:
+			data = _pickle.dumps([func for func,M in dynamic],protocol=2)
+		except (_pickle.PicklingError,AttributeError,TypeError) as e:
+			raise ValueError("drive functions must be importable (defined at module level) to be saved: {0}".format(e))
+
+		with open(os.path.join(path,_FUNCTIONS),"wb") as f:
+			f.write(data)
+
+	# the manifest is written last, a directory without one is an incomplete save.
+	tmp = os.path.join(path,_MANIFEST+".tmp")
+	with open(tmp,"w") as f:
+		_json.dump(manifest,f,indent=1)
+
+	os.replace(tmp,os.path.join(path,_MANIFEST))
+
+
+def _load_operator(path,cls,mmap=True):
+	"""Reads the directory `path` written by `_save_operator`, returns `(manifest,static,dynamic)`."""
+	try:
+		with open(os.path.join(path,_MANIFEST),"r") as f:
+			manifest = _json.load(f)
+	except IOError:
+		raise IOError("'{0}' is not a saved quspin operator (missing '{1}').".format(path,_MANIFEST))
+
+	if manifest.get("cls") != cls:
+		raise TypeError("'{0}' holds a '{1}' object, not a '{2}'.".format(path,manifest.get("cls"),cls))
+
+	if manifest.get("format_version",0) > _FORMAT_VERSION:
+		raise ValueError("'{0}' was written with a newer file format version.".format(path))
+
+	dtype = _np.dtype(manifest["dtype"])
+	shape = tuple(manifest["shape"])
+
+	static = [(_decode_key(entry),_load_matrix(path,entry,shape,dtype,mmap)) for entry in manifest["static"]]
+
+	dynamic = []
+	if manifest["dynamic"]:
+		with open(os.path.join(path,_FUNCTIONS),"rb") as f:
+			funcs = _pickle.load(f)
+
+		for func,entry in zip(funcs,manifest["dynamic"]):
+			dynamic.append((func,_load_matrix(path,entry,shape,dtype,mmap)))
+
+	return manifest,static,dynamic
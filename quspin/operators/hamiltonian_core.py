@@ -1,12 +1,13 @@
 from __future__ import print_function, division
 
-from ..basis import spin_basis_1d as _default_basis
 from ..basis import isbasis as _isbasis
 
 from ._make_hamiltonian import make_static
 from ._make_hamiltonian import make_dynamic
 from ._make_hamiltonian import test_function
 from ._functions import function
+from ._operator_io import _save_operator,_load_operator
+from ._kron_matrix import kron_matvec
 
 # need linear algebra packages
 import scipy
@@ -34,6 +35,11 @@ import warnings
 
 __all__ = ["commutator","anti_commutator","hamiltonian","ishamiltonian"]
 
+def _default_basis(N,**basis_kwargs):
+	# imported here so that the compiled basis_1d core is loaded only if the default basis is used.
+	from ..basis import spin_basis_1d
+	return spin_basis_1d(N,**basis_kwargs)
+
 def commutator(H1,H2):
 	""" Calculates the commutator of two Hamiltonians :math:`H_1` and :math:`H_2`.
 
@@ -163,6 +169,167 @@ def _hamiltonian_dot(hamiltonian,time,v):
 	return hamiltonian.dot(v,time=time,check=False)
 
 
+def _kron_hamiltonian(static,dynamic,basis,dtype):
+	# `hamiltonian` holding the parts `static` and `dynamic` (`_kron_matrix` objects) in factored form.
+	H = hamiltonian([],[],shape=static.shape,dtype=dtype)
+	H._basis = basis
+	H._kron = (static,dynamic)
+	return H
+
+
+class _fused_csr_hamiltonian(object):
+	"""Static and dynamic parts of a `hamiltonian` stored on the union of their sparsity patterns with one data
+	array per part. The product H(t).dot(V) is computed by a native kernel in a single sweep over the indices, which 
+	forms the matrix elements from the coefficients of the parts on the fly."""
+	_supported = [(_np.float64,_np.float64),(_np.float64,_np.complex128),(_np.complex128,_np.complex128),
+				  (_np.float32,_np.float32),(_np.float32,_np.complex64),(_np.complex64,_np.complex64)]
+
+	def __init__(self,parts,shape,dtype):
+		from ..tools.expm_multiply_parallel_core.csr_matvec_wrapper import _csr_matvecs_fused
+
+		self._csr_matvecs_fused = _csr_matvecs_fused
+		self._funcs = [func for func,_ in parts]
+
+		mats = []
+		pattern = _sp.csr_matrix(shape,dtype=_np.int32)
+		for _,Hd in parts:
+			Hd = _sp.csr_matrix(Hd,dtype=dtype)
+			if not Hd.has_canonical_format: # avoids modifying the parts of the `hamiltonian`.
+				Hd = Hd.copy()
+				Hd.sum_duplicates()
+			mats.append(Hd)
+			pattern = pattern + _sp.csr_matrix((_np.ones_like(Hd.indices),Hd.indices,Hd.indptr),shape=shape)
+
+		pattern.sort_indices()
+		self._indptr = pattern.indptr
+		self._indices = pattern.indices
+
+		def positions(M): # positions of the matrix elements in row-major order.
+			return _np.repeat(_np.arange(shape[0],dtype=_np.int64),_np.diff(M.indptr))*shape[1] + M.indices
+
+		union = positions(pattern)
+		self._data = _np.zeros((len(mats),pattern.nnz),dtype=dtype)
+		for i,Hd in enumerate(mats):
+			self._data[i,_np.searchsorted(union,positions(Hd))] = Hd.data
+
+	@classmethod
+	def from_hamiltonian(cls,H,transposed=False):
+		parts = [(None,H._static)] + list(iteritems(H._dynamic))
+		if transposed:
+			parts = [(func,Hd.T) for func,Hd in parts]
+
+		return cls(parts,H._shape,H._dtype)
+
+	def supports(self,dtype):
+		""" checks if the native kernel can accumulate the product into an array of data type `dtype`. """
+		return (self._data.dtype,_np.dtype(dtype)) in self._supported
+
+	def result_type(self,time,V,a=1.0):
+		""" returns the coefficients of the parts at time `time` and the data type of the product with `V`, 
+		which is `None` if the native kernel does not support it. """
+		c = _np.array([a if func is None else a*func(time) for func in self._funcs])
+		result_dtype = _np.result_type(V.dtype,self._data.dtype)
+		if _np.iscomplexobj(c):
+			result_dtype = _np.result_type(result_dtype,_np.complex64)
+
+		if (self._data.dtype,result_dtype) in self._supported:
+			return c.astype(result_dtype),result_dtype
+		else:
+			return c,None
+
+	def dot(self,c,V,out,overwrite_out=True):
+		# out = sum_i c[i]*H_i.dot(V), or out += ... for `overwrite_out=False`; `V` and `out` are C-contiguous.
+		if V.size > 0:
+			V_2d = V.reshape((V.shape[0],-1))
+			self._csr_matvecs_fused(overwrite_out,self._indptr,self._indices,self._data,c,V_2d,out.reshape(V_2d.shape))
+
+		return out
+
+
+class _csr_evolve_rhs(object):
+	"""Right-hand sides of the equations of motion used by `hamiltonian.evolve` for operators stored
+	as csr matrices (or in factored form, see `kron`). The workspace is allocated once and the static and 
+	dynamic parts are accumulated into it with the OpenMP `csr_matvec` kernel, such that no temporary arrays 
+	are created per call."""
+	def __init__(self,H,shape,dtype,a=1.0,transposed=False):
+		from ..tools.expm_multiply_parallel_core import csr_matvec
+
+		self._csr_matvec = csr_matvec
+		self._Ns = H.Ns
+		self._a = a
+		self._work = _np.zeros(shape,dtype=dtype)
+
+		fused = H._get_fused()
+		if H._kron is not None:
+			self._csr_matvec = kron_matvec
+			static,dynamic = H._kron
+			self._parts = [(None,static)] + list(iteritems(dynamic))
+			if transposed:
+				self._parts_T = [(func,Hd.T) for func,Hd in self._parts]
+		elif fused is not None and fused.supports(self._work.dtype):
+			# a single sweep over the fused storage replaces the products with the individual parts. The data type 
+			# of the coefficients is checked at every time, see `_accumulate`.
+			self._parts = fused
+			if transposed:
+				self._parts_T = _fused_csr_hamiltonian.from_hamiltonian(H,transposed=True)
+		else:
+			self._parts = [(None,H._static)] + list(iteritems(H._dynamic))
+			if transposed: # needed for the right multiplication rho*H in the Liouville equation.
+				self._parts_T = [(func,Hd.T.tocsr()) for func,Hd in self._parts]
+
+		if transposed:
+			self._work_T = _np.zeros(shape,dtype=dtype)
+			self._V_T = _np.zeros(shape,dtype=dtype)
+
+	@staticmethod
+	def supported(H):
+		""" Checks if all parts of `H` are csr matrices with data types supported by `csr_matvec`. """
+		if H._kron is not None:
+			return True
+
+		parts = [H._static] + list(itervalues(H._dynamic))
+		return all(_sp.isspmatrix_csr(Hd) and Hd.dtype in [_np.float64,_np.complex128] for Hd in parts)
+
+	def _accumulate(self,parts,time,V,out,a):
+		# out = a*H(time).dot(V)
+		if isinstance(parts,_fused_csr_hamiltonian):
+			c,result_dtype = parts.result_type(time,V,a)
+			if result_dtype != out.dtype:
+				raise ValueError("the coefficients of the hamiltonian at time {} are not compatible with the data type {} of the state.".format(time,out.dtype))
+
+			parts.dot(c,V,out)
+			return
+
+		for func,Hd in parts:
+			if func is None:
+				self._csr_matvec(Hd,V,a=a,out=out,overwrite_out=True)
+			else:
+				self._csr_matvec(Hd,V,a=a*func(time),out=out,overwrite_out=False)
+
+	def SO(self,time,V):
+		""" real (a=-1j) and imaginary (a=-1) time Schroedinger operator a*H(t)*|V >. """
+		V = V.reshape(self._work.shape)
+		self._accumulate(self._parts,time,V,self._work,self._a)
+		return self._work.reshape((-1,))
+
+	def SO_real(self,time,V):
+		""" real time Schroedinger operator for real hamiltonians: u_dot = Hv, v_dot = -Hu. """
+		V = V.reshape(self._work.shape)
+		Ns = self._Ns
+		self._accumulate(self._parts,time,V[Ns:],self._work[:Ns],1.0)
+		self._accumulate(self._parts,time,V[:Ns],self._work[Ns:],-1.0)
+		return self._work.reshape((-1,))
+
+	def LO(self,time,rho):
+		""" real time Liouville operator -i[H(t),rho]. """
+		rho = rho.reshape(self._work.shape)
+		_np.copyto(self._V_T,rho.T)
+		self._accumulate(self._parts,time,rho,self._work,-1j)
+		self._accumulate(self._parts_T,time,self._V_T,self._work_T,1j)
+		self._work += self._work_T.T
+		return self._work.reshape((-1,))
+
+
 class hamiltonian(object):
 	"""Constructs time-dependent (hermitian and nonhermitian) operators.
 
@@ -196,7 +363,12 @@ class hamiltonian(object):
 		:lines: 7-
 
 	"""
-	def __init__(self,static_list,dynamic_list,N=None,basis=None,shape=None,dtype=_np.complex128,copy=True,check_symm=True,check_herm=True,check_pcon=True,**basis_kwargs):
+	# defaults for objects which do not set these attributes in `__init__` (e.g. unpickled from older versions).
+	_fused_mode = False
+	_fused = None
+	_kron = None
+
+	def __init__(self,static_list,dynamic_list,N=None,basis=None,shape=None,dtype=_np.complex128,copy=True,check_symm=True,check_herm=True,check_pcon=True,kron=False,**basis_kwargs):
 		"""Intializes the `hamtilonian` object (any quantum operator).
 
 		Parameters
@@ -232,6 +404,12 @@ class hamiltonian(object):
 			Enable/Disable hermiticity check on `static_list` and `dynamic_list`.
 		check_pcon : bool, optional
 			Enable/Disable particle conservation check on `static_list` and `dynamic_list`.
+		kron : bool, optional
+			For a `tensor_basis` (or a `photon_basis` with `Nph`), store every term "a|b" in factored form as 
+			the pair of operators :math:`A` and :math:`B` acting on the two factors of the tensor product, instead 
+			of the full matrix :math:`A\\otimes B`. `dot`, `expt_value`, `evolve`, `aslinearoperator`, `eigsh` and 
+			`tocsr` use the factored form, all other methods convert the operator to csr format on first use. 
+			Requires `static_list` and `dynamic_list` to contain operator strings only. Default is `kron = False`.
 		basis_kwargs : dict
 			Optional additional arguments to pass to the `basis` class, if not already using a `basis` object
 			to create the operator.
@@ -241,6 +419,9 @@ class hamiltonian(object):
 		self._is_dense = False
 		self._ndim = 2
 		self._basis = basis
+		self._fused_mode = False
+		self._fused = None
+		self._kron = None
 
 
 		if not (dtype in supported_dtypes):
@@ -272,6 +453,9 @@ class hamiltonian(object):
 		else: 
 			raise TypeError('expecting list/tuple of lists/tuples containing opstr and list of indx, functions, and function args')
 
+		if kron and (static_other_list or dynamic_other_list):
+			raise ValueError("kron=True requires static_list and dynamic_list to contain operator strings only.")
+
 		# need for check_symm
 		self._static_opstr_list = static_opstr_list
 		self._dynamic_opstr_list = dynamic_opstr_list
@@ -309,9 +493,15 @@ class hamiltonian(object):
 
 
 
-			self._static=make_static(self._basis,static_opstr_list,dtype)
-			self._dynamic=make_dynamic(self._basis,dynamic_opstr_list,dtype)
-			self._shape = self._static.shape
+			if kron:
+				static=make_static(self._basis,static_opstr_list,dtype,kron=True)
+				dynamic=make_dynamic(self._basis,dynamic_opstr_list,dtype,kron=True)
+				self._kron = (static,dynamic)
+				self._shape = static.shape
+			else:
+				self._static=make_static(self._basis,static_opstr_list,dtype)
+				self._dynamic=make_dynamic(self._basis,dynamic_opstr_list,dtype)
+				self._shape = self._static.shape
 
 		
 
@@ -448,6 +638,43 @@ class hamiltonian(object):
 
 		self._Ns = self._shape[0]
 
+	# the csr (or dense) storage of the operator parts, operators in factored form are converted on first access.
+	@property
+	def _static(self):
+		if self._kron is not None:
+			self._kron_tocsr()
+		return self._static_matrix
+
+	@_static.setter
+	def _static(self,static):
+		self._static_matrix = static
+
+	@property
+	def _dynamic(self):
+		if self._kron is not None:
+			self._kron_tocsr()
+		return self._dynamic_matrices
+
+	@_dynamic.setter
+	def _dynamic(self,dynamic):
+		self._dynamic_matrices = dynamic
+
+	def _kron_tocsr(self):
+		static,dynamic = self._kron
+		self._kron = None
+		self._static = static.tocsr()
+		self._dynamic = {func:Hd.tocsr() for func,Hd in iteritems(dynamic)}
+
+	def __setstate__(self,state):
+		# objects pickled before the operator parts were stored behind the `_static` and `_dynamic` properties.
+		state = dict(state)
+		if "_static" in state:
+			state["_static_matrix"] = state.pop("_static")
+		if "_dynamic" in state:
+			state["_dynamic_matrices"] = state.pop("_dynamic")
+
+		self.__dict__.update(state)
+
 	@property
 	def basis(self):
 		""":obj:`basis`: basis used to build the `hamiltonian` object.
@@ -518,6 +745,10 @@ class hamiltonian(object):
 
 	@property
 	def nbytes(self):
+		if self._kron is not None:
+			static,dynamic = self._kron
+			return static.nbytes + sum(Hd.nbytes for Hd in itervalues(dynamic))
+
 		nbytes = 0
 		if _sp.issparse(self._static):
 			nbytes += self._static.data.nbytes
@@ -544,6 +775,44 @@ class hamiltonian(object):
 
 		self._is_dense = not is_sparse
 
+	def set_fused(self,fused=True):
+		"""Enables/disables the fused storage mode of the `hamiltonian` operator.
+
+		In fused mode, the static and dynamic parts are merged into a single csr sparsity pattern (the union of the
+		patterns of all parts) with one data array per part. Products :math:`H(t)|V\\rangle` at a single time are then
+		computed by a native (OpenMP) kernel in one sweep over the matrix, which applies the coefficients :math:`f_i(t)`
+		of the dynamic parts on the fly. This is used by `dot`, `expt_value` and `evolve`.
+
+		Notes
+		-----
+		* This reduces the memory traffic for operators with many dynamic parts which have similar sparsity patterns.
+		  The fused storage is kept in addition to the individual parts.
+		* The storage is built on first use and updated after in-place operations on the `hamiltonian`. It is not
+		  used for operators with dense parts, nor for arrays of times.
+
+		Parameters
+		-----------
+		fused : bool, optional
+			Toggles the fused storage. Default is `fused = True`.
+
+		Examples
+		---------
+		>>> H.set_fused(True)
+		>>> H_psi = H.dot(psi,time=1.0)
+
+		"""
+		self._fused_mode = bool(fused)
+		self._fused = None
+
+	def _get_fused(self):
+		# builds the fused storage of sparse operators on first use.
+		if self._fused is None and self._fused_mode and not self._is_dense and self._kron is None and self.Ns > 0:
+			parts = [self._static] + list(itervalues(self._dynamic))
+			if all(_sp.issparse(Hd) for Hd in parts):
+				self._fused = _fused_csr_hamiltonian.from_hamiltonian(self)
+
+		return self._fused
+
 	### state manipulation/observable routines
 
 	def dot(self,V,time=0,check=True,out=None):
@@ -554,8 +823,11 @@ class hamiltonian(object):
 
 		Notes
 		-----
-		It is faster to multiply the individual (static, dynamic) parts of the Hamiltonian first, then add all those 
-		vectors together.
+		It is faster to multiply the individual (static, dynamic) parts of the Hamiltonian first, then add all those
+		vectors together. In fused mode (see `set_fused`) all parts are applied in a single sweep instead.
+
+		For array-like `time`, the drive functions are evaluated on the whole time grid once and every (static, dynamic)
+		part is applied to all time slices of `V` in a single matrix product.
 
 		Parameters
 		-----------
@@ -609,40 +881,61 @@ class hamiltonian(object):
 				raise ValueError("Expecting V.ndim < 4.")
 
 
+		if self._kron is not None and not _sp.issparse(V):
+			static,dynamic = self._kron
+		else:
+			static,dynamic = self._static,self._dynamic
+
 		times = _np.array(time)
 			
 		if times.ndim > 0:
 			if times.ndim > 1:
 				raise ValueError("Expecting time to be one dimensional array-like.")
-			if V.shape[-1] != time.shape[0]:
+			if V.shape[-1] != times.shape[0]:
 				raise ValueError("For non-scalar times V.shape[-1] must be equal to len(time).")
 
 			if _sp.issparse(V):
 				V = V.tocsc()
-				return _sp.vstack([self.dot(V.get_col(i),time=t,check=check) for i,t in enumerate(time)])
+				return _sp.hstack([self.dot(V.getcol(i),time=t,check=check) for i,t in enumerate(times)])
 			else:
+				V = _np.asarray(V)
 				if V.ndim == 2:
-					V_iter = iter(V.T[:])
-					
+					n_rep = 1
 				elif V.ndim == 3:
 					if V.shape[0] != V.shape[1]:
 						raise ValueError("Density matricies must be square!")
 
-					V_iter = iter(V.transpose((2,0,1))[:])
+					n_rep = V.shape[1]
+				else:
+					raise ValueError("For non-scalar times V must be either a 2- or 3-d array.")
+
+				# flatten to a single (Ns, n_rep*T) block; column j*T+i belongs to time[i].
+				V_2d = V.reshape((V.shape[0],-1))
+				V_dot = _np.asarray(static.dot(V_2d),dtype=_np.result_type(V.dtype,self._dtype))
+				for func,Hd in iteritems(dynamic):
+					# evaluate drive on the whole time grid once, then scale the columns.
+					coeff = _np.array([func(t) for t in times])
+					if n_rep > 1:
+						coeff = _np.tile(coeff,n_rep)
+
+					V_dot += _np.asarray(Hd.dot(V_2d)) * coeff
 
-				V_dot = _np.zeros(V.shape,dtype=_np.result_type(V.dtype,self._dtype))
-				for i,(v,t) in enumerate(zip(V_iter,time)):
-					V_dot[...,i] = self._static.dot(V[...,i])	
-					for func,Hd in iteritems(self._dynamic):
-						V_dot[...,i] += func(t)*(Hd.dot(V[...,i]))			
+				V_dot = V_dot.reshape(V.shape)
 		else:
+			fused = self._get_fused()
+			if fused is not None and V.__class__ is _np.ndarray and V.ndim in [1,2]:
+				c,result_dtype = fused.result_type(time,V)
+				if result_dtype is not None:
+					V = _np.ascontiguousarray(V,dtype=result_dtype)
+					return fused.dot(c,V,_np.empty(V.shape,dtype=result_dtype))
+
 			if _sp.issparse(V):
-				V_dot = self._static * V
-				for func,Hd in iteritems(self._dynamic):
+				V_dot = static * V
+				for func,Hd in iteritems(dynamic):
 					V_dot = V_dot + func(time)*(Hd.dot(V))
 			else:
-				V_dot = self._static.dot(V)
-				for func,Hd in iteritems(self._dynamic):
+				V_dot = static.dot(V)
+				for func,Hd in iteritems(dynamic):
 					V_dot += func(time)*(Hd.dot(V))
 
 		return V_dot
@@ -702,7 +995,7 @@ class hamiltonian(object):
 		if ndim == 1:
 			return self.transpose().dot(V,time=time,check=check)
 		elif ndim == 2:
-			if _np.array(times).ndim>0:
+			if _np.array(time).ndim>0:
 				return self.transpose().dot(V,time=time,check=check)
 			else:
 				return self.transpose().dot(V.transpose(),time=time,check=check).transpose()
@@ -1120,6 +1413,9 @@ class hamiltonian(object):
 		if self.Ns <= 0:
 			return _np.asarray([]), _np.asarray([[]])
 
+		if self._kron is not None and eigsh_args.get("sigma") is None:
+			return _sla.eigsh(self.aslinearoperator(time=time),**eigsh_args)
+
 		return _sla.eigsh(self.tocsr(time=time),**eigsh_args)
 
 	def eigh(self,time=0,**eigh_args):
@@ -1373,6 +1669,9 @@ class hamiltonian(object):
 		and pure density matrices (`eom="LvNE"). For a user-defined custom ODE solver which can handle non-linear equations, check out the
 		`measurements.evolve()` routine, which has a similar functionality but allows for a complete freedom
 		over the differential equation to be solved.
+
+		If all parts of the operator are stored as `float64` or `complex128` csr matrices, the right-hand side of the ODE is 
+		evaluated with the multithreaded `csr_matvec` routine into a workspace which is allocated only once.
 		
 		Parameters
 		-----------
@@ -1395,8 +1694,11 @@ class hamiltonian(object):
 			Scipy solver integrator name. Default is `dop853`. 
 
 			See `scipy integrator (solver) <https://docs.scipy.org/doc/scipy-0.14.0/reference/generated/scipy.integrate.ode.html>`_ for other options.
+			Use `solver_name="krylov"` for the norm-preserving short-iteration Lanczos propagator `tools.evolution.krylov_evolve`
+			(only for `eom="SE"`).
 		solver_args : dict, optional
 			Dictionary with additional `scipy integrator (solver) <https://docs.scipy.org/doc/scipy-0.14.0/reference/generated/scipy.integrate.ode.html>`_.	
+			For `solver_name="krylov"` the arguments `tol` and `m_max` of `tools.evolution.krylov_evolve`.
 		stack_state : bool, optional 
 			Flag to determine if `f` is real or complex-valued. Default is `False`.
 		imag_time : bool, optional
@@ -1432,6 +1734,23 @@ class hamiltonian(object):
 		if _np.iscomplexobj(times):
 			raise ValueError("times must be real number(s).")
 
+		if solver_name == "krylov":
+			from ..tools.evolution import krylov_evolve
+
+			if eom != "SE":
+				raise NotImplementedError("the krylov solver is only implemented for Schroedinger evolution (eom='SE').")
+
+			if stack_state:
+				raise ValueError("stack_state is not compatible with the krylov solver.")
+
+			if v0.ndim > 2:
+				raise ValueError("v0 must have ndim <= 2")
+
+			if v0.shape[0] != self.Ns:
+				raise ValueError("v0 must have {0} elements".format(self.Ns))
+
+			return krylov_evolve(self,v0,t0,times,imag_time=imag_time,iterate=iterate,verbose=verbose,**solver_args)
+
 		evolve_args = (v0,t0,times)
 		evolve_kwargs = solver_args
 		evolve_kwargs["solver_name"]=solver_name
@@ -1440,6 +1759,9 @@ class hamiltonian(object):
 		evolve_kwargs["iterate"]=iterate
 		evolve_kwargs["imag_time"]=imag_time
 
+		# operators stored as csr matrices use the allocation-free right-hand sides.
+		csr_rhs = _csr_evolve_rhs.supported(self)
+
 		if eom == "SE":
 			if v0.ndim > 2:
 				raise ValueError("v0 must have ndim <= 2")
@@ -1448,12 +1770,14 @@ class hamiltonian(object):
 				raise ValueError("v0 must have {0} elements".format(self.Ns))
 
 			if imag_time:
-				if v0.ndim == 1:
+				v0 = v0.astype(self.dtype)
+				if csr_rhs:
+					evolve_args = evolve_args + (_csr_evolve_rhs(self,v0.shape,v0.dtype,a=-1.0).SO,)
+				elif v0.ndim == 1:
 					evolve_args  = evolve_args + (self.__ISO,)
 				else:
 					evolve_args  = evolve_args + (self.__multi_ISO,)
 
-				v0 = v0.astype(self.dtype)
 				if _np.iscomplexobj(v0):
 					evolve_kwargs["real"]=False
 				else:
@@ -1461,13 +1785,18 @@ class hamiltonian(object):
 			else:
 				if stack_state:
 					evolve_kwargs["real"]=False
-					if v0.ndim == 1:
+					if csr_rhs and self._dtype == _np.float64:
+						shape = (2*self.Ns,)+v0.shape[1:]
+						evolve_args = evolve_args + (_csr_evolve_rhs(self,shape,_np.float64).SO_real,)
+					elif v0.ndim == 1:
 						evolve_args = evolve_args + (self.__SO_real,)
 					else:
 						evolve_args = evolve_args + (self.__multi_SO_real,)
 				else:
 					evolve_kwargs["real"]=False
-					if v0.ndim == 1:
+					if csr_rhs:
+						evolve_args = evolve_args + (_csr_evolve_rhs(self,v0.shape,_np.complex128,a=-1j).SO,)
+					elif v0.ndim == 1:
 						evolve_args = evolve_args + (self.__SO,)
 					else:
 						evolve_args = evolve_args + (self.__multi_SO,)
@@ -1485,6 +1814,8 @@ class hamiltonian(object):
 			else:
 				if stack_state:
 					raise NotImplementedError("stack_state not implemented for Liouville-von Neumann dynamics")
+				elif csr_rhs:
+					evolve_args = evolve_args + (_csr_evolve_rhs(self,self._shape,_np.complex128,transposed=True).LO,)
 				else:
 					evolve_args = evolve_args + (self.__LO,)
 		else:
@@ -1547,10 +1878,15 @@ class hamiltonian(object):
 		if _np.array(time).ndim > 0:
 			raise TypeError('expecting scalar argument for time')
 
+		if self._kron is not None: # the factored form is kept.
+			static,dynamic = self._kron
+			static,dynamic = static.tocsr(),{func:Hd.tocsr() for func,Hd in iteritems(dynamic)}
+		else:
+			static,dynamic = self._static,self._dynamic
 
-		H = _sp.csr_matrix(self._static)
+		H = _sp.csr_matrix(static)
 
-		for func,Hd in iteritems(self._dynamic):
+		for func,Hd in iteritems(dynamic):
 			Hd = _sp.csr_matrix(Hd)
 			try:
 				H += Hd * func(time)
@@ -1779,6 +2115,10 @@ class hamiltonian(object):
 		>>> H_tran = H.transpose()
 
 		"""
+		if self._kron is not None:
+			static,dynamic = self._kron
+			return _kron_hamiltonian(static.T,{func:Hd.T for func,Hd in iteritems(dynamic)},self._basis,self._dtype)
+
 		dynamic = [[M.T,func] for func,M in iteritems(self.dynamic)]
 		return hamiltonian([self.static.T],dynamic,
 						basis=self._basis,dtype=self._dtype,copy=copy)
@@ -1801,6 +2141,10 @@ class hamiltonian(object):
 		>>> H_conj = H.conjugate()
 
 		"""
+		if self._kron is not None:
+			static,dynamic = self._kron
+			return _kron_hamiltonian(static.conj(),{func.conj():Hd.conj() for func,Hd in iteritems(dynamic)},self._basis,self._dtype)
+
 		dynamic = [[M.conj(),func.conj()] for func,M in iteritems(self.dynamic)]
 		return hamiltonian([self.static.conj()],dynamic,
 							basis=self._basis,dtype=self._dtype)		
@@ -1926,6 +2270,91 @@ class hamiltonian(object):
 		return hamiltonian([self.static],dynamic,
 					basis=self._basis,dtype=self._dtype,copy=deep)
 
+	def save(self,path):
+		"""Saves the `hamiltonian` object to a directory, to be read back with `hamiltonian.load()`.
+
+		Notes
+		-----
+		The `indptr`, `indices` and `data` arrays of every sparse part (and every dense part) are stored as separate 
+		`.npy` files, next to a `manifest.json` file holding the dtype, shape, basis description and drive function 
+		references. The basis itself is not saved. The drive functions are pickled by reference and must therefore be 
+		importable (i.e. defined at module level, no lambda functions).
+
+		Operators in factored form (`kron = True`) are saved as csr matrices, which are built for the save only: the 
+		`hamiltonian` keeps its factored form, while `hamiltonian.load()` returns an operator stored in csr format.
+
+		Parameters
+		-----------
+		path : str
+			Directory to save the operator in, created if it does not exist.
+
+		Examples
+		---------
+		>>> H.save("H_dir")
+		>>> H = hamiltonian.load("H_dir")
+
+		"""
+		if self._kron is not None:
+			static,dynamic = self._kron
+			static = static.tocsr()
+			dynamic = [(func,Hd.tocsr()) for func,Hd in iteritems(dynamic)]
+		else:
+			static = self._static
+			dynamic = list(iteritems(self._dynamic))
+
+		_save_operator(path,"hamiltonian",self._dtype,self._shape,self._basis,[(None,static)],dynamic)
+
+	@classmethod
+	def load(cls,path,mmap=True,basis=None):
+		"""Reads a `hamiltonian` object saved with `hamiltonian.save()`.
+
+		Notes
+		-----
+		With `mmap=True` the arrays are memory-mapped (copy-on-write) instead of read into memory, so that all 
+		processes loading the same files share one physical copy of the matrices.
+
+		Parameters
+		-----------
+		path : str
+			Directory the operator was saved in.
+		mmap : bool, optional
+			Memory-map the operator arrays. Default is `True`.
+		basis : :obj:`basis`, optional
+			Basis to attach to the loaded operator, must span a Hilbert space of the same dimension.
+
+		Returns
+		--------
+		:obj:`hamiltonian`
+			The loaded operator.
+
+		Examples
+		---------
+		>>> H = hamiltonian.load("H_dir",mmap=True)
+
+		"""
+		manifest,static,dynamic = _load_operator(path,"hamiltonian",mmap=mmap)
+
+		shape = tuple(manifest["shape"])
+		if basis is not None and basis.Ns != shape[0]:
+			raise ValueError("basis with Ns={0} does not match saved operator of shape {1}.".format(basis.Ns,shape))
+
+		H = cls.__new__(cls)
+		H._basis = basis
+		H._dtype = _np.dtype(manifest["dtype"]).type
+		H._shape = shape
+		H._Ns = shape[0]
+		H._ndim = 2
+		H._static_opstr_list = []
+		H._dynamic_opstr_list = []
+		H._fused_mode = False
+		H._fused = None
+		H._kron = None
+		H._static = static[0][1]
+		H._dynamic = dict(dynamic)
+		H._is_dense = any(not _sp.issparse(M) for M in [H._static]+list(H._dynamic.values()))
+
+		return H
+
 	###################
 	# special methods #
 	###################
@@ -1974,6 +2403,8 @@ class hamiltonian(object):
 						}
 		if self.is_dense:
 			return "<{0}x{1} qspin dense hamiltonian of type '{2}'>".format(*(self._shape[0],self._shape[1],self._dtype))
+		elif self._kron is not None:
+			return "<{0}x{1} qspin sprase hamiltonian of type '{2}' stored in factored (kronecker product) format>".format(*(self._shape[0],self._shape[1],self._dtype))
 		else:
 			fmt = matrix_format[self._static.getformat()]
 			return "<{0}x{1} qspin sprase hamiltonian of type '{2}' stored in {3} format>".format(*(self._shape[0],self._shape[1],self._dtype,fmt))
@@ -2070,6 +2501,7 @@ class hamiltonian(object):
 			return self._rmul_dense(other)
 
 	def __imul__(self,other): # self *= other
+		self._fused = None
 		if ishamiltonian(other):
 			self._mat_checks(other)
 			return self._imul_hamiltonian(other)
@@ -2121,6 +2553,7 @@ class hamiltonian(object):
 		return NotImplemented
 
 	def __idiv__(self,other): # self *= other
+		self._fused = None
 		if ishamiltonian(other):
 			return NotImplemented
 		
@@ -2171,6 +2604,7 @@ class hamiltonian(object):
 		return self.__add__(other)
 
 	def __iadd__(self,other): # self += other
+		self._fused = None
 		if ishamiltonian(other):
 			self._mat_checks(other)
 			return self._iadd_hamiltonian(other)
@@ -2223,6 +2657,7 @@ class hamiltonian(object):
 		return self.__sub__(other).__neg__()
 
 	def __isub__(self,other): # self -= other
+		self._fused = None
 		if ishamiltonian(other):
 			self._mat_checks(other)
 			return self._isub_hamiltonian(other)
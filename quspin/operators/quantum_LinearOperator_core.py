@@ -4,10 +4,10 @@ from .hamiltonian_core import ishamiltonian
 from .hamiltonian_core import _check_static
 from .hamiltonian_core import supported_dtypes
 from .hamiltonian_core import hamiltonian
+from .hamiltonian_core import _default_basis
 
 from ._make_hamiltonian import _consolidate_static
 
-from ..basis import spin_basis_1d as _default_basis
 from ..basis import isbasis as _isbasis
 
 # need linear algebra packages
@@ -32,7 +32,11 @@ class quantum_LinearOperator(LinearOperator):
 
 	Notes
 	-----
-	The class does NOT yet support time-dependent operators. 
+	* The class does NOT yet support time-dependent operators.
+	* For the `..._basis_general` classes, the matrix elements are calculated on the fly by the compiled basis cores
+	  and added directly to the result, without any additional memory. For the `..._basis_1d` classes, the matrix
+	  elements of one operator string at a time are calculated for all basis states before they are added to the
+	  result, which takes memory of order of the number of states `Ns`.
 
 	Examples
 	---------
@@ -136,7 +140,7 @@ class quantum_LinearOperator(LinearOperator):
 					if row.shape[0] == self.Ns:
 						self._diagonal += ME.real
 					else:
-						self._diagonal[row] += ME[row].real
+						self._diagonal[row] += ME.real
 				else:
 					while len(row) > 0:
 						# if there are multiply matrix elements per row as there are for some
@@ -288,7 +292,7 @@ class quantum_LinearOperator(LinearOperator):
 
 		for opstr,indx,J in self.static_list:
 			self.basis.inplace_Op(other,opstr, indx, J, self._dtype,
-								self._conjugated,self._transposed,v_out=new_other)
+								transposed=self._transposed,conjugated=self._conjugated,v_out=new_other)
 		return new_other
 
 	def _rmatvec(self,other):
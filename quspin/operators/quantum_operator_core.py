@@ -1,11 +1,13 @@
 from __future__ import print_function, division
 
-from ..basis import spin_basis_1d as _default_basis
 from ..basis import isbasis as _isbasis
 
 from ._make_hamiltonian import make_static
+from ._functions import function
 
 from . import hamiltonian_core
+from ._operator_io import _save_operator,_load_operator
+from .hamiltonian_core import _default_basis,_kron_hamiltonian
 
 # need linear algebra packages
 import scipy.sparse.linalg as _sla
@@ -22,6 +24,82 @@ __all__=["quantum_operator","isquantum_operator"]
 def _quantum_operator_dot(op,pars,v):
 	return op.dot(v,pars=pars,check=False)
 
+
+class _fused_csr(object):
+	"""Sparse parts of a `quantum_operator` stored on the union of their sparsity patterns. The data of all keys
+	is aligned to the union pattern as the columns of a sparse (nnz,n_keys) matrix, such that the matrix for a set 
+	of parameters is obtained by a single product of this matrix with the vector of couplings, written into a 
+	persistent csr buffer."""
+	def __init__(self,op_dict,shape,dtype):
+		from ..tools.expm_multiply_parallel_core import csr_matvec
+
+		self._csr_matvec = csr_matvec
+		self._keys = list(op_dict.keys())
+
+		parts = []
+		pattern = _sp.csr_matrix(shape,dtype=_np.int32)
+		for key in self._keys:
+			M = _sp.csr_matrix(op_dict[key],dtype=dtype)
+			if not M.has_canonical_format: # avoids modifying the operators of the `quantum_operator`.
+				M = M.copy()
+				M.sum_duplicates()
+			parts.append(M)
+			pattern = pattern + _sp.csr_matrix((_np.ones_like(M.indices),M.indices,M.indptr),shape=shape)
+
+		pattern.sort_indices()
+
+		def positions(M): # positions of the matrix elements in row-major order.
+			return _np.repeat(_np.arange(shape[0],dtype=_np.int64),_np.diff(M.indptr))*shape[1] + M.indices
+
+		union = positions(pattern)
+		rows = _np.hstack([_np.searchsorted(union,positions(M)) for M in parts])
+		cols = _np.hstack([_np.full(M.nnz,i,dtype=_np.int64) for i,M in enumerate(parts)])
+		data = _np.hstack([M.data for M in parts])
+		self._data = _sp.csr_matrix((data,(rows,cols)),shape=(pattern.nnz,len(parts)),dtype=dtype)
+
+		self._buffer = _sp.csr_matrix((_np.zeros(pattern.nnz,dtype=dtype),pattern.indices,pattern.indptr),shape=shape)
+		self._buffer.has_sorted_indices = True
+		self._J = None
+
+	def _update(self,pars):
+		J = _np.array([pars[key] for key in self._keys])
+		dtype = self._data.dtype
+		if _np.iscomplexobj(J):
+			dtype = _np.result_type(dtype,_np.complex64)
+		J = J.astype(dtype)
+
+		if self._J is not None and J.dtype == self._J.dtype and _np.array_equal(J,self._J):
+			return
+
+		if dtype != self._buffer.dtype:
+			self._buffer = _sp.csr_matrix((_np.zeros(self._buffer.nnz,dtype=dtype),self._buffer.indices,self._buffer.indptr),
+				shape=self._buffer.shape)
+			self._buffer.has_sorted_indices = True
+
+		if self._data.dtype in [_np.float64,_np.complex128] and dtype in [_np.float64,_np.complex128]:
+			self._csr_matvec(self._data,J,out=self._buffer.data,overwrite_out=True)
+		else:
+			self._buffer.data[:] = self._data.dot(J)
+
+		self._J = J
+
+	def tocsr(self,pars,copy=True):
+		self._update(pars)
+		if copy:
+			M = self._buffer.copy()
+			M.eliminate_zeros()
+			return M
+		else:
+			return self._buffer
+
+	def dot(self,pars,V):
+		self._update(pars)
+		result_dtype = _np.result_type(V.dtype,self._buffer.dtype)
+		if result_dtype in [_np.float64,_np.complex128] and self._buffer.dtype in [_np.float64,_np.complex128]:
+			return self._csr_matvec(self._buffer,V)
+		else:
+			return self._buffer.dot(V)
+
 class quantum_operator(object):
 	"""Constructs parameter-dependent (hermitian and nonhermitian) operators.
 
@@ -45,7 +123,12 @@ class quantum_operator(object):
 			:lines: 7-
 
 	"""
-	def __init__(self,input_dict,N=None,basis=None,shape=None,copy=True,check_symm=True,check_herm=True,check_pcon=True,dtype=_np.complex128,**basis_args):
+	# defaults for objects which do not set these attributes in `__init__` (e.g. unpickled from older versions).
+	_fused_mode = False
+	_fused = None
+	_kron = None
+
+	def __init__(self,input_dict,N=None,basis=None,shape=None,copy=True,check_symm=True,check_herm=True,check_pcon=True,dtype=_np.complex128,kron=False,**basis_args):
 		"""Intializes the `quantum_operator` object (parameter dependent quantum quantum_operators).
 
 		Parameters
@@ -74,6 +157,10 @@ class quantum_operator(object):
 			Enable/Disable hermiticity check on `static_list` and `dynamic_list`.
 		check_pcon : bool, optional
 			Enable/Disable particle conservation check on `static_list` and `dynamic_list`.
+		kron : bool, optional
+			For a `tensor_basis` (or a `photon_basis` with `Nph`), store the operator strings in factored form, 
+			see the `kron` argument of `hamiltonian`. `dot`, `eigsh` and `tohamiltonian` use the factored form, all 
+			other methods convert the operator to csr format on first use. Default is `kron = False`.
 		kw_args : dict
 			Optional additional arguments to pass to the `basis` class, if not already using a `basis` object
 			to create the quantum_operator.		
@@ -82,6 +169,9 @@ class quantum_operator(object):
 		self._is_dense = False
 		self._ndim = 2
 		self._basis = basis
+		self._fused_mode = False
+		self._fused = None
+		self._kron = None
 
 
 
@@ -116,6 +206,9 @@ class quantum_operator(object):
 			other_dict = {key:[value] for key,value in input_dict._quantum_operator_dict.items()} 
 		else:
 			raise ValueError("input_dict must be dictionary or another quantum_operator quantum_operators")
+
+		if kron and other_dict:
+			raise ValueError("kron=True requires input_dict to contain operator strings only.")
 			
 
 
@@ -157,8 +250,11 @@ class quantum_operator(object):
 
 			self._shape=(basis.Ns,basis.Ns)
 
-			for key,opstr_list in iteritems(opstr_dict):
-				self._quantum_operator[key]=make_static(basis,opstr_list,dtype)
+			if kron:
+				self._kron = {key:make_static(basis,opstr_list,dtype,kron=True) for key,opstr_list in iteritems(opstr_dict)}
+			else:
+				for key,opstr_list in iteritems(opstr_dict):
+					self._quantum_operator[key]=make_static(basis,opstr_list,dtype)
 
 		if other_dict:
 			if not hasattr(self,"_shape"):
@@ -271,6 +367,30 @@ class quantum_operator(object):
 		self._Ns = self._shape[0]
 
 
+	# the csr (or dense) storage of the operators, operators in factored form are converted on first access.
+	@property
+	def _quantum_operator(self):
+		if self._kron is not None:
+			self._kron_tocsr()
+		return self._quantum_operator_matrices
+
+	@_quantum_operator.setter
+	def _quantum_operator(self,op_dict):
+		self._quantum_operator_matrices = op_dict
+
+	def _kron_tocsr(self):
+		op_dict = self._kron
+		self._kron = None
+		self._quantum_operator = {key:op.tocsr() for key,op in iteritems(op_dict)}
+
+	def __setstate__(self,state):
+		# objects pickled before the operators were stored behind the `_quantum_operator` property.
+		state = dict(state)
+		if "_quantum_operator" in state:
+			state["_quantum_operator_matrices"] = state.pop("_quantum_operator")
+
+		self.__dict__.update(state)
+
 	@property
 	def basis(self):
 		""":obj:`basis`: basis used to build the `hamiltonian` object. Defaults to `None` if quantum_operator has 
@@ -400,8 +520,10 @@ class quantum_operator(object):
 
 		Notes
 		-----
-		It is faster to multiply the individual (static, dynamic) parts of the Hamiltonian first, then add all those 
-		vectors together.
+		By default the operator of every key is applied to `V` separately and the results are summed with their
+		couplings. In fused mode (see `set_fused`), the couplings of sparse operators are first combined into a
+		csr matrix on the union of the sparsity patterns of all keys, which is reused as long as `pars` does not
+		change, and the product takes a single pass over that matrix.
 
 		Parameters
 		-----------
@@ -432,13 +554,21 @@ class quantum_operator(object):
 			return _np.asarray([])
 
 		pars = self._check_scalar_pars(pars)
+		fused = self._get_fused()
 
+		if self._kron is not None and not _sp.issparse(V):
+			op_dict = self._kron
+		else:
+			op_dict = self._quantum_operator
 
 		if not check:
+			if fused is not None and V.__class__ is _np.ndarray:
+				return fused.dot(pars,V)
+
 			result_dtype = _np.result_type(V,self._dtype)
 			V_dot = _np.zeros(V.shape,dtype=result_dtype)
 			for key,J in pars.items():
-				V_dot += J*self._quantum_operator[key].dot(V)
+				V_dot += J*op_dict[key].dot(V)
 			return V_dot
 
 		if V.ndim > 2:
@@ -451,10 +581,13 @@ class quantum_operator(object):
 			if V.shape[0] != self._shape[1]:
 				raise ValueError("matrix dimension mismatch with shapes: {0} and {1}.".format(V.shape,self._shape))
 
+			if fused is not None:
+				return fused.dot(pars,V)
+
 			result_dtype = _np.result_type(V,self._dtype)
 			V_dot = _np.zeros(V.shape,dtype=result_dtype)
 			for key,J in pars.items():
-				V_dot += J*self._quantum_operator[key].dot(V)
+				V_dot += J*op_dict[key].dot(V)
 
 
 		elif _sp.issparse(V):
@@ -464,7 +597,7 @@ class quantum_operator(object):
 			result_dtype = _np.result_type(V,self._dtype)
 			V_dot = _np.zeros(V.shape,dtype=result_dtype)	
 			for key,J in pars.items():
-				V_dot += J*self._quantum_operator[key].dot(V)
+				V_dot += J*op_dict[key].dot(V)
 
 
 
@@ -475,7 +608,7 @@ class quantum_operator(object):
 			result_dtype = _np.result_type(V,self._dtype)
 			V_dot = _np.zeros(V.shape,dtype=result_dtype)
 			for key,J in pars.items():
-				V_dot += J*self._quantum_operator[key].dot(V)
+				V_dot += J*op_dict[key].dot(V)
 
 		else:
 			V = _np.asanyarray(V)
@@ -488,7 +621,7 @@ class quantum_operator(object):
 			result_dtype = _np.result_type(V,self._dtype)
 			V_dot = _np.zeros(V.shape,dtype=result_dtype)
 			for key,J in pars.items():
-				V_dot += J*self._quantum_operator[key].dot(V)
+				V_dot += J*op_dict[key].dot(V)
 
 
 		return V_dot
@@ -675,7 +808,12 @@ class quantum_operator(object):
 		if self.Ns == 0:
 			return _np.array([]),_np.array([[]])
 
-		return _sla.eigsh(self.tocsr(pars),**eigsh_args)
+		if self._kron is not None and eigsh_args.get("sigma") is None:
+			pars = self._check_scalar_pars(pars)
+			matvec = functools.partial(_quantum_operator_dot,self,pars)
+			return _sla.eigsh(_sla.LinearOperator(self.get_shape,matvec,matmat=matvec,dtype=self._dtype),**eigsh_args)
+
+		return _sla.eigsh(self.tocsr(pars,copy=False),**eigsh_args)
 
 	def eigh(self,pars={},**eigh_args):
 		"""Computes COMPLETE eigensystem of hermitian `quantum_operator` quantum_operator using DENSE hermitian methods.
@@ -761,18 +899,28 @@ class quantum_operator(object):
 
 	### routines to change object type	
 
-	def tocsr(self,pars={}):
+	def tocsr(self,pars={},copy=True):
 		"""Returns copy of a `quantum_operator` object for parameters `pars` as a `scipy.sparse.csr_matrix`.
 
 		Casts the `quantum_operator` object as a
 		`scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_
 		object.
 
+		Notes
+		-----
+		In fused mode (see `set_fused`), only the data of the matrix is recomputed for new parameters. The buffer 
+		returned for `copy = False` is stored on the union of the sparsity patterns of all keys, hence it may contain 
+		explicit zeros.
+
 		Parameters
 		-----------
 		pars : dict, optional
 			Dictionary with same `keys` as `input_dict` and coupling strengths as `values`. Any missing `keys`
 			are assumed to be set to inity. 
+		copy : bool, optional
+			In fused mode, if set to `False`, the internal csr buffer is returned instead of a copy. It is overwritten
+			by the next call with different `pars`, which avoids all allocations in parameter sweeps. Ignored otherwise.
+			Default is `copy = True`.
 
 		Returns
 		--------
@@ -784,6 +932,10 @@ class quantum_operator(object):
 
 		"""
 		pars = self._check_scalar_pars(pars)
+		fused = self._get_fused()
+
+		if fused is not None:
+			return fused.tocsr(pars,copy=copy)
 
 		H = _sp.csr_matrix(self.get_shape,dtype=self._dtype)
 
@@ -819,6 +971,11 @@ class quantum_operator(object):
 		"""
 		pars = self._check_scalar_pars(pars)
 
+		if self._get_fused() is not None:
+			H = self._fused.tocsr(pars,copy=False).tocsc()
+			H.eliminate_zeros()
+			return H
+
 		H = _sp.csc_matrix(self.get_shape,dtype=self._dtype)
 
 		for key,J in pars.items():
@@ -954,18 +1111,36 @@ class quantum_operator(object):
 		"""
 		pars = self._check_hamiltonian_pars(pars)
 
+		if self._kron is not None: # the `hamiltonian` keeps the factored form.
+			static = 0*next(itervalues(self._kron))
+			dynamic = {}
+			for key,J in pars.items():
+				if type(J) is tuple and len(J) == 2:
+					func = function(J[0],tuple(J[1]))
+					dynamic[func] = (dynamic[func] + self._kron[key] if func in dynamic else self._kron[key])
+				else:
+					static = static + J*self._kron[key]
+
+			return _kron_hamiltonian(static,dynamic,self._basis,self._dtype)
+
 		static=[]
 		dynamic=[]
 
+		static_pars = {key:(0.0 if type(J) is tuple else J) for key,J in pars.items()}
+		fused = self._get_fused()
+
 		for key,J in pars.items():
 			if type(J) is tuple and len(J) == 2:
 				dynamic.append([self._quantum_operator[key],J[0],J[1]])
-			else:
+			elif fused is None:
 				if J == 1.0:
 					static.append(self._quantum_operator[key])
 				else:
 					static.append(J*self._quantum_operator[key])
 
+		if fused is not None:
+			static.append(fused.tocsr(static_pars))
+
 		return hamiltonian_core.hamiltonian(static,dynamic,dtype=self._dtype)
 
 
@@ -1141,6 +1316,85 @@ class quantum_operator(object):
 		"""Returns a deep copy of `quantum_operator` object."""
 		return quantum_operator(self._quantum_operator_dict,basis=self._basis,dtype=self._dtype,copy=deep)
 
+	def save(self,path):
+		"""Saves the `quantum_operator` object to a directory, to be read back with `quantum_operator.load()`.
+
+		Notes
+		-----
+		The `indptr`, `indices` and `data` arrays of every sparse operator (and every dense operator) are stored as 
+		separate `.npy` files, next to a `manifest.json` file holding the dtype, shape, keys and basis description. 
+		The basis itself is not saved.
+
+		Operators in factored form (`kron = True`) are saved as csr matrices, which are built for the save only: the 
+		`quantum_operator` keeps its factored form, while `quantum_operator.load()` returns an operator stored in csr 
+		format.
+
+		Parameters
+		-----------
+		path : str
+			Directory to save the operator in, created if it does not exist.
+
+		Examples
+		---------
+		>>> H.save("H_dir")
+		>>> H = quantum_operator.load("H_dir")
+
+		"""
+		if self._kron is not None:
+			static = [(key,op.tocsr()) for key,op in iteritems(self._kron)]
+		else:
+			static = list(iteritems(self._quantum_operator))
+
+		_save_operator(path,"quantum_operator",self._dtype,self._shape,self._basis,static)
+
+	@classmethod
+	def load(cls,path,mmap=True,basis=None):
+		"""Reads a `quantum_operator` object saved with `quantum_operator.save()`.
+
+		Notes
+		-----
+		With `mmap=True` the arrays are memory-mapped (copy-on-write) instead of read into memory, so that all 
+		processes loading the same files share one physical copy of the matrices.
+
+		Parameters
+		-----------
+		path : str
+			Directory the operator was saved in.
+		mmap : bool, optional
+			Memory-map the operator arrays. Default is `True`.
+		basis : :obj:`basis`, optional
+			Basis to attach to the loaded operator, must span a Hilbert space of the same dimension.
+
+		Returns
+		--------
+		:obj:`quantum_operator`
+			The loaded operator.
+
+		Examples
+		---------
+		>>> H = quantum_operator.load("H_dir",mmap=True)
+
+		"""
+		manifest,static,_ = _load_operator(path,"quantum_operator",mmap=mmap)
+
+		shape = tuple(manifest["shape"])
+		if basis is not None and basis.Ns != shape[0]:
+			raise ValueError("basis with Ns={0} does not match saved operator of shape {1}.".format(basis.Ns,shape))
+
+		H = cls.__new__(cls)
+		H._basis = basis
+		H._dtype = _np.dtype(manifest["dtype"]).type
+		H._shape = shape
+		H._Ns = shape[0]
+		H._ndim = 2
+		H._fused_mode = False
+		H._fused = None
+		H._kron = None
+		H._quantum_operator = dict(static)
+		H._is_dense = any(not _sp.issparse(M) for M in H._quantum_operator.values())
+
+		return H
+
 
 	def __call__(self,**pars):
 		pars = self._check_scalar_pars(pars)
@@ -1160,6 +1414,7 @@ class quantum_operator(object):
 					self._quantum_operator_dict[key] = self._quantum_operator_dict[key] + value
 				else:
 					self._quantum_operator_dict[key] = value
+			self._fused = None
 			return self
 		elif other == 0:
 			return self
@@ -1182,6 +1437,7 @@ class quantum_operator(object):
 					self._quantum_operator_dict[key] = self._quantum_operator_dict[key] - value
 				else:
 					self._quantum_operator_dict[key] = -value
+			self._fused = None
 			return self
 		elif other == 0:
 			return self
@@ -1201,6 +1457,7 @@ class quantum_operator(object):
 			for op in itervalues(self._quantum_operator_dict):
 				op *= other
 
+			self._fused = None
 			return self
 
 	def __mul__(self,other):
@@ -1216,6 +1473,7 @@ class quantum_operator(object):
 			for op in itervalues(self._quantum_operator_dict):
 				op /= other
 
+			self._fused = None
 			return self
 
 	def __div__(self,other):
@@ -1227,16 +1485,62 @@ class quantum_operator(object):
 
 
 
+	def set_fused(self,fused=True):
+		"""Enables/disables the fused storage mode of the `quantum_operator`.
+
+		In fused mode, the operators of all keys are stored on a single csr sparsity pattern (the union of the 
+		patterns of all keys). The matrix for a set of parameters is then obtained by a single product of the aligned
+		data with the vector of couplings, written into a persistent csr buffer which is reused by `dot`, `tocsr`,
+		`tocsc`, `eigsh` and `tohamiltonian` as long as the parameters do not change.
+
+		Notes
+		-----
+		* The fused storage is kept in addition to the operators of the individual keys: it holds another copy of the 
+		  data of all keys (with their positions in the union pattern) plus the csr buffer, which more than doubles the 
+		  memory used by the `quantum_operator`. 
+		* The storage is built on first use and rebuilt after in-place operations on the `quantum_operator`. It is not
+		  used for operators with dense parts, nor for operators in factored form (`kron = True`).
+
+		Parameters
+		-----------
+		fused : bool, optional
+			Toggles the fused storage. Default is `fused = True`.
+
+		Examples
+		---------
+		>>> H.set_fused(True)
+		>>> for lam in lams:
+		>>> 	H_psi = H.dot(psi,pars={"lambda":lam})
+
+		"""
+		self._fused_mode = bool(fused)
+		self._fused = None
+
+	def _get_fused(self):
+		# builds the fused representation of sparse operators on first use.
+		if self._fused is None and self._fused_mode and not self._is_dense and self._kron is None and self.Ns > 0 and len(self._quantum_operator) > 0:
+			if all(_sp.issparse(op) for op in itervalues(self._quantum_operator)):
+				self._fused = _fused_csr(self._quantum_operator,self._shape,self._dtype)
+
+		return self._fused
+
+	def _op_keys(self):
+		# the keys of the operators, without converting operators in factored form.
+		if self._kron is not None:
+			return set(self._kron.keys())
+		else:
+			return set(self._quantum_operator.keys())
+
 	def _check_hamiltonian_pars(self,pars):
 
 		if not isinstance(pars,dict):
 			raise ValueError("expecing dictionary for parameters.")
 
-		extra = set(pars.keys()) - set(self._quantum_operator.keys())
+		extra = set(pars.keys()) - self._op_keys()
 		if extra:
 			raise ValueError("unexpected couplings: {}".format(extra))
 
-		missing = set(self._quantum_operator.keys()) - set(pars.keys())
+		missing = self._op_keys() - set(pars.keys())
 		for key in missing:
 			pars[key] = _np.array(1,dtype=_np.int32)
 
@@ -1258,12 +1562,12 @@ class quantum_operator(object):
 		if not isinstance(pars,dict):
 			raise ValueError("expecing dictionary for parameters.")
 
-		extra = set(pars.keys()) - set(self._quantum_operator.keys())
+		extra = set(pars.keys()) - self._op_keys()
 		if extra:
 			raise ValueError("unexpected couplings: {}".format(extra))
 
 
-		missing = set(self._quantum_operator.keys()) - set(pars.keys())
+		missing = self._op_keys() - set(pars.keys())
 		for key in missing:
 			pars[key] = _np.array(1,dtype=_np.int32)
 
@@ -3,6 +3,7 @@
 from __future__ import print_function, division
 
 from ..operators import hamiltonian,ishamiltonian
+from .expm_multiply_parallel_core import expm_multiply_parallel
 
 
 # need linear algebra packages
@@ -69,31 +70,32 @@ def _evolve_cont(i,H,T,atol=1E-9,rtol=1E-9):
 
 
 
-def _evolve_step_3(i,H_list,dt_list):
-	"""This function calculates the evolved state for Periodic Step (point 3. in def of 'evo_dict'). 
+def _evolve_step_block(i_start,i_stop,Ns,U_list):
+	"""This function evolves the block of local basis states i_start,...,i_stop-1 with the exponentials
+	U_list of the generators of the Periodic Step (points 2. and 3. in def of 'evo_dict'). The columns of 
+	the block are evolved simultaneously by `expm_multiply_parallel.dot`.
 	
 	"""
 	
-	psi0=_np.zeros((H_list[0].Ns,),dtype=_np.complex128) 
-	psi0[i]=1.0
+	psi0=_np.zeros((Ns,i_stop-i_start),dtype=_np.complex128) 
+	psi0[_np.arange(i_start,i_stop),_np.arange(i_stop-i_start)]=1.0
+	work_array=_np.zeros((2*Ns,i_stop-i_start),dtype=_np.complex128)
 
-	for dt,H in zip(dt_list,H_list):
-		psi0 = _sla.expm_multiply(-1j*dt*H.tocsr(),psi0)
+	for U in U_list:
+		psi0 = U.dot(psi0,work_array=work_array,overwrite_v=True)
 
-	return psi0
+	return psi0.T
 
-def _evolve_step_2(i,H,t_list,dt_list):
-	"""This function calculates the evolved state for Periodic Step (point 2. in def of 'evo_dict'. 
-	
-	"""
-	
-	psi0=_np.zeros((H.Ns,),dtype=_np.complex128) 
-	psi0[i]=1.0
+def _block_iter(Ns,n_jobs):
+	"""This function splits the basis states into one block per job."""
+	if n_jobs < 0:
+		from joblib import cpu_count
+		n_jobs = max(cpu_count()+1+n_jobs,1)
 
-	for t,dt in zip(t_list,dt_list):
-		psi0 = _sla.expm_multiply(-1j*dt*H.tocsr(t),psi0)
+	n_blocks = max(min(n_jobs,Ns),1)
+	bounds = _np.linspace(0,Ns,num=n_blocks+1,endpoint=True).astype(_np.int64).tolist()
 
-	return psi0
+	return zip(bounds[:-1],bounds[1:])
 	
 	
 
@@ -105,14 +107,20 @@ def _get_U_cont(H,T,n_jobs,atol=1E-9,rtol=1E-9):
 	return vstack(sols)
 
 def _get_U_step_3(H_list,dt_list,n_jobs): 
-	
-	sols=Parallel(n_jobs=n_jobs)(delayed(_evolve_step_3)(i,H_list,dt_list) for i in _range_iter(0,H_list[0].Ns,1))
+	# the generators and their norm estimates (the partition of the Taylor series) are calculated once and 
+	# shared by all blocks. The generators are promoted to double precision to act on the complex128 states.
+	U_list = [expm_multiply_parallel(H.tocsr().astype(_np.result_type(H.dtype,_np.float64)),a=-1j*dt) for dt,H in zip(dt_list,H_list)]
+	Ns = H_list[0].Ns
+	sols=Parallel(n_jobs=n_jobs)(delayed(_evolve_step_block)(i_start,i_stop,Ns,U_list) for i_start,i_stop in _block_iter(Ns,n_jobs))
 
 	return vstack(sols)
 
 def _get_U_step_2(H,t_list,dt_list,n_jobs): 
-	
-	sols=Parallel(n_jobs=n_jobs)(delayed(_evolve_step_2)(i,H,t_list,dt_list) for i in _range_iter(0,H.Ns,1))
+	# the generators and their norm estimates (the partition of the Taylor series) are calculated once and 
+	# shared by all blocks. The generators are promoted to double precision to act on the complex128 states.
+	dtype = _np.result_type(H.dtype,_np.float64)
+	U_list = [expm_multiply_parallel(H.tocsr(t).astype(dtype),a=-1j*dt) for t,dt in zip(t_list,dt_list)]
+	sols=Parallel(n_jobs=n_jobs)(delayed(_evolve_step_block)(i_start,i_stop,H.Ns,U_list) for i_start,i_stop in _block_iter(H.Ns,n_jobs))
 
 	return vstack(sols)
 
@@ -16,6 +16,8 @@ evolution
 
    ED_state_vs_time
    evolve
+   krylov_evolve
+   magnus_evolve
    expm_multiply_parallel
 
 Floquet
@@ -52,6 +54,20 @@ block_tools
    block_ops 
    block_diag_hamiltonian
 
+kpm
+----
+
+.. currentmodule:: quspin.tools.kpm
+
+.. autosummary::
+   :toctree: generated/
+
+   kpm_bounds
+   kpm_moments
+   kpm_dos
+   jackson_kernel
+   lorentz_kernel
+
 misc
 ----
 
@@ -66,8 +82,9 @@ misc
    mean_level_spacing
 
 """
-from . import evolution
-from . import Floquet
-from . import measurements
-from . import block_tools
-from . import misc
+# the submodules (and their dependencies, e.g. joblib and multiprocessing) are imported on first access.
+from .._lazy_import import _lazy_attributes
+
+__all__ = ["evolution","Floquet","measurements","block_tools","misc","kpm"]
+
+__getattr__,__dir__ = _lazy_attributes(__name__,{name:None for name in __all__+["expm_multiply_parallel_core"]})
@@ -12,8 +12,9 @@ import scipy.sparse as _sp
 from scipy.sparse.linalg import expm_multiply as _expm_multiply
 # multi-processing modules
 from multiprocessing import Process as _Process
-from multiprocessing import Queue as _Queue
-from multiprocessing import Event as _Event
+from multiprocessing import Barrier as _Barrier
+from multiprocessing import RawArray as _RawArray
+from multiprocessing.pool import ThreadPool as _ThreadPool
 
 from joblib import Parallel as _Parallel
 from joblib import delayed as _delayed
@@ -138,14 +139,16 @@ def block_diag_hamiltonian(blocks,static,dynamic,basis_con,basis_args,dtype,basi
 
 
 
-def _worker(gen_func,args_list,q,e):
+def _worker(gen_func,args_list,shared,dtype,slices,free,ready):
 	"""
-	Worker function which loops over one of more generators provided by `gen_func` and returns the result 
-	via queue `q`. 
+	Worker function which loops over one of more generators provided by `gen_func` and writes the results 
+	into the slices `slices` of the shared memory array `shared`. 
 
-	Waits for signal from `e` before continuing. 
+	Waits at barrier `free` until the previous results have been used and signals at barrier `ready` 
+	that the new results are written.
 
 	"""
+	V = _np.frombuffer(shared,dtype=dtype)
 
 	gens = []
 	for arg in args_list:
@@ -153,73 +156,82 @@ def _worker(gen_func,args_list,q,e):
 
 	generator = _izip(*gens)
 	for s in generator:
-		e.clear()
-		q.put(s)
-		e.wait()
+		free.wait()
+		for psi,sl in _izip(s,slices):
+			V[sl] = psi
 
-	q.close()
+		ready.wait()
+
+def _next_states(gens,V,slices):
+	"""Advances the generators `gens` and writes the results into the slices `slices` of `V`."""
+	for gen,sl in _izip(gens,slices):
+		V[sl] = next(gen)
  
-def _generate_parallel(n_process,n_iter,gen_func,args_list):
+def _generate_parallel(n_process,n_iter,gen_func,args_list,sizes,dtype,backend="process"):
 	"""
-	Generator which spawns processes to run generators, then uses a queue for each process to retrieve 
-	the results which it then yields.
+	Generator which runs the generators provided by `gen_func` in `n_process` processes or threads and 
+	writes their results into consecutive slices of a single preallocated array of length `sum(sizes)`, 
+	which is yielded at every iteration. The array is reused, hence it has to be consumed before the next iteration.
 
 	"""
 	n_items = len(args_list)
+	n_process = max(min(n_process,n_items),1)
 
-	# calculate how to distribute generators over processes.
-	if n_items <= n_process and n_process > 0:
-		n_process = n_items
-		n_pp = 1
-		n_left = 1
-	elif n_items > n_process and n_process > 0:
-		n_pp = n_items//n_process
-		n_left = n_pp + n_items%n_process		
+	offsets = _np.cumsum([0]+list(sizes))
+	slices = [slice(offsets[i],offsets[i+1]) for i in range(n_items)]
 
-	# if one process specified just do the generator without sub processes.
-	if n_process <= 1:
-		gens = []
-		for arg in args_list:
-			gens.append(gen_func(*arg))
+	# distribute generators over processes.
+	sub_lists = [list(range(i,n_items,n_process)) for i in range(n_process)]
 
-		generator = _izip(*gens)
+	# if one process specified just do the generator without sub processes.
+	if n_process <= 1 or backend == "thread":
+		V = _np.zeros(offsets[-1],dtype=dtype)
+		gens = [gen_func(*arg) for arg in args_list]
+		pool = (_ThreadPool(n_process) if n_process > 1 else None)
+
+		try:
+			for i in range(n_iter):
+				if pool is None:
+					_next_states(gens,V,slices)
+				else:
+					pool.map(lambda sub_list:_next_states([gens[j] for j in sub_list],V,[slices[j] for j in sub_list]),sub_lists)
 
-		for s in generator:
-			yield s
+				yield V
+		finally:
+			if pool is not None:
+				pool.terminate()
 
 		return 
-	# split up argument list 
-	sub_lists = [args_list[0:n_left]]
-	sub_lists.extend([ args_list[n_left + i*n_pp:n_left + (i+1)*n_pp] for i in range(n_process-1)])
 
-	# create lists of queues, events, and processes.
-	es = []
-	qs = []
+	# the results are exchanged through shared memory.
+	shared = _RawArray("b",int(offsets[-1])*_np.dtype(dtype).itemsize)
+	V = _np.frombuffer(shared,dtype=dtype)
+
+	free = _Barrier(n_process+1)
+	ready = _Barrier(n_process+1)
 	ps = []
-	for i in range(n_process):
-		e = _Event()
-		q = _Queue(1)
-		p = _Process(target=_worker, args=(gen_func,sub_lists[i],q,e))
+	for sub_list in sub_lists:
+		p = _Process(target=_worker, args=(gen_func,[args_list[j] for j in sub_list],shared,dtype,
+											[slices[j] for j in sub_list],free,ready))
 		p.daemon = True
-		es.append(e)
-		qs.append(q)
 		ps.append(p)
 
-
 	# start processes
 	for p in ps:
 		p.start()
 
-	# for number of iterations
-	for i in range(n_iter):
-		s = []
-		# retrieve results for each sub-process and let the process know to continue calculation.
-		for q,e in _izip(qs,es):
-			s.extend(q.get())
-			e.set() # free process to do next calculation
+	try:
+		# for number of iterations
+		for i in range(n_iter):
+			free.wait() # let processes write the results of the current step.
+			ready.wait()
+			yield V
+
+	except GeneratorExit:
+		for p in ps:
+			p.terminate()
 
-		# yield all results
-		yield tuple(s)
+		raise
 
 	# end processes
 	for p in ps:
@@ -247,25 +259,36 @@ def _expm_gen(psi,H,times,dt):
 
 
 
-def _block_evolve_iter(psi_blocks,H_list,P,t0,times,stack_state,imag_time,solver_name,solver_args,n_jobs):
+def _block_evolve_iter(psi_blocks,H_list,P,t0,times,stack_state,imag_time,solver_name,solver_args,n_jobs,backend):
 	"""using `_generate_parallel` to get block evolution yields state in full H-space."""
 	args_list = [(psi_blocks[i],H_list[i],t0,times,stack_state,imag_time,solver_name,solver_args) for i in range(len(H_list))]
+	sizes = [psi.shape[0] for psi in psi_blocks]
+	dtype = _np.result_type(P.dtype,_np.complex128)
 
-	for psi_blocks in _generate_parallel(n_jobs,len(times),_evolve_gen,args_list):
-		psi_t = _np.hstack(psi_blocks)
+	for psi_t in _generate_parallel(n_jobs,len(times),_evolve_gen,args_list,sizes,dtype,backend):
 		yield P.dot(psi_t)
 
-def _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs):
+def _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs,backend):
 	"""using `_generate_parallel` to get block evolution yields state in full H-space."""
 	times,dt = _np.linspace(start,stop,num=num,endpoint=endpoint,retstep=True)
 	args_list = [(psi_blocks[i],H_list[i],times,dt) for i in range(len(H_list))]
-	for psi_blocks in _generate_parallel(n_jobs,len(times),_expm_gen,args_list):
-		psi_t = _np.hstack(psi_blocks)
+	sizes = [psi.shape[0] for psi in psi_blocks]
+	dtype = _np.result_type(P.dtype,*([H.dtype for H in H_list]+[psi.dtype for psi in psi_blocks]))
+
+	for psi_t in _generate_parallel(n_jobs,len(times),_expm_gen,args_list,sizes,dtype,backend):
 		yield P.dot(psi_t)	
 
-def _block_evolve_helper(H,psi,t0,times,stack_state,imag_time,solver_name,solver_args):
+def _block_evolve_helper(H,psi,t0,times,stack_state,imag_time,solver_name,solver_args,out=None):
 	"""helper functions for doing evolution not with iterator."""
-	return H.evolve(psi,t0,times,stack_state=stack_state,imag_time=imag_time,solver_name=solver_name,**solver_args)
+	psi_t = H.evolve(psi,t0,times,stack_state=stack_state,imag_time=imag_time,solver_name=solver_name,**solver_args)
+	if out is None:
+		return psi_t
+	else:
+		out[...] = psi_t
+
+def _block_expm_helper(H,psi,start,stop,num,endpoint,out):
+	"""helper functions for doing matrix exponential not with iterator, writes result to `out`."""
+	out[...] = _expm_multiply(H,psi,start=start,stop=stop,num=num,endpoint=endpoint).T
 
 
 class block_ops(object):
@@ -473,7 +496,7 @@ class block_ops(object):
 				self._H_dict[key] = H
 
 
-	def evolve(self,psi_0,t0,times,iterate=False,n_jobs=1,block_diag=False,stack_state=False,imag_time=False,solver_name="dop853",**solver_args):
+	def evolve(self,psi_0,t0,times,iterate=False,n_jobs=1,block_diag=False,stack_state=False,imag_time=False,solver_name="dop853",backend="process",**solver_args):
 		"""Creates symmetry blocks of the Hamiltonian and then uses them to run `hamiltonian.evolve()` in parallel.
 		
 		**Arguments NOT described below can be found in the documentation for the `hamiltonian.evolve()` method.**
@@ -513,6 +536,17 @@ class block_ops(object):
 			blocks in a single giant sparse block diagonal matrix. Default is `False`.
 
 			This flag is useful if there are a lot of smaller-sized blocks.
+		backend : str, optional
+			Execution backend for `n_jobs > 1`, can be either one of:
+
+			* "process": the blocks are evolved in `n_jobs` separate processes (default). With `iterate=True`, 
+			  the states are exchanged through a shared memory array instead of being pickled at every time step.
+			* "thread": the blocks are evolved in a pool of `n_jobs` threads, which avoids all inter-process 
+			  communication. This is efficient when most of the time is spent in sparse matrix products, 
+			  which release the GIL.
+
+			In both cases the states of the blocks are written into a single preallocated array, which is 
+			projected to the full H-space.
 
 		Returns
 		--------
@@ -533,6 +567,9 @@ class block_ops(object):
 			Terminates when initial state has no projection onto the specified symmetry blocks.
 
 		"""
+		if backend not in ["process","thread"]:
+			raise ValueError("backend must be either 'process' or 'thread'.")
+
 		if imag_time:
 			raise ValueError("imaginary time not supported for block evolution.")
 		P = []
@@ -600,7 +637,13 @@ class block_ops(object):
 			if iterate:
 				if _np.isscalar(times):
 					raise ValueError("If iterate=True times must be a list/array.")
-				return _block_evolve_iter(psi_blocks,H_list,P,t0,times,stack_state,imag_time,solver_name,solver_args,n_jobs)
+				return _block_evolve_iter(psi_blocks,H_list,P,t0,times,stack_state,imag_time,solver_name,solver_args,n_jobs,backend)
+			elif backend == "thread":
+				offsets = _np.cumsum([0]+[psi.shape[0] for psi in psi_blocks])
+				psi_t = _np.zeros((offsets[-1],)+_np.shape(times),dtype=_np.result_type(P.dtype,_np.complex128))
+				_Parallel(n_jobs = n_jobs,backend="threading")(_delayed(_block_evolve_helper)(H,psi,t0,times,stack_state,imag_time,solver_name,solver_args,out=psi_t[i1:i2]) for psi,H,i1,i2 in _izip(psi_blocks,H_list,offsets[:-1],offsets[1:]))
+				psi_t = P.dot(psi_t)
+				return psi_t
 			else:
 				psi_t = _Parallel(n_jobs = n_jobs)(_delayed(_block_evolve_helper)(H,psi,t0,times,stack_state,imag_time,solver_name,solver_args) for psi,H in _izip(psi_blocks,H_list))
 				psi_t = _np.vstack(psi_t)
@@ -610,7 +653,7 @@ class block_ops(object):
 			raise RuntimeError("initial state has no projection on to specified blocks.")
 
 
-	def expm(self,psi_0,H_time_eval=0.0,iterate=False,n_jobs=1,block_diag=False,a=-1j,start=None,stop=None,endpoint=None,num=None,shift=None):
+	def expm(self,psi_0,H_time_eval=0.0,iterate=False,n_jobs=1,block_diag=False,a=-1j,start=None,stop=None,endpoint=None,num=None,shift=None,backend="process"):
 		"""Creates symmetry blocks of the Hamiltonian and then uses them to run `_expm_multiply()` in parallel.
 		
 		**Arguments NOT described below can be found in the documentation for the `exp_op` class.**
@@ -650,6 +693,17 @@ class block_ops(object):
 			blocks in a single giant sparse block diagonal matrix. Default is `False`.
 
 			This flag is useful if there are a lot of smaller-sized blocks.
+		backend : str, optional
+			Execution backend for `n_jobs > 1`, can be either one of:
+
+			* "process": the blocks are evolved in `n_jobs` separate processes (default). With `iterate=True`, 
+			  the states are exchanged through a shared memory array instead of being pickled at every time step.
+			* "thread": the blocks are evolved in a pool of `n_jobs` threads, which avoids all inter-process 
+			  communication. This is efficient when most of the time is spent in sparse matrix products, 
+			  which release the GIL.
+
+			In both cases the states of the blocks are written into a single preallocated array, which is 
+			projected to the full H-space.
 
 		Returns
 		--------
@@ -668,6 +722,8 @@ class block_ops(object):
 			Terminates when initial state has no projection onto the specified symmetry blocks.
 
 		"""
+		if backend not in ["process","thread"]:
+			raise ValueError("backend must be either 'process' or 'thread'.")
 
 		if iterate:
 			if start is None and  stop is None:
@@ -784,12 +840,20 @@ class block_ops(object):
 		if H_list:
 			P = _sp.hstack(P,format="csr")
 			if iterate:
-				return _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs)
+				return _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs,backend)
 			else:
 				ver = [int(v) for v in _scipy.__version__.split(".")]
 				if H_is_complex and (start,stop,num,endpoint) != (None,None,None,None) and ver[1] < 19:
-					mats = _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs)
+					mats = _block_expm_iter(psi_blocks,H_list,P,start,stop,num,endpoint,n_jobs,backend)
 					return _np.array([mat for mat in mats]).T
+				elif backend == "thread":
+					offsets = _np.cumsum([0]+[psi.shape[0] for psi in psi_blocks])
+					shape = (offsets[-1],) if num is None else (offsets[-1],num)
+					dtype = _np.result_type(P.dtype,*([H.dtype for H in H_list]+[psi.dtype for psi in psi_blocks]))
+					psi_t = _np.zeros(shape,dtype=dtype)
+					_Parallel(n_jobs = n_jobs,backend="threading")(_delayed(_block_expm_helper)(H,psi,start,stop,num,endpoint,psi_t[i1:i2]) for psi,H,i1,i2 in _izip(psi_blocks,H_list,offsets[:-1],offsets[1:]))
+					psi_t = P.dot(psi_t)
+					return psi_t
 				else:
 					psi_t = _Parallel(n_jobs = n_jobs)(_delayed(_expm_multiply)(H,psi,start=start,stop=stop,num=num,endpoint=endpoint) for psi,H in _izip(psi_blocks,H_list))
 					psi_t = _np.hstack(psi_t).T
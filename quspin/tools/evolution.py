@@ -4,13 +4,18 @@ from __future__ import print_function, division
 
 # need linear algebra packages
 import numpy as _np 
+import scipy.sparse as _sp
 from functools import partial as _partial
 
 # needed for isinstance only
 from .expm_multiply_parallel_core import expm_multiply_parallel
+from .expm_multiply_parallel_core.expm_multiply_parallel_core import _fragment_3_1
+from .expm_multiply_parallel_core.expm_multiply_parallel_wrapper import _wrapper_expm_multiply,_wrapper_expm_multiply_batch
 
 __all__ =  ["ED_state_vs_time", 
 			"evolve",
+			"krylov_evolve",
+			"magnus_evolve",
 			"expm_multiply_parallel"
 			]
 
@@ -269,7 +274,7 @@ def evolve(v0,t0,times,f,solver_name="dop853",real=False,stack_state=False,verbo
 
 	ndim=v0.ndim
 	if ndim > 2:
-		raise ValueError("state mush have ndim < 3.")
+		raise ValueError("state must have ndim < 3.")
 
 	shape0 = v0.shape
 	
@@ -415,3 +420,421 @@ def _evolve_iter(solver,v0,t0,times,verbose,*output_args):
 			yield _format_output(solver._y,*output_args)
 		else:
 			raise RuntimeError("failed to evolve to time {0}, nsteps might be too small".format(t))
+
+
+##### below are the routines for the short-iteration Lanczos (Krylov) propagator.
+
+def krylov_evolve(H,v0,t0,times,tol=1E-10,m_max=30,imag_time=False,iterate=False,verbose=False):
+	"""Implements (imaginary) time evolution with short-iteration Lanczos (Krylov) steps.
+
+	Advances the state :math:`|v(t)\\rangle` by repeatedly projecting the propagator onto the Krylov space
+	:math:`\\mathrm{span}\\{|v\\rangle,H|v\\rangle,\\dots,H^{m-1}|v\\rangle\\}` of the current state:
+
+	.. math::
+		|v(t+\\delta t)\\rangle = \\exp(-i\\delta t H(t+\\delta t/2))|v(t)\\rangle.
+
+	Notes
+	-----
+	* The size of every step is chosen adaptively from the a-posteriori estimate 
+	  :math:`\\beta_m|[\\exp(-i\\delta t T_m)]_{m,1}|` of the error of the Krylov approximation. In real time the 
+	  norm of the state is preserved up to rounding errors.
+	* For a time-dependent `hamiltonian` the operator is evaluated at the midpoints of the steps (exponential 
+	  midpoint rule), which is second-order accurate in the step size. Its error is controlled by step doubling.
+	* Only matrix-vector products are required, hence `H` can be any `hamiltonian`, `quantum_operator`,
+	  `quantum_LinearOperator` (matrix-free), or any other hermitian operator with a `dot` method.
+
+	Parameters
+	-----------
+	H : obj
+		Hermitian operator generating the evolution. 
+	v0 : numpy.ndarray
+		Initial state, or several initial states in the columns of a 2-d array.
+	t0 : float
+		Initial time.
+	times : numpy.ndarray
+		Vector of times to compute the time-evolved state at.
+	tol : float, optional
+		Tolerance for the estimated error of a single step, relative to the norm of the state. Default is `tol=1E-10`.
+	m_max : int, optional
+		Maximum dimension of the Krylov space. Default is `m_max=30`.
+	imag_time : bool, optional
+		If set to `True`, the imaginary-time evolution :math:`\\exp(-\\delta t H)` is carried out instead and the 
+		state is normalised at each time in `times`. Default is `False`.
+	iterate : bool, optional
+		If set to `True`, creates a generator object for the time-evolved state. Default is `False`.
+	verbose : bool, optional
+		If set to `True`, prints normalisation of state at each time in `times`.
+
+	Returns
+	--------
+	obj
+		Can be either one of the following:
+			* numpy.ndarray containing evolved state against time.
+			* generator object for time-evolved state (requires `iterate = True`).
+
+	Examples
+	---------
+	>>> v_t = krylov_evolve(H,v0,t0,times,tol=1E-10)
+
+	"""
+	from ..operators import ishamiltonian
+
+	v0 = _np.asarray(v0)
+	if v0.ndim > 2:
+		raise ValueError("state must have ndim < 3.")
+
+	if _np.iscomplexobj(times):
+		raise ValueError("times must be real number(s).")
+
+	if m_max < 1:
+		raise ValueError("m_max must be a positive integer.")
+
+	time_dep = (ishamiltonian(H) and len(H.dynamic) > 0)
+	if time_dep:
+		def matvec(v,time):
+			return H.dot(v,time=time,check=False)
+	else:
+		def matvec(v,time):
+			return H.dot(v)
+
+	dtype = _np.result_type(v0.dtype,getattr(H,"dtype",v0.dtype),_np.float64)
+	if not imag_time:
+		dtype = _np.result_type(dtype,_np.complex128)
+
+	shape0 = v0.shape
+	n = _np.linalg.norm(v0)
+	V = v0.astype(dtype).reshape((shape0[0],-1))
+	output_args = (matvec,time_dep,V,t0,tol,m_max,imag_time,verbose,n,shape0)
+
+	if _np.isscalar(times):
+		return next(_krylov_evolve_iter(_np.atleast_1d(times),*output_args))
+	elif iterate:
+		return _krylov_evolve_iter(times,*output_args)
+	else:
+		v = _np.empty(shape0+(len(times),),dtype=dtype)
+		for i,v_t in enumerate(_krylov_evolve_iter(times,*output_args)):
+			v[...,i] = v_t
+
+		return v
+
+def _krylov_evolve_iter(times,matvec,time_dep,V,t0,tol,m_max,imag_time,verbose,n,shape0):
+	V = V.copy()
+	n_vec = V.shape[1]
+	t = [t0 for i in range(n_vec)]
+	dt = [None for i in range(n_vec)]
+	Q = _np.zeros((m_max,V.shape[0]),dtype=V.dtype) # workspace for the Krylov basis.
+
+	for time in times:
+		for i in range(n_vec):
+			while t[i] != time:
+				h = time-t[i]
+				if dt[i] is not None and abs(dt[i]) < abs(h):
+					h = _np.copysign(dt[i],h)
+
+				V[:,i],h,dt[i] = _krylov_step(matvec,time_dep,V[:,i],t[i],h,tol,m_max,imag_time,Q)
+				t[i] = (time if abs(time-t[i]-h) <= 1E-14*max(abs(time),1.0) else t[i]+h)
+
+		if verbose: print("evolved to time {0}, norm of state {1}".format(time,_np.linalg.norm(V)))
+
+		v_out = V.reshape(shape0).copy()
+		if imag_time:
+			v_out /= (_np.linalg.norm(v_out,axis=0)/n)
+
+		yield v_out
+
+def _lanczos(matvec,v,time,m_max,Q):
+	# builds the Lanczos basis of the Krylov space of `v` in the rows of `Q` and returns
+	# the diagonal and off-diagonal of the tridiagonal matrix T_m as well as the residual norm.
+	eps = 100*_np.finfo(_np.float64).eps
+	alpha = []
+	beta = []
+	Q[0] = v/_np.linalg.norm(v)
+	w = _np.asarray(matvec(Q[0],time)).reshape(Q[0].shape)
+
+	for j in range(m_max):
+		a = _np.vdot(Q[j],w).real
+		w = w - a*Q[j]
+		if j > 0:
+			w -= beta[-1]*Q[j-1]
+
+		b = _np.linalg.norm(w)
+		alpha.append(a)
+		beta.append(b)
+
+		if b <= eps*max(abs(a)+(beta[-2] if j > 0 else 0.0),_np.finfo(_np.float64).tiny): # invariant subspace found.
+			return _np.array(alpha),_np.array(beta[:-1]),0.0
+
+		if j+1 < m_max:
+			Q[j+1] = w/b
+			w = _np.asarray(matvec(Q[j+1],time)).reshape(Q[0].shape)
+
+	return _np.array(alpha),_np.array(beta[:-1]),beta[-1]
+
+def _krylov_exp(matvec,time_dep,v,t,h,tol,m_max,imag_time,Q):
+	# applies exp(-i h H(t+h/2)) to `v` for the largest step not larger than `h` which satisfies the 
+	# error estimate of the Krylov approximation, returns the new state, the step taken and the proposal 
+	# for the next step.
+	n0 = _np.linalg.norm(v)
+	if n0 == 0:
+		return v,h,2*h
+
+	z = (-1.0 if imag_time else -1j)
+	while True:
+		alpha,beta,b_m = _lanczos(matvec,v,t+h/2.0,m_max,Q)
+		m = len(alpha)
+		T = _np.diag(alpha) + _np.diag(beta,1) + _np.diag(beta,-1)
+		E,W = _np.linalg.eigh(T)
+
+		while True:
+			c = W.dot(_np.exp(z*h*E)*W[0])
+			err = b_m*abs(c[-1])/_np.linalg.norm(c)
+			if err <= tol:
+				fac = (2.0 if err == 0 else min(2.0,0.9*(tol/err)**(1.0/m)))
+				return n0*c.dot(Q[:m]),h,fac*h
+
+			h *= max(0.2,0.9*(tol/err)**(1.0/m))
+			if time_dep:
+				break # the operator has to be evaluated at the new midpoint.
+
+def _krylov_step(matvec,time_dep,v,t,h,tol,m_max,imag_time,Q):
+	# advances `v` from `t` by at most `h`, returns the new state, the step taken and the proposal for the next step.
+	if not time_dep:
+		return _krylov_exp(matvec,time_dep,v,t,h,tol,m_max,imag_time,Q)
+
+	# the error of the exponential midpoint rule is estimated by step doubling: the full step and 
+	# two half steps differ by 3/4 of the leading local error of the full step.
+	n0 = _np.linalg.norm(v)
+	while True:
+		v_full,h,_ = _krylov_exp(matvec,time_dep,v,t,h,tol,m_max,imag_time,Q)
+		v_half,h_half,_ = _krylov_exp(matvec,time_dep,v,t,h/2.0,tol,m_max,imag_time,Q)
+		if abs(h_half) < abs(h/2.0):
+			h = 2*h_half
+			continue
+
+		v_half,h_half,_ = _krylov_exp(matvec,time_dep,v_half,t+h/2.0,h/2.0,tol,m_max,imag_time,Q)
+		if abs(h_half) < abs(h/2.0):
+			h = 2*h_half
+			continue
+
+		err = _np.linalg.norm(v_full-v_half)/(3.0*max(n0,_np.finfo(_np.float64).tiny))
+		if err <= tol:
+			fac = (2.0 if err == 0 else min(2.0,0.9*(tol/err)**(1.0/3)))
+			return v_half,h,fac*h
+
+		h *= max(0.2,0.9*(tol/err)**(1.0/3))
+
+
+##### below are the routines for the commutator-free Magnus integrators.
+
+def magnus_evolve(H,v0,t0,times,dt,order=4,imag_time=False,iterate=False,verbose=False):
+	"""Implements (imaginary) time evolution with commutator-free Magnus exponential integrators.
+
+	Every step of size :math:`\\delta t` is a product of exponentials of linear combinations of the Hamiltonian 
+	evaluated at the Gauss points :math:`t+c_j\\delta t` of the step:
+
+	.. math::
+		|v(t+\\delta t)\\rangle = \\prod_k\\exp\\left(-i\\delta t\\sum_j a_{kj}H(t+c_j\\delta t)\\right)|v(t)\\rangle.
+
+	Notes
+	-----
+	* The 4th-order scheme uses two exponentials per step [Blanes and Moan, Appl. Numer. Math. 56, 1519 (2006)], 
+	  the 6th-order scheme is its symmetric triple-jump composition with six exponentials per step. 
+	* The static and dynamic parts of `H` are stored once on the union of their sparsity patterns, such that every 
+	  linear combination is a single pass over the matrix elements. The exponentials are applied with the 
+	  OpenMP code of `expm_multiply_parallel`, using bounds on the operator norm which are computed once for every 
+	  part of `H` instead of new norm estimates at every step. 
+	* Unlike `hamiltonian.evolve()`, the step size is fixed, which is suited for periodically-driven systems
+	  where `dt` is chosen as a fraction of the driving period. The times in `times` are reached exactly by 
+	  shrinking the steps in between, if necessary.
+
+	Parameters
+	-----------
+	H : :obj:`hamiltonian`
+		Hermitian operator generating the evolution.
+	v0 : numpy.ndarray
+		Initial state, or several initial states in the columns of a 2-d array.
+	t0 : float
+		Initial time.
+	times : numpy.ndarray
+		Vector of times to compute the time-evolved state at.
+	dt : float
+		Maximum time step.
+	order : int, optional
+		Order of the integrator, either `4` or `6`. Default is `order=4`.
+	imag_time : bool, optional
+		If set to `True`, the imaginary-time evolution :math:`\\exp(-\\delta t H)` is carried out instead and the 
+		state is normalised after every step. Default is `False`.
+	iterate : bool, optional
+		If set to `True`, creates a generator object for the time-evolved state. Default is `False`.
+	verbose : bool, optional
+		If set to `True`, prints normalisation of state at each time in `times`.
+
+	Returns
+	--------
+	obj
+		Can be either one of the following:
+			* numpy.ndarray containing evolved state against time.
+			* generator object for time-evolved state (requires `iterate = True`).
+
+	Examples
+	---------
+	>>> v_t = magnus_evolve(H,v0,t0,times,dt=T/20,order=4)
+
+	"""
+	from ..operators import ishamiltonian
+
+	if not ishamiltonian(H):
+		raise TypeError("H must be a hamiltonian object.")
+
+	v0 = _np.asarray(v0)
+	if v0.ndim > 2:
+		raise ValueError("state must have ndim < 3.")
+
+	if v0.shape[0] != H.Ns:
+		raise ValueError("v0 must have {0} elements".format(H.Ns))
+
+	if _np.iscomplexobj(times):
+		raise ValueError("times must be real number(s).")
+
+	if not dt > 0:
+		raise ValueError("dt must be a positive number.")
+
+	c,A = _CFM_scheme(order)
+	funcs = list(H.dynamic.keys())
+	mats = [H.static] + [H.dynamic[func] for func in funcs]
+
+	dtype = _np.result_type(H.dtype,_np.float64)
+	if any(_np.iscomplexobj(func(t0)) for func in funcs):
+		dtype = _np.result_type(dtype,_np.complex128)
+
+	U = _fused_csr_expm(mats,dtype)
+
+	dtype = _np.result_type(dtype,v0.dtype)
+	if not imag_time:
+		dtype = _np.result_type(dtype,_np.complex128)
+
+	shape0 = v0.shape
+	n = _np.linalg.norm(v0,axis=0)
+	V = _np.array(v0,dtype=dtype,order="C")
+	output_args = (U,funcs,c,A,V,t0,dt,imag_time,verbose,n)
+
+	if _np.isscalar(times):
+		return next(_magnus_evolve_iter(_np.atleast_1d(times),*output_args))
+	elif iterate:
+		return _magnus_evolve_iter(times,*output_args)
+	else:
+		v = _np.empty(shape0+(len(times),),dtype=dtype)
+		for i,v_t in enumerate(_magnus_evolve_iter(times,*output_args)):
+			v[...,i] = v_t
+
+		return v
+
+def _magnus_evolve_iter(times,U,funcs,c,A,V,t0,dt,imag_time,verbose,n):
+	work = _np.zeros((2*V.shape[0],)+V.shape[1:],dtype=V.dtype)
+	t = t0
+
+	for time in times:
+		n_steps = int(_np.ceil(abs(time-t)/dt-1E-10))
+		if n_steps > 0:
+			h = (time-t)/n_steps
+			a = (-h if imag_time else -1j*h)
+			for i in range(n_steps):
+				t_i = t + i*h
+				F = _np.array([[func(t_i+c_j*h) for c_j in c] for func in funcs]).reshape((len(funcs),len(c)))
+				for A_k in A:
+					U.dot(_np.hstack(([A_k.sum()],F.dot(A_k))),a,V,work)
+
+				if imag_time:
+					V /= (_np.linalg.norm(V,axis=0)/n)
+
+			t = time
+
+		if verbose: print("evolved to time {0}, norm of state {1}".format(time,_np.linalg.norm(V)))
+
+		yield V.copy()
+
+def _CFM_scheme(order):
+	# returns the nodes c_j (in units of the step) and the weights a_kj of the exponentials 
+	# exp(-i h sum_j a_kj H(t+c_j h)), which are applied in the order of the rows of a.
+	if order == 4:
+		c = _np.array([0.5-_np.sqrt(3.0)/6.0,0.5+_np.sqrt(3.0)/6.0])
+		a_1,a_2 = (3.0-2.0*_np.sqrt(3.0))/12.0,(3.0+2.0*_np.sqrt(3.0))/12.0
+		return c,_np.array([[a_2,a_1],[a_1,a_2]])
+	elif order == 6:
+		# triple jump: steps g*h,(1-2g)*h,g*h of the time-symmetric 4th order scheme.
+		c_4,a_4 = _CFM_scheme(4)
+		g = 1.0/(2.0-2.0**(1.0/5.0))
+		gammas = [g,1.0-2.0*g,g]
+		offsets = [0.0,g,1.0-g]
+		c = _np.hstack([offset+gamma*c_4 for offset,gamma in zip(offsets,gammas)])
+		a = _np.zeros((6,6),dtype=_np.float64)
+		for i,gamma in enumerate(gammas):
+			a[2*i:2*i+2,2*i:2*i+2] = gamma*a_4
+
+		return c,a
+	else:
+		raise ValueError("order must be 4 or 6.")
+
+
+class _norm_bound(object):
+	# replaces LazyOperatorNormInfo by an upper bound for all norms.
+	def __init__(self,norm):
+		self._norm = norm
+
+	def onenorm(self):
+		return self._norm
+
+	def alpha(self,p):
+		return self._norm
+
+
+class _fused_csr_expm(object):
+	# the matrices are stored on the union of their sparsity patterns (including the diagonal), shifted by their 
+	# traces, such that the exponential of any linear combination only requires a single product of the 
+	# coefficients with the stacked data, and the 1-norms of the shifted matrices bound the norm of the combination.
+	def __init__(self,mats,dtype):
+		Ns = mats[0].shape[0]
+		parts = []
+		pattern = _sp.identity(Ns,dtype=_np.int32,format="csr")
+		for M in mats:
+			M = _sp.csr_matrix(M,dtype=dtype)
+			M.sum_duplicates()
+			parts.append(M)
+			pattern = pattern + _sp.csr_matrix((_np.ones_like(M.indices),M.indices,M.indptr),shape=M.shape)
+
+		pattern.sort_indices()
+		index_type = (_np.int32 if pattern.nnz < _np.iinfo(_np.int32).max else _np.int64)
+		self._indices = pattern.indices.astype(index_type)
+		self._indptr = pattern.indptr.astype(index_type)
+
+		def keys(M): # positions of the matrix elements in row-major order.
+			return _np.repeat(_np.arange(Ns,dtype=_np.int64),_np.diff(M.indptr))*Ns + M.indices
+
+		diag = _np.arange(Ns,dtype=_np.int64)*(Ns+1)
+		pattern = keys(pattern)
+		diag_pos = _np.searchsorted(pattern,diag)
+		self._data = _np.zeros((len(mats),pattern.size),dtype=dtype)
+		self._mu = _np.zeros(len(mats),dtype=dtype)
+		self._norms = _np.zeros(len(mats),dtype=_np.float64)
+		for i,M in enumerate(parts):
+			self._data[i,_np.searchsorted(pattern,keys(M))] = M.data
+			self._mu[i] = self._data[i,diag_pos].sum()/Ns
+			self._data[i,diag_pos] -= self._mu[i]
+			self._norms[i] = _np.bincount(self._indices,weights=_np.abs(self._data[i]),minlength=Ns).max()
+
+		self._tol = _np.finfo(dtype).eps
+
+	def dot(self,coeff,a,v,work):
+		# overwrites `v` with exp(a*sum_i coeff[i]*mats[i]).dot(v).
+		data = coeff.dot(self._data)
+		mu = coeff.dot(self._mu)
+		norm = abs(a)*_np.abs(coeff).dot(self._norms)
+		if norm == 0:
+			m_star,s = 0,1
+		else:
+			m_star,s = _fragment_3_1(_norm_bound(norm),1,self._tol,ell=2)
+
+		if v.ndim == 1:
+			_wrapper_expm_multiply(self._indptr,self._indices,data,m_star,s,a,self._tol,mu,v,work)
+		else:
+			_wrapper_expm_multiply_batch(self._indptr,self._indices,data,m_star,s,a,self._tol,mu,v,work)
@@ -1,4 +1,4 @@
-from .csr_matvec_wrapper import _csr_matvec
+from .csr_matvec_wrapper import _csr_matvec,_csr_matvecs
 from scipy.sparse import isspmatrix_csr,issparse
 import numpy as _np
 import os
@@ -12,6 +12,9 @@ def csr_matvec(A,v,a=None,out=None,overwrite_out=True):
 	For QuSpin builds which support OpenMP this function will be multithreaded. Note that using
 	out=v will result in incorrect results. Also note that if format of A is not 'csr' 
 	the matrix will be converted.
+
+	If `v` is a 2-d array the product is taken with all columns of `v` at once, which streams
+	the matrix `A` from memory only once for the whole block.
 	
 	Examples
 	--------
@@ -21,11 +24,11 @@ def csr_matvec(A,v,a=None,out=None,overwrite_out=True):
 	A : scipy.spmatrix
 		Sparse matrix to take the dot product. 
 	v : array_like
-		array which contains the vector to take the product with. 
+		array which contains the vector (or block of vectors of shape `(A.shape[1],k)`) to take the product with. 
 	a : scalar, optional
 		value to scale the vector with after the product with `A` is taken.
 	out : array_like
-		output array to put the results of the calculation.
+		C-contiguous output array to put the results of the calculation.
 	overwrite_out : bool, optional
 		If set to `True`, the function overwrites the values in `out` with the result. otherwise the result is
 		added to the values in `out`. 
@@ -53,21 +56,28 @@ def csr_matvec(A,v,a=None,out=None,overwrite_out=True):
 
 	result_type=_np.result_type(v.dtype,A.dtype,a)
 	
-	if A.shape[1]!=v.size:
+	if v.ndim not in [1,2]:
+		raise ValueError("expecting 1-d or 2-d array for 'v'.")
+
+	if A.shape[1]!=v.shape[0]:
 		raise ValueError("dimension mismatch with shapes {} and {}".format(A.shape,v.shape))
 
 	if out is None:
-		out = _np.zeros_like(v,dtype=result_type)
+		out = _np.zeros((A.shape[0],)+v.shape[1:],dtype=result_type)
 		overwrite_out = True
 	else:
 		out = _np.asarray(out)
+		if not out.flags["C_CONTIGUOUS"]:
+			raise ValueError("output array must be C-contiguous.")
 
-	if v.dtype != result_type:
-		v = v.astype(result_type)
+	v = _np.ascontiguousarray(v,dtype=result_type)
 
-	if out.shape != v.shape:
+	if out.shape != (A.shape[0],)+v.shape[1:] or out.dtype != result_type:
 		raise ValueError("ValueError: output array is not the correct shape or dtype.")
 
-	_csr_matvec(overwrite_out,A.indptr,A.indices,A.data,a,v.ravel(),out.ravel())
+	if v.ndim == 1:
+		_csr_matvec(overwrite_out,A.indptr,A.indices,A.data,a,v,out)
+	else:
+		_csr_matvecs(overwrite_out,A.indptr,A.indices,A.data,a,v,out)
 
 	return out
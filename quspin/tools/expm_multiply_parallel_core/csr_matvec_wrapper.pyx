@@ -9,6 +9,10 @@ ctypedef float complex cfloat
 cdef extern from "csr_matvec.h":
     void csr_matvec[I,T1,T2,T3](const bool,const I,const I[],const I[],const T1[],
                               const T2,const T3[],I[],T3[],T3[]) nogil
+    void csr_matvecs[I,T1,T2,T3](const bool,const I,const np.npy_intp,const I[],const I[],const T1[],
+                              const T2,const T3[],T3[]) nogil
+    void csr_matvecs_fused[I,T1,T3](const bool,const I,const np.npy_intp,const np.npy_intp,const I[],const I[],
+                              const T1[],const T3[],const T3[],T3[]) nogil
 
 ctypedef fused index:
   np.int32_t
@@ -70,3 +74,68 @@ def _csr_matvec(bool overwrite_y, index[:] Ap, index[:] Aj,
       csr_matvec(overwrite_y,nr,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0],&rco[0],&vco[0],&Yx[0])
   else:
     raise ValueError("imcompatbile types")
+
+@cython.boundscheck(False)   
+def _csr_matvecs(bool overwrite_y, index[:] Ap, index[:] Aj,
+                  T1[:] Ax, T2 alpha, T3[:,::1] Xx, T3[:,::1] Yx):
+  cdef index nr = Yx.shape[0]
+  cdef np.npy_intp nv = Yx.shape[1]
+  if T1 is double and T2 is double and T3 is double:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is double and T2 is double and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is double and T2 is cdouble and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is cdouble and T2 is cdouble and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is cdouble and T2 is double and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is float and T2 is float and T3 is float:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is float and T2 is float and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is float and T2 is cfloat and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is cfloat and T2 is cfloat and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  elif T1 is cfloat and T2 is float and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs(overwrite_y,nr,nv,&Ap[0],&Aj[0],&Ax[0],alpha,&Xx[0,0],&Yx[0,0])
+  else:
+    raise ValueError("imcompatbile types")
+
+@cython.boundscheck(False)   
+def _csr_matvecs_fused(bool overwrite_y, index[:] Ap, index[:] Aj,
+                  T1[:,::1] Ax, T3[::1] c, T3[:,::1] Xx, T3[:,::1] Yx):
+  cdef index nr = Yx.shape[0]
+  cdef np.npy_intp nv = Yx.shape[1]
+  cdef np.npy_intp nt = Ax.shape[0]
+  if T1 is double and T3 is double:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  elif T1 is double and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  elif T1 is cdouble and T3 is cdouble:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  elif T1 is float and T3 is float:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  elif T1 is float and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  elif T1 is cfloat and T3 is cfloat:
+    with nogil, parallel():
+      csr_matvecs_fused(overwrite_y,nr,nv,nt,&Ap[0],&Aj[0],&Ax[0,0],&c[0],&Xx[0,0],&Yx[0,0])
+  else:
+    raise ValueError("imcompatbile types")
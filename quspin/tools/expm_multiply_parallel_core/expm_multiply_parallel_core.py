@@ -1,5 +1,5 @@
 from scipy.sparse.linalg import LinearOperator,onenormest,aslinearoperator
-from .expm_multiply_parallel_wrapper import _wrapper_expm_multiply,_wrapper_csr_trace
+from .expm_multiply_parallel_wrapper import _wrapper_expm_multiply,_wrapper_expm_multiply_batch,_wrapper_csr_trace
 import scipy.sparse as _sp
 import numpy as _np
 
@@ -91,6 +91,9 @@ class expm_multiply_parallel(object):
 	def dot(self,v,work_array=None,overwrite_v=False):
 		"""Calculates the action of :math:`\\mathrm{e}^{aA}` on a vector :math:`v`. 
 
+		If `v` is a 2-d array of shape `(A.shape[0],k)` all `k` columns are evolved together, such that the 
+		sparse matrix is only streamed from memory once per matrix product for the whole block.
+
 		Examples
 		--------
 
@@ -102,9 +105,9 @@ class expm_multiply_parallel(object):
 		Parameters
 		-----------
 		v : contiguous numpy.ndarray
-			array to apply :math:`\\mathrm{e}^{aA}` on.
+			array (1-d or 2-d) to apply :math:`\\mathrm{e}^{aA}` on.
 		work_array : contiguous numpy.ndarray, optional
-			array of `shape = (2*len(v),)` which is used as work_array space for the underlying c-code. This saves extra memory allocation for function operations.
+			array of `shape = (2*v.shape[0],)+v.shape[1:]` which is used as work_array space for the underlying c-code. This saves extra memory allocation for function operations.
 		overwrite_v : bool
 			if set to `True`, the data in `v` is overwritten by the function. This saves extra memory allocation for the results.
 
@@ -121,8 +124,8 @@ class expm_multiply_parallel(object):
 		else:
 			v = _np.ascontiguousarray(v).copy()
 
-		if v.ndim != 1:
-			raise ValueError
+		if v.ndim not in [1,2]:
+			raise ValueError("expecting 1-d or 2-d array for 'v'.")
 
 		a_dtype = _np.array(self._a).dtype
 		v_dtype = _np.result_type(self._A.dtype,a_dtype,v.dtype)
@@ -135,17 +138,23 @@ class expm_multiply_parallel(object):
 
 		
 
+		work_shape = (2*self._A.shape[0],)+v.shape[1:]
+
 		if work_array is None:
-			work_array = _np.zeros((2*self._A.shape[0],),dtype=v.dtype)
+			work_array = _np.zeros(work_shape,dtype=v.dtype)
 		else:
 			work_array = _np.ascontiguousarray(work_array)
-			if work_array.shape != (2*self._A.shape[0],):
-				raise ValueError("work_array array must be an array of shape (2*v.shape[0],) with same dtype as v.")
+			if work_array.shape != work_shape:
+				raise ValueError("work_array array must be an array of shape (2*v.shape[0],)+v.shape[1:] with same dtype as v.")
 			if work_array.dtype != v_dtype:
 				work_array = work_array.astype(v_dtype)
 
-		_wrapper_expm_multiply(self._A.indptr,self._A.indices,self._A.data,
-					self._m_star,self._s,self._a,self._tol,self._mu,v,work_array)
+		if v.ndim == 1:
+			_wrapper_expm_multiply(self._A.indptr,self._A.indices,self._A.data,
+						self._m_star,self._s,self._a,self._tol,self._mu,v,work_array)
+		else:
+			_wrapper_expm_multiply_batch(self._A.indptr,self._A.indices,self._A.data,
+						self._m_star,self._s,self._a,self._tol,self._mu,v,work_array)
 
 		return v
 
@@ -33,6 +33,9 @@ cdef extern from "expm_multiply_parallel.h":
 	void _expm_multiply[I,T1,T2,T3](const I,const I[],const I[],const T1[],
 						  const int,const int,const T2, const T1, const T3, T3[], T3[], T3[]) nogil
 
+	void _expm_multiply_batch[I,T1,T2,T3](const I,const _np.npy_intp,const I[],const I[],const T1[],
+						  const int,const int,const T2, const T1, const T3, T3[], T3[], T3[]) nogil
+
 @cython.boundscheck(False)
 def _wrapper_csr_trace(indtype[:] Ap, indtype[:] Aj, T1[:] Ax):
 	cdef indtype n_row = Ap.shape[0] - 1
@@ -82,6 +85,46 @@ def _wrapper_expm_multiply(indtype[:] Ap, indtype[:] Aj, T1[:] Ax,int m_star,int
 		else:
 			raise ValueError
 
+@cython.boundscheck(False)
+def _wrapper_expm_multiply_batch(indtype[:] Ap, indtype[:] Aj, T1[:] Ax,int m_star,int s,
+							object a,T2 tol,T1 mu,T3[:,::1] v,T3[:,::1] work):
+	cdef indtype n_row = Ap.shape[0] - 1
+	cdef _np.npy_intp n_vecs = v.shape[1]
+	cdef T3 aa = a
 
-
-
+	if T1 is float:
+		if T3 is float or T3 is floatcomplex:
+			if T2 is float:
+				with nogil:
+					_expm_multiply_batch(n_row,n_vecs,&Ap[0],&Aj[0],&Ax[0],s,m_star,tol,mu,aa,&v[0,0],&work[0,0],&work[n_row,0])
+			else:
+				raise ValueError
+		else:
+			raise ValueError
+	elif T1 is double:
+		if T3 is double or T3 is doublecomplex:
+			if T2 is double:
+				with nogil:
+					_expm_multiply_batch(n_row,n_vecs,&Ap[0],&Aj[0],&Ax[0],s,m_star,tol,mu,aa,&v[0,0],&work[0,0],&work[n_row,0])
+			else:
+				raise ValueError
+		else:
+			raise ValueError
+	elif T1 is floatcomplex:
+		if T3 is floatcomplex:
+			if T2 is float:
+				with nogil:
+					_expm_multiply_batch(n_row,n_vecs,&Ap[0],&Aj[0],&Ax[0],s,m_star,tol,mu,aa,&v[0,0],&work[0,0],&work[n_row,0])
+			else:
+				raise ValueError
+		else:
+			raise ValueError
+	elif T1 is doublecomplex:
+		if T3 is doublecomplex:
+			if T2 is double:
+				with nogil:
+					_expm_multiply_batch(n_row,n_vecs,&Ap[0],&Aj[0],&Ax[0],s,m_star,tol,mu,aa,&v[0,0],&work[0,0],&work[n_row,0])
+			else:
+				raise ValueError
+		else:
+			raise ValueError
@@ -1,6 +1,8 @@
 #ifndef __CSR_MATVEC_H__
 #define __CSR_MATVEC_H__
 
+#include <cstddef>
+
 
 #if defined(_OPENMP)
 #include "csrmv_merge.h"
@@ -52,4 +54,112 @@ void csr_matvec(const bool overwrite_y,
 }
 #endif
 
+template<typename I, typename T1,typename T2,typename T3>
+void csr_matvecs(const bool overwrite_y,
+				const I n,
+				const std::ptrdiff_t n_vecs,
+				const I Ap[],
+				const I Aj[],
+				const T1 Ax[],
+				const T2 a,
+				const T3 x[],
+					  T3 y[])
+{
+	// calculates y = a*A*x (or y += a*A*x) for C-contiguous arrays x and y of shape (n,n_vecs), 
+	// each row of A is loaded once for all n_vecs columns. Must be called inside a parallel region.
+	#pragma omp for schedule(static)
+	for(I k = 0; k<n; k++){
+		T3 * y_row = y + (std::ptrdiff_t)k * n_vecs;
+		for(std::ptrdiff_t l = 0; l<n_vecs; l++){
+			T3 sum = 0;
+			for(I jj = Ap[k]; jj < Ap[k+1]; jj++){
+				sum += Ax[jj] * x[(std::ptrdiff_t)Aj[jj] * n_vecs + l];
+			}
+			if(overwrite_y){
+				y_row[l] = a*sum;
+			}
+			else{
+				y_row[l] += a*sum;
+			}
+		}
+	}
+}
+
+
+template<typename I, typename T1,typename T3>
+void csr_matvecs_fused(const bool overwrite_y,
+				const I n,
+				const std::ptrdiff_t n_vecs,
+				const std::ptrdiff_t n_terms,
+				const I Ap[],
+				const I Aj[],
+				const T1 Ax[],
+				const T3 c[],
+				const T3 x[],
+					  T3 y[])
+{
+	// calculates y = sum_t c[t]*A_t*x (or y += sum_t c[t]*A_t*x) for C-contiguous arrays x and y of shape (n,n_vecs),
+	// where the matrices A_t share the sparsity pattern (Ap,Aj) and the data of A_t is stored in the t-th row of
+	// the C-contiguous array Ax of shape (n_terms,nnz). The matrix elements of the linear combination are formed 
+	// on the fly for blocks of rows, such that the index arrays are only loaded once. Must be called inside a 
+	// parallel region.
+	const std::ptrdiff_t nnz = Ap[n];
+	const I n_blocks = n/64 + (n%64 > 0);
+	const std::ptrdiff_t buf_size = 1024;
+	T3 buf[1024];
+
+	#pragma omp for schedule(static)
+	for(I b = 0; b<n_blocks; b++){
+		const I k_begin = b*64;
+		const I k_end = (k_begin+64 < n ? k_begin+64 : n);
+		const std::ptrdiff_t j_begin = Ap[k_begin];
+		const std::ptrdiff_t m = Ap[k_end] - j_begin;
+		const bool buffered = (m <= buf_size);
+
+		if(buffered){
+			// combined matrix elements of the block.
+			for(std::ptrdiff_t jj = 0; jj<m; jj++){
+				buf[jj] = c[0] * Ax[j_begin + jj];
+			}
+			for(std::ptrdiff_t t = 1; t<n_terms; t++){
+				const T1 * Ax_t = Ax + t * nnz + j_begin;
+				const T3 c_t = c[t];
+				for(std::ptrdiff_t jj = 0; jj<m; jj++){
+					buf[jj] += c_t * Ax_t[jj];
+				}
+			}
+		}
+
+		for(I k = k_begin; k<k_end; k++){
+			T3 * y_row = y + (std::ptrdiff_t)k * n_vecs;
+			if(overwrite_y){
+				for(std::ptrdiff_t l = 0; l<n_vecs; l++){
+					y_row[l] = 0;
+				}
+			}
+			for(I jj = Ap[k]; jj < Ap[k+1]; jj++){
+				T3 A_jj = 0;
+				if(buffered){
+					A_jj = buf[jj - j_begin];
+				}
+				else{
+					for(std::ptrdiff_t t = 0; t<n_terms; t++){
+						A_jj += c[t] * Ax[t * nnz + jj];
+					}
+				}
+				const T3 * x_row = x + (std::ptrdiff_t)Aj[jj] * n_vecs;
+				if(n_vecs == 1){
+					y_row[0] += A_jj * x_row[0];
+				}
+				else{
+					for(std::ptrdiff_t l = 0; l<n_vecs; l++){
+						y_row[l] += A_jj * x_row[l];
+					}
+				}
+			}
+		}
+	}
+}
+
+
 #endif
\ No newline at end of file
@@ -8,6 +8,7 @@
 #include <algorithm>
 #include <complex>
 #include <iostream>
+#include <cstddef>
 
 template <class I, class T>
 T csr_trace(const I n,
@@ -171,4 +172,133 @@ void _expm_multiply(const I n,
 	}
 }
 
+template<typename T,typename I>
+T inf_norm_chunk(T * arr,const std::ptrdiff_t n_vecs,I begin,I end){
+	T max = 0;
+	for(I i=begin;i<end;i++){
+		T sum = 0;
+		for(std::ptrdiff_t l=0;l<n_vecs;l++){
+			sum += std::abs(arr[i*n_vecs+l]);
+		}
+		max = std::max(max,sum);
+	}
+	return max;
+}
+
+template<typename T,typename I>
+T inf_norm_chunk(std::complex<T> * arr,const std::ptrdiff_t n_vecs,I begin,I end){
+	T max = 0;
+	for(I i=begin;i<end;i++){
+		T sum = 0;
+		for(std::ptrdiff_t l=0;l<n_vecs;l++){
+			sum += std::abs(arr[i*n_vecs+l]);
+		}
+		max = std::max(max,sum);
+	}
+	return max;
+}
+
+template<typename I, typename T1,typename T2,typename T3>
+void _expm_multiply_batch(const I n,
+					const std::ptrdiff_t n_vecs,
+					const I Ap[],
+					const I Aj[],
+					const T1 Ax[],
+					const int s,
+					const int m_star,
+					const T2 tol,
+					const T1 mu,
+					const T3 a,
+			 			  T3 F[],
+						  T3 B1[], 
+						  T3 B2[]
+			)
+{
+	// same as _expm_multiply for C-contiguous arrays F, B1 and B2 of shape (n,n_vecs), 
+	// the sparse matrix is streamed once per matrix product for all columns and the 
+	// convergence of the Taylor series is checked with the inf-norm of the block. 
+
+	T2  c1,c2,c3;
+	bool flag=false;
+	
+	#pragma omp parallel shared(c1,c2,c3,flag,F,B1,B2)
+	{
+		int nthread = omp_get_num_threads();
+		int threadn = omp_get_thread_num();
+		I items_per_thread = n/nthread;
+		I begin = items_per_thread * threadn;
+		I end = items_per_thread * ( threadn + 1 );
+		if(threadn == nthread-1){
+			end += n%nthread;
+		}
+
+		T3 eta = std::exp(a*mu/T2(s));
+
+		#pragma omp for schedule(static)
+		for(std::ptrdiff_t k=0;k<n*n_vecs;k++){ 
+			B1[k] = F[k];
+			B2[k] = 0;
+		}
+		for(int i=0;i<s;i++){
+
+			T2 c1_thread = inf_norm_chunk(B1,n_vecs,begin,end);
+
+			#pragma omp single
+			{
+				c1 = 0;
+				flag = false;
+			}
+
+			#pragma omp critical
+			{
+				c1 = std::max(c1,c1_thread);
+			}	
+
+			for(int j=1;j<m_star+1 && !flag;j++){
+
+				#pragma omp barrier
+
+				csr_matvecs(true,n,n_vecs,Ap,Aj,Ax,a/T2(j*s),B1,B2);
+
+				#pragma omp for schedule(static)
+				for(std::ptrdiff_t k=0;k<n*n_vecs;k++){
+					F[k] += B1[k] = B2[k];
+				}
+
+				T2 c2_thread = inf_norm_chunk(B2,n_vecs,begin,end);
+				T2 c3_thread = inf_norm_chunk(F,n_vecs,begin,end);
+
+				#pragma omp single
+				{
+					c2 = c3 = 0;
+				}
+
+				#pragma omp critical
+				{
+					c2 = std::max(c2,c2_thread);
+					c3 = std::max(c3,c3_thread);
+				}	
+
+				#pragma omp barrier
+
+				#pragma omp single
+				{
+					if((c1+c2)<=(tol*c3)){
+						flag=true;
+					}
+					c1 = c2;
+				}
+
+			}
+
+			#pragma omp for schedule(static)
+			for(std::ptrdiff_t k=0;k<n*n_vecs;k++){
+				F[k] *= eta;
+				B1[k] = F[k];
+			}
+		}
+	}
+}
+
+
 #endif
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, division
+
+# need linear algebra packages
+import scipy.sparse as _sp
+import scipy.sparse.linalg as _sla
+import numpy as _np
+
+# needed for isinstance only
+from ..operators import ishamiltonian as _ishamiltonian
+from .expm_multiply_parallel_core import csr_matvec
+
+from multiprocessing.pool import ThreadPool as _ThreadPool
+import os
+
+
+__all__ = ["kpm_bounds",
+			"kpm_moments",
+			"kpm_dos",
+			"jackson_kernel",
+			"lorentz_kernel"
+			]
+
+
+def kpm_bounds(H,time=0.0,eps=0.01,**eigsh_args):
+	"""Estimates the interval used to rescale an operator onto the Chebyshev domain :math:`[-1,1]`.
+
+	The extremal eigenvalues :math:`E_\\mathrm{min},E_\\mathrm{max}` are computed with a sparse Lanczos
+	solver (`hamiltonian.eigsh` for `hamiltonian` objects), and the interval is padded on both sides by a fraction
+	`eps/2` of the spectral width to keep the Chebyshev expansion stable against the finite accuracy of the estimate.
+
+	Parameters
+	-----------
+	H : obj
+		Hermitian operator: `hamiltonian`, `scipy.sparse` matrix, `numpy.ndarray` or `scipy.sparse.linalg.LinearOperator`.
+	time : float, optional
+		Time to evaluate a time-dependent `hamiltonian` at. Default is `time = 0.0`.
+	eps : float, optional
+		Relative padding of the spectral interval. Default is `eps = 0.01`.
+	eigsh_args :
+		Additional arguments passed to `eigsh`, e.g. `tol`.
+
+	Returns
+	--------
+	tuple
+		`(E_min,E_max)` bounds of the padded spectral interval.
+
+	Examples
+	---------
+	>>> bounds = kpm_bounds(H,eps=0.01)
+
+	"""
+	eigsh_args = dict(eigsh_args,k=1,return_eigenvectors=False)
+
+	if _ishamiltonian(H):
+		[E_min] = H.eigsh(time=time,which="SA",**eigsh_args)
+		[E_max] = H.eigsh(time=time,which="LA",**eigsh_args)
+	else:
+		[E_min] = _sla.eigsh(H,which="SA",**eigsh_args)
+		[E_max] = _sla.eigsh(H,which="LA",**eigsh_args)
+
+	delta = eps*(E_max-E_min)/2.0
+
+	return E_min-delta,E_max+delta
+
+
+def jackson_kernel(n_moments):
+	"""Jackson kernel coefficients :math:`g_n` damping the Gibbs oscillations of a truncated Chebyshev series.
+
+	.. math::
+		g_n = \\frac{(N-n+1)\\cos\\frac{\\pi n}{N+1} + \\sin\\frac{\\pi n}{N+1}\\cot\\frac{\\pi}{N+1}}{N+1}
+
+	Parameters
+	-----------
+	n_moments : int
+		Number of Chebyshev moments :math:`N`.
+
+	Returns
+	--------
+	numpy.ndarray
+		Kernel coefficients, shape `(n_moments,)`.
+
+	"""
+	N = n_moments
+	n = _np.arange(N)
+	q = _np.pi/(N+1)
+	return ((N-n+1)*_np.cos(q*n) + _np.sin(q*n)/_np.tan(q))/(N+1)
+
+
+def lorentz_kernel(n_moments,lamb=4.0):
+	"""Lorentz kernel coefficients :math:`g_n=\\sinh[\\lambda(1-n/N)]/\\sinh\\lambda`.
+
+	Recommended for Green's functions, since it preserves their analytic properties.
+
+	Parameters
+	-----------
+	n_moments : int
+		Number of Chebyshev moments :math:`N`.
+	lamb : float, optional
+		Resolution parameter :math:`\\lambda`. Default is `lamb = 4.0`.
+
+	Returns
+	--------
+	numpy.ndarray
+		Kernel coefficients, shape `(n_moments,)`.
+
+	"""
+	n = _np.arange(n_moments)
+	return _np.sinh(lamb*(1.0-n/n_moments))/_np.sinh(lamb)
+
+
+def _kpm_matvec(H,time):
+	# returns function computing out += c * H v.
+	if _ishamiltonian(H):
+		H = H.tocsr(time=time)
+	elif _sp.issparse(H):
+		H = H.tocsr()
+
+	if _sp.isspmatrix_csr(H):
+		def matvec(v,out,c):
+			csr_matvec(H,v,a=c,out=out,overwrite_out=False)
+	else:
+		def matvec(v,out,c):
+			out += c*H.dot(v)
+
+	return matvec,H.dtype
+
+
+def _col_dot(x,y):
+	return _np.einsum("ij,ij->j",x.conj(),y).real
+
+
+def _kpm_block(matvec,V,n_moments,a,b):
+	# Chebyshev moments <v|T_n(H')|v> for each column of V, H'=(H-b)/a, using
+	# mu_{2n} = 2<a_n|a_n> - mu_0 and mu_{2n+1} = 2<a_{n+1}|a_n> - mu_1.
+	mu = _np.zeros((n_moments,V.shape[1]),dtype=_np.float64)
+
+	alpha_0 = V.copy()
+	alpha_1 = -(b/a)*V
+	matvec(alpha_0,alpha_1,1.0/a)
+
+	mu[0] = _col_dot(alpha_0,alpha_0)
+	if n_moments > 1:
+		mu[1] = _col_dot(alpha_0,alpha_1)
+
+	n = 1
+	while 2*n < n_moments:
+		mu[2*n] = 2*_col_dot(alpha_1,alpha_1) - mu[0]
+
+		if 2*n+1 < n_moments:
+			# alpha_{n+1} = 2H'alpha_n - alpha_{n-1}, overwriting alpha_{n-1}.
+			alpha_0 *= -1
+			alpha_0 -= (2*b/a)*alpha_1
+			matvec(alpha_1,alpha_0,2.0/a)
+			alpha_0,alpha_1 = alpha_1,alpha_0
+
+			mu[2*n+1] = 2*_col_dot(alpha_1,alpha_0) - mu[1]
+
+		n += 1
+
+	return mu
+
+
+def _random_vectors(seed,cols,Ns,dtype):
+	# random phase vectors, normalised such that E[<r|A|r>] = Tr(A)/Ns.
+	V = _np.zeros((Ns,len(cols)),dtype=dtype)
+	for j,col in enumerate(cols):
+		rng = _np.random.RandomState([seed,col])
+		if _np.iscomplexobj(V):
+			V[:,j] = _np.exp(2j*_np.pi*rng.uniform(size=Ns))
+		else:
+			V[:,j] = rng.choice([-1.0,1.0],size=Ns)
+
+	V /= _np.sqrt(Ns)
+	return V
+
+
+def _save_checkpoint(checkpoint,**data):
+	tmp = checkpoint+".tmp"
+	with open(tmp,"wb") as f:
+		_np.savez(f,**data)
+	os.replace(tmp,checkpoint)
+
+
+def kpm_moments(H,n_moments,bounds,v0=None,n_vectors=10,time=0.0,seed=None,block_size=8,n_jobs=1,checkpoint=None,verbose=False):
+	"""Computes Chebyshev moments of a hermitian operator for the kernel polynomial method (KPM).
+
+	With :math:`\\tilde H=(H-b)/a` the operator rescaled from `bounds` onto :math:`[-1,1]`, the function computes either
+
+	* the normalised trace :math:`\\mu_n=\\mathrm{Tr}\\,T_n(\\tilde H)/N_s` (`v0=None`), estimated stochastically
+	  from `n_vectors` random phase vectors, or
+	* the moments :math:`\\mu_n=\\langle v_0|T_n(\\tilde H)|v_0\\rangle` of given states `v0`, which yield local densities
+	  of states and spectral functions (e.g. for `v0` = :math:`O|\\psi\\rangle`).
+
+	Notes
+	-----
+	* The vectors are processed in blocks of `block_size` columns, so each application of a sparse matrix
+	  streams it from memory once for the whole block (OpenMP `csr_matvec`). Two moments are
+	  obtained per matrix-vector product.
+	* Blocks are distributed over `n_jobs` threads. Any `H` which is not a `hamiltonian` or sparse matrix is applied
+	  matrix-free through its `dot` method, e.g. a `quantum_LinearOperator`.
+	* Random vector `i` is drawn from a generator seeded by `(seed,i)`, so the result does not depend on
+	  `block_size`, `n_jobs` or on interrupting and resuming a calculation.
+	* If `checkpoint` is given, the moments of every finished block are stored in that file. Rerunning the function
+	  with the same file resumes the calculation, and `n_vectors` may be increased between runs to improve the
+	  trace estimate.
+
+	Parameters
+	-----------
+	H : obj
+		Hermitian operator: `hamiltonian`, `scipy.sparse` matrix, `numpy.ndarray` or any object with a `dot` method.
+	n_moments : int
+		Number of Chebyshev moments to compute.
+	bounds : tuple
+		`(E_min,E_max)` interval containing the spectrum of `H`, see `kpm_bounds`.
+	v0 : numpy.ndarray, optional
+		States, shape `(Ns,)` or `(Ns,k)`. If `None` (default) the trace is estimated with random vectors.
+	n_vectors : int, optional
+		Number of random vectors for the stochastic trace. Default is `n_vectors = 10`.
+	time : float, optional
+		Time to evaluate a time-dependent `hamiltonian` at. Default is `time = 0.0`.
+	seed : int, optional
+		Seed for the random vectors. Default is a random seed (stored in the `checkpoint` file, if used).
+	block_size : int, optional
+		Number of vectors processed together. Default is `block_size = 8`.
+	n_jobs : int, optional
+		Number of threads working on different blocks of vectors. Default is `n_jobs = 1`.
+	checkpoint : str, optional
+		Path of a file to store and resume partial results.
+	verbose : bool, optional
+		Prints the progress over blocks of vectors.
+
+	Returns
+	--------
+	numpy.ndarray
+		Moments :math:`\\mu_n`, shape `(n_moments,)`; or `(n_moments,k)` for a 2-d array `v0`.
+
+	Examples
+	---------
+	>>> bounds = kpm_bounds(H)
+	>>> mu = kpm_moments(H,256,bounds,n_vectors=20)
+	>>> rho = kpm_dos(mu,bounds,E)
+
+	"""
+	E_min,E_max = bounds
+	if not E_max > E_min:
+		raise ValueError("expecting bounds=(E_min,E_max) with E_min < E_max.")
+
+	n_moments = int(n_moments)
+	if n_moments < 1:
+		raise ValueError("n_moments must be a positive integer.")
+
+	a = (E_max-E_min)/2.0
+	b = (E_max+E_min)/2.0
+
+	Ns = (H.Ns if _ishamiltonian(H) else H.shape[0])
+	matvec,H_dtype = _kpm_matvec(H,time)
+
+	if v0 is None:
+		n_vectors = int(n_vectors)
+		if n_vectors < 1:
+			raise ValueError("n_vectors must be a positive integer.")
+
+		dtype = _np.result_type(H_dtype,_np.float64)
+		squeeze = False
+	else:
+		v0 = _np.asarray(v0)
+		if v0.ndim not in [1,2] or v0.shape[0] != Ns:
+			raise ValueError("expecting v0 of shape ({0},) or ({0},k).".format(Ns))
+
+		squeeze = (v0.ndim == 1)
+		v0 = v0.reshape((Ns,-1))
+		n_vectors = v0.shape[1]
+		dtype = _np.result_type(H_dtype,v0.dtype,_np.float64)
+
+	mu = _np.zeros((n_moments,n_vectors),dtype=_np.float64)
+	done = _np.zeros(n_vectors,dtype=_np.bool_)
+
+	if checkpoint is not None and os.path.exists(checkpoint):
+		with _np.load(checkpoint) as f:
+			if f["mu"].shape[0] != n_moments or f["Ns"] != Ns or not _np.allclose(f["bounds"],bounds) or \
+				bool(f["stochastic"]) != (v0 is None):
+				raise ValueError("checkpoint file '{}' was created for a different calculation.".format(checkpoint))
+
+			if v0 is None:
+				if seed is not None and seed != f["seed"]:
+					raise ValueError("seed does not match the seed of the checkpoint file '{}'.".format(checkpoint))
+				seed = int(f["seed"])
+			elif f["mu"].shape[1] != n_vectors:
+				raise ValueError("checkpoint file '{}' was created for a different calculation.".format(checkpoint))
+
+			n_done = min(n_vectors,f["mu"].shape[1])
+			mu[:,:n_done] = f["mu"][:,:n_done]
+			done[:n_done] = f["done"][:n_done]
+
+	if v0 is None and seed is None:
+		seed = _np.random.randint(2**31)
+
+	todo = _np.flatnonzero(~done)
+	blocks = [todo[i:i+block_size] for i in range(0,len(todo),block_size)]
+
+	def compute(cols):
+		if v0 is None:
+			V = _random_vectors(seed,cols,Ns,dtype)
+		else:
+			V = _np.array(v0[:,cols],dtype=dtype,order="C")
+
+		return cols,_kpm_block(matvec,V,n_moments,a,b)
+
+	pool = (_ThreadPool(n_jobs) if n_jobs > 1 and len(blocks) > 1 else None)
+	results = (pool.imap_unordered(compute,blocks) if pool is not None else map(compute,blocks))
+
+	try:
+		for i,(cols,mu_block) in enumerate(results):
+			mu[:,cols] = mu_block
+			done[cols] = True
+
+			if checkpoint is not None:
+				_save_checkpoint(checkpoint,mu=mu,done=done,Ns=Ns,bounds=_np.asarray(bounds,dtype=_np.float64),
+					seed=(seed if v0 is None else -1),stochastic=(v0 is None))
+
+			if verbose:
+				print("kpm_moments: finished block {0}/{1}.".format(i+1,len(blocks)))
+	finally:
+		if pool is not None:
+			pool.terminate()
+
+	if v0 is None:
+		return mu.mean(axis=1)
+	elif squeeze:
+		return mu[:,0]
+	else:
+		return mu
+
+
+def kpm_dos(moments,bounds,E,kernel="jackson",lamb=4.0):
+	"""Reconstructs a (local) density of states from Chebyshev moments.
+
+	.. math::
+		\\rho(E) = \\frac{1}{\\pi a\\sqrt{1-x^2}}\\left[g_0\\mu_0 + 2\\sum_{n\\geq 1}g_n\\mu_nT_n(x)\\right],\\qquad x=\\frac{E-b}{a}
+
+	With moments of the normalised trace, :math:`\\rho(E)` integrates to one; with moments of a state :math:`|v_0\\rangle`
+	it is the spectral function :math:`\\langle v_0|\\delta(E-H)|v_0\\rangle`. Finite-temperature averages follow by
+	integrating :math:`\\rho(E)` against the Boltzmann weight.
+
+	Parameters
+	-----------
+	moments : numpy.ndarray
+		Chebyshev moments, shape `(n_moments,)` or `(n_moments,k)`, see `kpm_moments`.
+	bounds : tuple
+		`(E_min,E_max)` used to compute `moments`.
+	E : numpy.ndarray
+		Energies at which to evaluate the density.
+	kernel : str or numpy.ndarray, optional
+		Either "jackson" (default), "lorentz", `None` (no damping), or an array with custom kernel coefficients :math:`g_n`.
+	lamb : float, optional
+		Resolution parameter of the Lorentz kernel. Default is `lamb = 4.0`.
+
+	Returns
+	--------
+	numpy.ndarray
+		Density of states at energies `E`, shape `E.shape` or `E.shape+(k,)`.
+
+	"""
+	moments = _np.asarray(moments)
+	n_moments = moments.shape[0]
+
+	if kernel is None:
+		g = _np.ones(n_moments)
+	elif isinstance(kernel,str):
+		if kernel == "jackson":
+			g = jackson_kernel(n_moments)
+		elif kernel == "lorentz":
+			g = lorentz_kernel(n_moments,lamb=lamb)
+		else:
+			raise ValueError("kernel must be one of 'jackson', 'lorentz' or None.")
+	else:
+		g = _np.asarray(kernel)
+		if g.shape != (n_moments,):
+			raise ValueError("expecting kernel coefficients of shape ({},).".format(n_moments))
+
+	E_min,E_max = bounds
+	a = (E_max-E_min)/2.0
+	b = (E_max+E_min)/2.0
+
+	E = _np.asarray(E,dtype=_np.float64)
+	x = (E-b)/a
+	inside = _np.abs(x) < 1.0
+	x = _np.where(inside,x,0.0)
+
+	c = (g*moments.T).T
+	c[1:] *= 2
+
+	rho = _np.polynomial.chebyshev.chebval(x,c) # shape moments.shape[1:]+E.shape
+	rho = _np.moveaxis(rho,tuple(range(c.ndim-1)),tuple(range(-(c.ndim-1),0)))
+
+	weight = _np.where(inside,1.0/(_np.pi*a*_np.sqrt(1.0-x**2)),0.0)
+
+	return (rho.T*weight.T).T
@@ -9,6 +9,7 @@ import numpy.linalg as _npla
 import scipy.sparse as _sp
 import numpy as _np
 from inspect import isgenerator as _isgenerator 
+from itertools import chain as _chain
 
 # needed for isinstance only
 from ..operators import ishamiltonian as _ishamiltonian
@@ -547,7 +548,7 @@ def diag_ensemble(N,system_state,E2,V2,density=True,alpha=1.0,rho_d=False,Obs=Fa
 
 	return Expt_Diag
 
-def obs_vs_time(psi_t,times,Obs_dict,return_state=False,Sent_args={},enforce_pure=False,verbose=False):
+def obs_vs_time(psi_t,times,Obs_dict,return_state=False,Sent_args={},enforce_pure=False,verbose=False,chunk_size=32):
 	"""Calculates expectation value of observable(s) as a function of time in a time-dependent state.
 
 	Examples
@@ -610,6 +611,11 @@ def obs_vs_time(psi_t,times,Obs_dict,return_state=False,Sent_args={},enforce_pur
 	verbose : bool, optional
 		If set to `True`, displays a message at every `times` step after the calculation is complete.
 		Default is `False`.
+	chunk_size : int, optional
+		Pure states are processed in blocks of `chunk_size` states: the observables are applied to all states of 
+		a block at once and the entanglement entropies are computed with a single batched SVD. States from a 
+		generator are gathered into a buffer of `chunk_size` states, such that the memory stays bounded. 
+		Default is `32`.
 
 	Returns
 	--------
@@ -721,56 +727,72 @@ def obs_vs_time(psi_t,times,Obs_dict,return_state=False,Sent_args={},enforce_pur
 		calc_Sent = True
 		variables.append("Sent_time")
 	
+	# the entanglement entropy of a block of pure states is computed with a single batched svd, 
+	# except for the deprecated function `ent_entropy` and sparse reduced DMs.
+	batch_Sent = calc_Sent and (calc_ent_entropy is not ent_entropy) and not Sent_args.get("sparse",False)
+
 	if return_state:
-		for key,Obs in Obs_dict.items():
-			Expt_time[key]=Obs.expt_value(psi_t,time=times,check=False,enforce_pure=enforce_pure).real
-			
-		# calculate entanglement entropy if requested	
-		if calc_Sent:
-			Sent_time = calc_ent_entropy(psi_t,**Sent_args)
+		if psi_t.ndim == 2 and (psi_t.shape[0] != psi_t.shape[1] or enforce_pure) and (batch_Sent or not calc_Sent):
+			# pure states: bounded memory for the intermediate arrays.
+			n = psi_t.shape[1]
+			blocks = (psi_t[:,i:i+chunk_size] for i in range(0,n,chunk_size))
+			Expt_time,Sent_time = _obs_vs_time_chunks(blocks,times,Obs_dict,(calc_ent_entropy if calc_Sent else None),
+										Sent_args,batch_Sent,verbose)
+		else:
+			for key,Obs in Obs_dict.items():
+				Expt_time[key]=Obs.expt_value(psi_t,time=times,check=False,enforce_pure=enforce_pure).real
+				
+			# calculate entanglement entropy if requested	
+			if calc_Sent:
+				Sent_time = calc_ent_entropy(psi_t,**Sent_args)
 
 
 	else:
 		psi = next(psi_t) # get first state from iterator.
-		# do first calculations of loop
 
-		time = times[0]
+		if _np.ndim(psi) == 1: # pure states are gathered in blocks of `chunk_size` states.
+			blocks = _chunk_states(_chain([psi],psi_t),chunk_size)
+			Expt_time,Sent_time = _obs_vs_time_chunks(blocks,times,Obs_dict,(calc_ent_entropy if calc_Sent else None),
+										Sent_args,batch_Sent,verbose)
+		else:
+			# do first calculations of loop
+			time = times[0]
 
-		for key,Obs in Obs_dict.items():
-			
-			val = Obs.expt_value(psi,time=time,check=False).real
-			dtype = _np.dtype(val)
-			Expt_time[key] = _np.zeros((len(times),),dtype=dtype)
-			Expt_time[key][0] = val
+			for key,Obs in Obs_dict.items():
+				
+				val = Obs.expt_value(psi,time=time,check=False).real
+				dtype = _np.dtype(val)
+				Expt_time[key] = _np.zeros((len(times),),dtype=dtype)
+				Expt_time[key][0] = val
 
 
 
-		# get initial dictionary from ent_entropy function
-		# use this to set up dictionary for the rest of calculation.
-		if calc_Sent:
-			Sent_time = calc_ent_entropy(psi,**Sent_args)
+			# get initial dictionary from ent_entropy function
+			# use this to set up dictionary for the rest of calculation.
+			if calc_Sent:
+				Sent_time = calc_ent_entropy(psi,**Sent_args)
 
-			for key,val in Sent_time.items():
-				val = _np.asarray(val)
-				dtype = val.dtype
-				shape = (len(times),) + val.shape
-				Sent_time[key] = _np.zeros(shape,dtype=dtype)
-				Sent_time[key][0] = val
+				for key,val in Sent_time.items():
+					val = _np.asarray(val)
+					dtype = val.dtype
+					shape = (len(times),) + val.shape
+					Sent_time[key] = _np.zeros(shape,dtype=dtype)
+					Sent_time[key][0] = val
 
-		# loop over psi generator
-		for m,psi in enumerate(psi_t):
+			# loop over psi generator
+			for m,psi in enumerate(psi_t):
 
-			time = times[m+1]
+				time = times[m+1]
 
-			if verbose: print("obs_vs_time integrated to t={:.4f}".format(time))
+				if verbose: print("obs_vs_time integrated to t={:.4f}".format(time))
 
-			for key,Obs in Obs_dict.items():
-				Expt_time[key][m+1] = Obs.expt_value(psi,time=time,check=False).real
+				for key,Obs in Obs_dict.items():
+					Expt_time[key][m+1] = Obs.expt_value(psi,time=time,check=False).real
 
-			if calc_Sent:
-				Sent_time_update = calc_ent_entropy(psi,**Sent_args)
-				for key in Sent_time.keys():
-					Sent_time[key][m+1] = Sent_time_update[key]
+				if calc_Sent:
+					Sent_time_update = calc_ent_entropy(psi,**Sent_args)
+					for key in Sent_time.keys():
+						Sent_time[key][m+1] = Sent_time_update[key]
 
 		
 	return_dict = {}
@@ -785,6 +807,70 @@ def obs_vs_time(psi_t,times,Obs_dict,return_state=False,Sent_args={},enforce_pur
 
 ##### private functions
 
+def _chunk_states(psi_t,chunk_size):
+	# gathers the pure states generated by `psi_t` in the columns of a reused buffer.
+	V = None
+	k = 0
+	for psi in psi_t:
+		psi = _np.asarray(psi).ravel()
+		if V is None:
+			V = _np.zeros((psi.shape[0],chunk_size),dtype=psi.dtype)
+		elif not _np.can_cast(psi.dtype,V.dtype,casting="same_kind"):
+			V = V.astype(_np.result_type(V.dtype,psi.dtype))
+
+		V[:,k] = psi
+		k += 1
+		if k == chunk_size:
+			yield V
+			k = 0
+
+	if k > 0:
+		yield V[:,:k]
+
+def _obs_vs_time_chunks(blocks,times,Obs_dict,calc_ent_entropy,Sent_args,batch_Sent,verbose):
+	# calculates the expectation values and entanglement entropies for consecutive blocks of pure states 
+	# stored in the columns of the arrays generated by `blocks`.
+	times = _np.asarray(times)
+	n_times = len(times)
+	Expt_time = {}
+	Sent_time = {}
+	m = 0
+
+	for V in blocks:
+		k = V.shape[1]
+		times_block = times[m:m+k]
+		if len(times_block) != k:
+			raise ValueError("number of states must be equal to the number of times.")
+
+		for key,Obs in Obs_dict.items():
+			val = Obs.expt_value(V,time=times_block,check=False,enforce_pure=True).real
+			if key not in Expt_time:
+				Expt_time[key] = _np.zeros((n_times,),dtype=val.dtype)
+
+			Expt_time[key][m:m+k] = val
+
+		if calc_ent_entropy is not None:
+			if batch_Sent:
+				Sent_block = calc_ent_entropy(V,**dict(Sent_args,enforce_pure=True))
+				# restore the axis of the states which is squeezed for a single state.
+				Sent_block = {key:_np.asarray(val).reshape((k,)+(_np.shape(val)[1:] if k > 1 else _np.shape(val))) 
+								for key,val in Sent_block.items()}
+			else:
+				Sent_list = [calc_ent_entropy(V[:,i],**Sent_args) for i in range(k)]
+				Sent_block = {key:_np.stack([_np.asarray(Sent[key]) for Sent in Sent_list]) for key in Sent_list[0].keys()}
+
+			for key,val in Sent_block.items():
+				if key not in Sent_time:
+					Sent_time[key] = _np.zeros((n_times,)+val.shape[1:],dtype=val.dtype)
+
+				Sent_time[key][m:m+k] = val
+
+		m += k
+
+		if verbose: print("obs_vs_time integrated to t={:.4f}".format(times[m-1]))
+
+	return Expt_time,Sent_time
+
 def _ent_entropy(system_state,basis,chain_subsys=None,density=False,subsys_ordering=True,alpha=1.0,DM=False,svd_return_vec=[False,False,False]):
 	"""
 	This function calculates the entanglement entropy of a lattice quantum subsystem based on the Singular Value Decomposition (svd). The entanglement entropy is NORMALISED by the size of the
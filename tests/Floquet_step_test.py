@@ -0,0 +1,70 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+from quspin.basis import spin_basis_1d
+from quspin.operators import hamiltonian
+from quspin.tools.Floquet import Floquet,_evolve_step_block
+from quspin.tools.expm_multiply_parallel_core import expm_multiply_parallel
+import numpy as np
+import scipy.sparse.linalg as sla
+
+"""
+This test makes sure the Floquet unitary of the Periodic Step, built from blocks of basis states, agrees with
+the unitary built by evolving one basis state at a time.
+"""
+
+np.random.seed(0)
+
+def U_per_state(A_list,Ns):
+	# one evolved basis state per row, as in the Floquet class.
+	U = np.zeros((Ns,Ns),dtype=np.complex128)
+	for i in range(Ns):
+		psi = np.zeros((Ns,),dtype=np.complex128)
+		psi[i] = 1.0
+		for A in A_list:
+			psi = sla.expm_multiply(A,psi)
+		U[i,:] = psi
+	return U
+
+L = 6
+Omega = 4.5
+T = 2*np.pi/Omega
+
+basis = spin_basis_1d(L)
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+g = [[0.81,i] for i in range(L)]
+h = [[0.43,i] for i in range(L)]
+
+def drive(t,Omega):
+	return np.sign(np.cos(Omega*t))
+
+kwargs = dict(basis=basis,dtype=np.float64,check_herm=False,check_symm=False,check_pcon=False)
+H = hamiltonian([["zz",J],["z",h]],[["x",g,drive,[Omega]]],**kwargs)
+H_list = [hamiltonian([["zz",J],["z",h]],[],**kwargs),hamiltonian([["x",g]],[],**kwargs)]
+
+# H and t_list
+t_list = np.array([0.0,T/4.0,3*T/4.0])
+dt_list = np.array([T/4.0,T/2.0,T/4.0])
+A_list = [-1j*dt*H.tocsr(t) for t,dt in zip(t_list,dt_list)]
+U_ref = U_per_state(A_list,basis.Ns)
+
+UF = Floquet(dict(H=H,t_list=t_list,dt_list=dt_list,T=T),UF=True,n_jobs=1).UF
+np.testing.assert_allclose(UF,U_ref,atol=1e-12)
+
+# the blocks do not depend on how the basis states are split up.
+U_list = [expm_multiply_parallel(H.tocsr(t),a=-1j*dt) for t,dt in zip(t_list,dt_list)]
+blocks = [_evolve_step_block(i_start,i_stop,basis.Ns,U_list) for i_start,i_stop in [(0,5),(5,6),(6,basis.Ns)]]
+np.testing.assert_allclose(np.vstack(blocks),U_ref,atol=1e-12)
+
+# H_list
+dt_list = np.array([T/3.0,2*T/3.0])
+A_list = [-1j*dt*H_i.tocsr() for H_i,dt in zip(H_list,dt_list)]
+U_ref = U_per_state(A_list,basis.Ns)
+
+UF = Floquet(dict(H_list=H_list,dt_list=dt_list,T=T),UF=True,n_jobs=1).UF
+np.testing.assert_allclose(UF,U_ref,atol=1e-12)
+
+print("Floquet Periodic Step tests passed!")
@@ -0,0 +1,58 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.operators import hamiltonian,quantum_LinearOperator
+from quspin.basis import spin_basis_1d,spinless_fermion_basis_1d,spinful_fermion_basis_1d,boson_basis_1d
+import numpy as np
+
+
+"""
+This test makes sure `quantum_LinearOperator` agrees with `hamiltonian` for the basis_1d classes,
+including the symmetry sectors with more than one matrix element per state.
+"""
+
+def check_LinearOperator(basis,static,dtype):
+	kwargs = dict(basis=basis,dtype=dtype,check_herm=False,check_symm=False,check_pcon=False)
+	H = hamiltonian(static,[],**kwargs)
+
+	atol = 1e-5 if dtype in [np.float32,np.complex64] else 1e-12
+
+	v = np.random.uniform(-1,1,size=(basis.Ns,))
+	np.testing.assert_allclose(H.dot(v),quantum_LinearOperator(static,**kwargs).dot(v),atol=atol)
+
+	V = np.random.uniform(-1,1,size=(basis.Ns,3))
+	np.testing.assert_allclose(H.dot(V),quantum_LinearOperator(static,**kwargs).dot(V),atol=atol)
+	np.testing.assert_allclose(H.T.dot(V),quantum_LinearOperator(static,**kwargs).T.dot(V),atol=atol)
+	np.testing.assert_allclose(H.H.dot(V),quantum_LinearOperator(static,**kwargs).H.dot(V),atol=atol)
+
+	# output arrays which are not C-contiguous are updated in place.
+	opstr,indx = static[0][0],static[0][1][0][1:]
+	v_out = np.asfortranarray(np.ones(V.shape,dtype=np.result_type(V.dtype,dtype)))
+	assert(basis.inplace_Op(V,opstr,indx,0.5,dtype,v_out=v_out) is v_out)
+	np.testing.assert_allclose(v_out,1.0+basis.inplace_Op(V,opstr,indx,0.5,dtype),atol=atol)
+
+
+L = 8
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[0.37,i] for i in range(L)]
+spin_static = [["+-",J],["-+",J],["zz",J],["x",h]]
+fermion_static = [["+-",J],["-+",J],["zz",J],["n",h]]
+
+for dtype in [np.float32,np.float64,np.complex64,np.complex128]:
+	for pauli in [True,False]:
+		check_LinearOperator(spin_basis_1d(L,pauli=pauli),spin_static,dtype)
+		check_LinearOperator(spin_basis_1d(L,pblock=1,zblock=-1,pauli=pauli),spin_static,dtype)
+
+	check_LinearOperator(spin_basis_1d(L,Nup=L//2,pblock=-1),spin_static[:3],dtype)
+	check_LinearOperator(spinless_fermion_basis_1d(L,Nf=L//2,pblock=1),fermion_static[:3],dtype)
+	check_LinearOperator(boson_basis_1d(L,Nb=L//2,sps=3),fermion_static,dtype)
+	check_LinearOperator(spinful_fermion_basis_1d(L//2,Nf=(2,2)),[["+-|",J[:L//2-1]],["|+-",J[:L//2-1]],["n|n",[[0.37,i,i] for i in range(L//2)]]],dtype)
+	if np.iscomplexobj(dtype(1)):
+		for k in range(L):
+			check_LinearOperator(spin_basis_1d(L,kblock=k),spin_static,dtype)
+			check_LinearOperator(spin_basis_1d(L,kblock=k,pblock=1,zblock=1),spin_static,dtype)
+
+print("basis_1d quantum_LinearOperator tests passed!")
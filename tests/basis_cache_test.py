@@ -0,0 +1,46 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.basis import spin_basis_general,boson_basis_general,set_basis_cache
+import numpy as np
+import tempfile,shutil
+
+
+def check_cache(basis_class,N,**kwargs):
+	basis_1 = basis_class(N,**kwargs)
+
+	cache_dir = tempfile.mkdtemp()
+	try:
+		set_basis_cache(cache_dir)
+		basis_2 = basis_class(N,**kwargs) # stores basis in cache
+		basis_3 = basis_class(N,**kwargs) # loads basis from cache
+	finally:
+		set_basis_cache(None)
+		
+	for basis in [basis_2,basis_3]:
+		assert(basis.Ns == basis_1.Ns)
+		np.testing.assert_array_equal(basis._basis,basis_1._basis)
+		np.testing.assert_array_equal(basis._n,basis_1._n)
+		if hasattr(basis_1,"_Np_list"):
+			np.testing.assert_array_equal(basis._Np_list,basis_1._Np_list)
+
+	assert(isinstance(basis_3._basis,np.memmap))
+
+	shutil.rmtree(cache_dir)
+
+
+L = 12
+t = np.array([(i+1)%L for i in range(L)])
+p = np.array([L-i-1 for i in range(L)])
+z = np.array([-(i+1) for i in range(L)])
+
+check_cache(spin_basis_general,L,kblock=(t,0),pblock=(p,0),zblock=(z,0))
+check_cache(spin_basis_general,L,Nup=L//2,kblock=(t,1))
+check_cache(spin_basis_general,L,_Np=L,kblock=(t,0),pblock=(p,0))
+check_cache(spin_basis_general,L,S="1",Nup=L//2,kblock=(t,0))
+check_cache(boson_basis_general,L//2,sps=3,kblock=(t[:L//2]%(L//2),0))
+
+print("basis cache tests passed!")
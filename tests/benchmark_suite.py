@@ -0,0 +1,267 @@
+"""
+Performance benchmarks for QuSpin.
+
+Every benchmark is run for a list of system sizes in a separate process, such that the peak resident
+memory reported for a benchmark is not polluted by the previous ones. The results (wall time of every
+repetition, peak RSS, number of threads requested through OMP_NUM_THREADS) are printed and can be exported to a JSON file to track
+the performance across versions, e.g.
+
+	$ OMP_NUM_THREADS=4 python benchmark_suite.py --json results.json
+	$ python benchmark_suite.py --quick --filter evolve
+
+This script is not part of the correctness tests run by `run_test.sh`.
+"""
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),"../")
+sys.path.insert(0,quspin_path)
+
+import argparse,json,platform,time,multiprocessing,subprocess
+import numpy as np
+
+try:
+	import resource
+except ImportError: # windows
+	resource = None
+
+try:
+	from queue import Empty
+except ImportError: # python 2
+	from Queue import Empty
+
+
+_benchmarks = []
+
+def benchmark(*params):
+	"""Registers a benchmark: the decorated function is called with one of `params` and does all the
+	setup, it returns the function whose execution is timed."""
+	def decorator(setup):
+		_benchmarks.append((setup.__name__,setup,params))
+		return setup
+
+	return decorator
+
+
+def _XXZ(L,pbc=True):
+	J = [[1.0,i,(i+1)%L] for i in range(L if pbc else L-1)]
+	Jzz = [[0.5,i,(i+1)%L] for i in range(L if pbc else L-1)]
+	return [["+-",J],["-+",J],["zz",Jzz]]
+
+def _symmetries(L):
+	t = np.array([(i+1)%L for i in range(L)])
+	p = np.array([L-i-1 for i in range(L)])
+	z = np.array([-(i+1) for i in range(L)])
+	return dict(kblock=(t,0),pblock=(p,0),zblock=(z,0))
+
+def _drive(t,Omega):
+	return np.cos(Omega*t)
+
+def _random_state(Ns,dtype=np.complex128,n_vec=None):
+	shape = (Ns,) if n_vec is None else (Ns,n_vec)
+	v = np.random.uniform(-1,1,size=shape) + 1j*np.random.uniform(-1,1,size=shape)
+	v /= np.linalg.norm(v,axis=0)
+	return v.astype(dtype)
+
+_no_checks = dict(check_herm=False,check_symm=False,check_pcon=False)
+
+
+@benchmark(16,20,24)
+def basis_general_construction(L):
+	from quspin.basis import spin_basis_general
+	return lambda:spin_basis_general(L,Nup=L//2,**_symmetries(L))
+
+@benchmark(16,20,24)
+def basis_1d_construction(L):
+	from quspin.basis import spin_basis_1d
+	return lambda:spin_basis_1d(L,Nup=L//2,kblock=0,pblock=1,zblock=1)
+
+@benchmark(14,18,22)
+def hamiltonian_construction(L):
+	from quspin.basis import spin_basis_general
+	from quspin.operators import hamiltonian
+	basis = spin_basis_general(L,Nup=L//2)
+	static = _XXZ(L)
+	return lambda:hamiltonian(static,[],basis=basis,dtype=np.float64,**_no_checks)
+
+@benchmark(16,20,22)
+def csr_matvec(L):
+	from quspin.basis import spin_basis_general
+	from quspin.operators import hamiltonian
+	from quspin.tools.misc import csr_matvec
+	basis = spin_basis_general(L,Nup=L//2)
+	H = hamiltonian(_XXZ(L),[],basis=basis,dtype=np.float64,**_no_checks).tocsr()
+	v = _random_state(basis.Ns,dtype=np.float64)
+	out = np.zeros_like(v)
+	def run():
+		for i in range(10):
+			csr_matvec(H,v,out=out)
+	return run
+
+@benchmark(14,18,20)
+def hamiltonian_dot(L):
+	from quspin.basis import spin_basis_general
+	from quspin.operators import hamiltonian
+	basis = spin_basis_general(L,Nup=L//2)
+	hx = [[1.0,i] for i in range(L)]
+	H = hamiltonian(_XXZ(L),[["zz",hx,_drive,(1.0,)]],basis=basis,dtype=np.complex128,**_no_checks)
+	times = np.linspace(0,10,20)
+	V = _random_state(basis.Ns,n_vec=len(times))
+	return lambda:H.dot(V,time=times)
+
+@benchmark(14,18,20)
+def expm_multiply_parallel_dot(L):
+	from quspin.basis import spin_basis_general
+	from quspin.operators import hamiltonian
+	from quspin.tools.evolution import expm_multiply_parallel
+	basis = spin_basis_general(L,Nup=L//2)
+	H = hamiltonian(_XXZ(L),[],basis=basis,dtype=np.float64,**_no_checks)
+	U = expm_multiply_parallel(H.tocsr(),a=-1j*0.5)
+	v = _random_state(basis.Ns)
+	work_array = np.zeros((2*basis.Ns,),dtype=v.dtype)
+	return lambda:U.dot(v,work_array=work_array)
+
+@benchmark(12,14,16)
+def hamiltonian_evolve(L):
+	from quspin.basis import spin_basis_general
+	from quspin.operators import hamiltonian
+	basis = spin_basis_general(L,Nup=L//2)
+	hx = [[1.0,i] for i in range(L)]
+	H = hamiltonian(_XXZ(L),[["zz",hx,_drive,(1.0,)]],basis=basis,dtype=np.complex128,**_no_checks)
+	v0 = _random_state(basis.Ns)
+	times = np.linspace(0,5,11)
+	return lambda:H.evolve(v0,0.0,times,atol=1E-9,rtol=1E-9)
+
+@benchmark(14,18,20)
+def basis_ent_entropy(L):
+	from quspin.basis import spin_basis_1d
+	basis = spin_basis_1d(L)
+	psi = _random_state(basis.Ns)
+	return lambda:basis.ent_entropy(psi,sub_sys_A=range(L//2),density=True)
+
+@benchmark(8,10,12)
+def Floquet_step_drive(L):
+	from quspin.basis import spin_basis_1d
+	from quspin.operators import hamiltonian
+	from quspin.tools.Floquet import Floquet
+	basis = spin_basis_1d(L)
+	hx = [[1.0,i] for i in range(L)]
+	H0 = hamiltonian(_XXZ(L),[],basis=basis,dtype=np.float64,**_no_checks)
+	H1 = hamiltonian([["x",hx]],[],basis=basis,dtype=np.float64,**_no_checks)
+	evo_dict = dict(H_list=[H0,H1],dt_list=np.array([0.3,0.7]))
+	return lambda:Floquet(evo_dict,VF=True,thetaF=True)
+
+
+def _peak_rss_mb():
+	if resource is None:
+		return None
+
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == "darwin": # bytes on macOS, kilobytes on linux
+		return rss/1024.0**2
+	else:
+		return rss/1024.0
+
+def _run_case(setup,param,repeat,queue):
+	try:
+		np.random.seed(0)
+		t0 = time.time()
+		run = setup(param)
+		setup_time = time.time()-t0
+		times = []
+		for i in range(repeat):
+			t0 = time.time()
+			run()
+			times.append(time.time()-t0)
+
+		queue.put(dict(setup_time=setup_time,times=times,min=min(times),median=float(np.median(times)),
+						peak_rss_mb=_peak_rss_mb()))
+	except Exception as e:
+		queue.put(dict(error="{}: {}".format(e.__class__.__name__,e)))
+
+def _run_isolated(setup,param,repeat,timeout=None):
+	# the queue is polled such that a process which dies without returning a result (e.g. killed when 
+	# running out of memory) or which exceeds `timeout` seconds is recorded as a failure.
+	queue = multiprocessing.Queue()
+	proc = multiprocessing.Process(target=_run_case,args=(setup,param,repeat,queue))
+	proc.start()
+	t0 = time.time()
+	result = None
+	while result is None:
+		try:
+			result = queue.get(timeout=1.0)
+		except Empty:
+			if not proc.is_alive():
+				try:
+					result = queue.get(timeout=1.0)
+				except Empty:
+					result = dict(error="process exited with code {} without returning a result.".format(proc.exitcode))
+			elif timeout is not None and time.time()-t0 > timeout:
+				proc.terminate()
+				result = dict(error="timed out after {} s.".format(timeout))
+
+	proc.join()
+	result.update(exitcode=proc.exitcode)
+	if proc.exitcode != 0 and "error" not in result:
+		result.update(error="process exited with code {}.".format(proc.exitcode))
+
+	return result
+
+def _metadata():
+	import scipy,quspin
+
+	try:
+		commit = subprocess.check_output(["git","rev-parse","HEAD"],cwd=quspin_path,
+										 stderr=subprocess.STDOUT).decode().strip()
+	except Exception:
+		commit = None
+
+	return dict(quspin_version=quspin.__version__,git_commit=commit,python=platform.python_version(),
+				numpy=np.__version__,scipy=scipy.__version__,platform=platform.platform(),
+				processor=platform.processor(),cpu_count=multiprocessing.cpu_count(),
+				omp_num_threads=os.environ.get("OMP_NUM_THREADS"),
+				threads_requested=int(os.environ.get("OMP_NUM_THREADS",multiprocessing.cpu_count())),
+				timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="QuSpin performance benchmarks.")
+	parser.add_argument("--json",default=None,help="file to export the results to.")
+	parser.add_argument("--filter",default=None,help="only run benchmarks whose name contains this string.")
+	parser.add_argument("--repeat",type=int,default=3,help="number of timed repetitions per case.")
+	parser.add_argument("--quick",action="store_true",help="only run the smallest size of every benchmark.")
+	parser.add_argument("--threads",type=int,default=None,help="sets OMP_NUM_THREADS for the benchmarks.")
+	parser.add_argument("--timeout",type=float,default=3600.0,help="time limit in seconds for every case.")
+	args = parser.parse_args(argv)
+
+	if args.threads is not None:
+		os.environ["OMP_NUM_THREADS"] = str(args.threads)
+
+	results = dict(metadata=_metadata(),benchmarks=[])
+	print("threads requested: {}, cpus: {}".format(results["metadata"]["threads_requested"],results["metadata"]["cpu_count"]))
+
+	for name,setup,params in _benchmarks:
+		if args.filter is not None and args.filter not in name:
+			continue
+
+		for param in (params[:1] if args.quick else params):
+			result = _run_isolated(setup,param,args.repeat,timeout=args.timeout)
+			result.update(name=name,param=param,threads_requested=results["metadata"]["threads_requested"])
+			results["benchmarks"].append(result)
+
+			if "error" in result:
+				print("{:30s} {:>4} failed: {}".format(name,param,result["error"]))
+			else:
+				print("{:30s} {:>4} min {:10.4f}s median {:10.4f}s peak RSS {} MB".format(name,param,
+					result["min"],result["median"],
+					"n/a" if result["peak_rss_mb"] is None else "{:.1f}".format(result["peak_rss_mb"])))
+
+	if args.json is not None:
+		with open(args.json,"w") as f:
+			json.dump(results,f,indent=1)
+
+	return results
+
+
+if __name__ == "__main__":
+	main()
@@ -104,6 +104,18 @@ def test():
 	for psi_e_2,psi_b_2 in izip(psi_exact_2,psi_block_2):
 		np.testing.assert_allclose(psi_b_2,psi_e_2,atol=1e-7)
 
+	# thread backend
+	for iterate in [True,False]:
+		psi_thread_1 = block_op.evolve(psi0,0,times,iterate=iterate,atol=1e-15,rtol=1e-15,n_jobs=3,backend="thread")
+		psi_thread_2 = block_op.expm(psi0,H_time_eval=0.3,start=start,stop=stop,iterate=iterate,num=num,endpoint=True,n_jobs=3,backend="thread")
+
+		if iterate:
+			psi_thread_1 = np.array([psi for psi in psi_thread_1]).T
+			psi_thread_2 = np.array([psi for psi in psi_thread_2]).T
+
+		np.testing.assert_allclose(psi_thread_1,psi_exact_1,atol=1e-7)
+		np.testing.assert_allclose(psi_thread_2,psi_exact_2,atol=1e-7)
+
 
 
 
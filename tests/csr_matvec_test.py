@@ -41,3 +41,11 @@ for i in range(1000):
 	csr_matvec(A,V,out=V3,a=a)
 	np.testing.assert_allclose(V1,V2,atol=1e-15,rtol=1e-7)
 	np.testing.assert_allclose(V1,V3,atol=1e-15,rtol=1e-7)
+
+	V = np.random.uniform(-1,1,size=(N,5)) + 1j*np.random.uniform(-1,1,size=(N,5))
+	V3 = np.zeros_like(V)
+	V1 = a*A.dot(V)
+	V2 = csr_matvec(A,V,a=a)
+	csr_matvec(A,V,out=V3,a=a)
+	np.testing.assert_allclose(V1,V2,atol=1e-15,rtol=1e-7)
+	np.testing.assert_allclose(V1,V3,atol=1e-15,rtol=1e-7)
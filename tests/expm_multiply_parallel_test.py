@@ -25,6 +25,13 @@ for i in range(100):
 
 	np.testing.assert_allclose(v1-v2,0,atol=1e-10)
 
+	V = np.random.uniform(-1,1,size=(N,5)) + 1j * np.random.uniform(-1,1,size=(N,5))
+
+	V1 = expm_multiply(-1j*A,V)
+	V2 = expm_multiply_parallel(A,a=-1j).dot(V)
+
+	np.testing.assert_allclose(V1-V2,0,atol=1e-10)
+
 
 print("expm_multiply_parallel tests passed!")
 
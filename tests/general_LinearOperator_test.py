@@ -0,0 +1,43 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.operators import hamiltonian,quantum_LinearOperator
+from quspin.basis import spin_basis_general
+import numpy as np
+
+
+def check_LinearOperator(basis,static,dtype):
+	kwargs = dict(basis=basis,dtype=dtype,check_herm=False,check_symm=False,check_pcon=False)
+	H = hamiltonian(static,[],**kwargs)
+
+	atol = 1e-5 if dtype in [np.float32,np.complex64] else 1e-12
+
+	v = np.random.uniform(-1,1,size=(basis.Ns,))
+	np.testing.assert_allclose(H.dot(v),quantum_LinearOperator(static,**kwargs).dot(v),atol=atol)
+
+	V = np.random.uniform(-1,1,size=(basis.Ns,3))
+	np.testing.assert_allclose(H.dot(V),quantum_LinearOperator(static,**kwargs).dot(V),atol=atol)
+	np.testing.assert_allclose(H.T.dot(V),quantum_LinearOperator(static,**kwargs).T.dot(V),atol=atol)
+	np.testing.assert_allclose(H.H.dot(V),quantum_LinearOperator(static,**kwargs).H.dot(V),atol=atol)
+
+
+L = 8
+t = np.array([(i+1)%L for i in range(L)])
+p = np.array([L-i-1 for i in range(L)])
+z = np.array([-(i+1) for i in range(L)])
+
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[0.37,i] for i in range(L)]
+static = [["+-",J],["-+",J],["zz",J],["x",h]]
+
+for dtype in [np.float32,np.float64,np.complex64,np.complex128]:
+	check_LinearOperator(spin_basis_general(L),static,dtype)
+	check_LinearOperator(spin_basis_general(L,pblock=(p,0),zblock=(z,0)),static,dtype)
+	if np.iscomplexobj(dtype(1)):
+		for k in range(L):
+			check_LinearOperator(spin_basis_general(L,kblock=(t,k)),static,dtype)
+
+print("general basis quantum_LinearOperator tests passed!")
@@ -0,0 +1,37 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.basis import spin_basis_general,boson_basis_general
+import numpy as np
+
+
+L = 12
+t = np.array([(i+1)%L for i in range(L)])
+p = np.array([L-i-1 for i in range(L)])
+z = np.array([-(i+1) for i in range(L)])
+
+for Nup in [None,L//2,L//2-1]:
+	for k in range(L):
+		blocks = dict(kblock=(t,k))
+		if k in [0,L//2]:
+			blocks["pblock"] = (p,0)
+		if Nup == L//2:
+			blocks["zblock"] = (z,0)
+
+		basis = spin_basis_general(L,Nup=Nup,**blocks)
+		basis_est = spin_basis_general(L,Nup=Nup,Ns_block_est=2**L,**blocks)
+
+		assert(basis.Ns == spin_basis_general.count_states(L,Nup=Nup,**blocks))
+		assert(basis._basis.shape[0] == basis.Ns)
+		assert(np.all(np.diff(basis._basis.astype(np.int64)) < 0))
+		np.testing.assert_array_equal(basis._basis,basis_est._basis)
+		np.testing.assert_array_equal(basis._n,basis_est._n)
+
+for Nb in [None,3]:
+	basis = boson_basis_general(L//2,Nb=Nb,sps=3,kblock=(t[:L//2]%(L//2),0))
+	assert(basis.Ns == boson_basis_general.count_states(L//2,Nb=Nb,sps=3,kblock=(t[:L//2]%(L//2),0)))
+
+print("general basis count_states tests passed!")
@@ -0,0 +1,39 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.basis import spin_basis_general,boson_basis_general
+import numpy as np
+
+
+def check_index(basis):
+	for i,s in enumerate(basis._basis):
+		assert(basis.index(int(s)) == i)
+
+	for s in set(range(basis.sps**basis.N)) - set(basis._basis.tolist()):
+		try:
+			basis.index(s)
+		except ValueError:
+			pass
+		else:
+			raise AssertionError("index() found state {} which is not in the basis.".format(s))
+
+
+L = 10
+t = np.array([(i+1)%L for i in range(L)])
+p = np.array([L-i-1 for i in range(L)])
+z = np.array([-(i+1) for i in range(L)])
+
+check_index(spin_basis_general(L))
+check_index(spin_basis_general(L,Nup=L//2))
+check_index(spin_basis_general(L,Nup=[L//2-1,L//2+1]))
+for k in range(L):
+	check_index(spin_basis_general(L,kblock=(t,k)))
+	check_index(spin_basis_general(L,Nup=L//2,kblock=(t,k),zblock=(z,0)))
+
+check_index(spin_basis_general(L,Nup=L//2,kblock=(t,0),pblock=(p,0)))
+check_index(boson_basis_general(L//2,Nb=3,sps=4,kblock=(t[:L//2]%(L//2),0)))
+
+print("general basis index tests passed!")
@@ -0,0 +1,72 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.basis import spin_basis_general
+from quspin.operators import hamiltonian
+import numpy as np
+
+
+"""
+This test makes sure the general basis works for N > 64 sites, where the states are stored as 128-/256-bit
+integers: hard-core bosons with nearest neighbour hopping are compared to free fermions.
+"""
+
+no_checks = dict(check_herm=False,check_symm=False,check_pcon=False)
+
+def hopping(N,pbc):
+	J = [[-1.0,i,(i+1)%N] for i in range(N if pbc else N-1)]
+	return [["+-",J],["-+",J]]
+
+def free_fermions(N,Np,pbc):
+	# many-body energies of Np free fermions, for even Np the ring has anti-periodic boundary conditions.
+	if pbc:
+		e = -2*np.cos(2*np.pi*(np.arange(N)+0.5*(1-Np%2))/N)
+	else:
+		e = -2*np.cos(np.pi*np.arange(1,N+1)/(N+1))
+
+	e_1,e_2 = np.triu_indices(N,1)
+	return np.sort(e[e_1]+e[e_2])
+
+# open chains, 128- and 256-bit states.
+for N in [100,200]:
+	basis = spin_basis_general(N,Nup=2,pauli=False)
+	assert(basis._basis.shape == (basis.Ns,2 if N<=128 else 4))
+	assert(basis.Ns == N*(N-1)//2)
+
+	# states are stored in descending order.
+	assert(basis.index("11"+"0"*(N-2)) == 0)
+	assert(basis.index("0"*(N-2)+"11") == basis.Ns-1)
+	assert(basis.index((1<<(N-1))|(1<<5)) == basis.index("1"+"0"*(N-7)+"1"+"0"*5))
+
+	H = hamiltonian(hopping(N,False),[],basis=basis,dtype=np.float64,**no_checks)
+	E = H.eigsh(k=4,which="SA",return_eigenvectors=False)
+	np.testing.assert_allclose(np.sort(E),free_fermions(N,2,False)[:4],atol=1e-10)
+
+	O = hamiltonian([["+-",[[1.0,0,N-1]]]],[],basis=basis,dtype=np.float64,**no_checks)
+	v = np.random.uniform(-1,1,size=(basis.Ns,))
+	np.testing.assert_allclose(basis.inplace_Op(v,"+-",[0,N-1],1.0,np.float64),O.dot(v),atol=1e-13)
+
+# ring with translation symmetry.
+N = 70
+t = np.array([(i+1)%N for i in range(N)])
+E = []
+for k in range(N):
+	basis = spin_basis_general(N,Nup=2,pauli=False,kblock=(t,k))
+	H = hamiltonian(hopping(N,True),[],basis=basis,dtype=np.complex128,**no_checks)
+	E.extend(np.linalg.eigvalsh(H.toarray()))
+
+np.testing.assert_allclose(np.sort(E),free_fermions(N,2,True),atol=1e-10)
+
+# the full H-space does not exist for N > 64.
+for f in [lambda:spin_basis_general(N),lambda:spin_basis_general(N,Nup=2).get_vec(np.ones(N*(N-1)//2))]:
+	try:
+		f()
+	except ValueError:
+		pass
+	else:
+		raise AssertionError("N > 64 accepted for the full H-space.")
+
+print("multi-word general basis tests passed!")
@@ -0,0 +1,67 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.basis import spin_basis_general
+from quspin.basis.lattice import lattice_basis
+import numpy as np
+
+
+"""
+This test makes sure the partial trace of pure states in the symmetry-reduced general basis agrees with
+the partial trace of the full H-space representation of the states.
+"""
+
+np.random.seed(0)
+
+L = 8
+t = np.array([(i+1)%L for i in range(L)])
+p = np.array([L-i-1 for i in range(L)])
+z = np.array([-(i+1) for i in range(L)])
+
+blocks_list = [
+	dict(Nup=L//2),
+	dict(kblock=(t,1)),
+	dict(kblock=(t,0),pblock=(p,1)),
+	dict(Nup=L//2,kblock=(t,L//2),pblock=(p,1),zblock=(z,0)),
+	dict(Nup=L//2-1,kblock=(t,3)),
+	dict(pblock=(p,0),zblock=(z,0)),
+]
+
+sub_sys_A_list = [[0,1,2],[1,4],[0,2,3,5,6]]
+
+def check(a,b):
+	np.testing.assert_allclose(np.squeeze(a),np.squeeze(b),atol=1e-13)
+
+for blocks in blocks_list:
+	basis = spin_basis_general(L,pauli=False,**blocks)
+	assert(basis.Ns > 0)
+
+	for shape in [(basis.Ns,),(basis.Ns,3)]:
+		psi = np.random.normal(size=shape) + 1j*np.random.normal(size=shape)
+		psi /= np.linalg.norm(psi,axis=0)
+
+		for sub_sys_A in sub_sys_A_list:
+			for return_rdm in ["A","B","both"]:
+				rdm = basis._partial_trace_pure(psi,sub_sys_A,return_rdm=return_rdm)
+				rdm_full = lattice_basis._partial_trace_pure(basis,psi,sub_sys_A,return_rdm=return_rdm)
+				for r,r_full in zip(rdm,rdm_full):
+					assert((r is None) == (r_full is None))
+					if r is not None:
+						check(r,r_full)
+
+				p_sparse,rdm_A,rdm_B = basis._p_pure(psi,sub_sys_A,return_rdm=return_rdm)
+				p_full,rdm_A_full,rdm_B_full = lattice_basis._p_pure(basis,psi,sub_sys_A,return_rdm=return_rdm)
+				check(p_sparse,p_full)
+				for r,r_full in [(rdm_A,rdm_A_full),(rdm_B,rdm_B_full)]:
+					assert((r is None) == (r_full is None))
+					if r is not None:
+						check(r,r_full)
+
+		p_full = lattice_basis._p_pure(basis,psi,[0,1,2])[0]
+		Sent = basis.ent_entropy(psi,sub_sys_A=[0,1,2],density=False)["Sent_A"]
+		check(Sent,-np.sum(p_full*np.log(p_full),axis=-1))
+
+print("general basis partial trace tests passed!")
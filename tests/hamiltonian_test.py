@@ -7,6 +7,7 @@ import numpy as np
 import scipy.sparse as sp
 from scipy.integrate import complex_ode
 from quspin.operators import hamiltonian
+from quspin.operators.hamiltonian_core import _csr_evolve_rhs
 try:
     from itertools import izip as zip
 except ImportError:
@@ -120,6 +121,203 @@ def test_evolve():
  
 
 
+def test_dot_time_array():
+    Ns = 10
+    M = np.random.ranf(size=(Ns,Ns))
+    M = M + M.T
+    D = sp.random(Ns,Ns,density=0.4,format="csr")
+    D = D + D.T
+
+    def f(t,w):
+        return np.cos(w*t)
+
+    H = hamiltonian([M],[[D,f,(0.7,)]],dtype=np.float64)
+    times = np.linspace(0,3,5)
+
+    V = np.random.ranf(size=(Ns,len(times)))
+    V_dot = H.dot(V,time=times)
+    for i,t in enumerate(times):
+        np.testing.assert_allclose(V_dot[:,i],H.dot(V[:,i],time=t),atol=1e-12)
+
+    rho = np.random.ranf(size=(Ns,Ns,len(times)))
+    rho_dot = H.dot(rho,time=times)
+    for i,t in enumerate(times):
+        np.testing.assert_allclose(rho_dot[...,i],H.dot(rho[...,i],time=t),atol=1e-12)
+
+    np.testing.assert_allclose(H.expt_value(V,time=times),
+        [H.expt_value(V[:,i],time=t) for i,t in enumerate(times)],atol=1e-12)
+
+
+def test_evolve_sparse():
+    Ns = 20
+    M = np.random.uniform(-1,1,size=(Ns,Ns))
+    M = (M.T + M)/2.0
+    D = sp.random(Ns,Ns,density=0.3,format="csr")
+    D = D + D.T
+
+    def f(t,w):
+        return np.cos(w*t)
+
+    times = np.linspace(0.5,5,4)
+    psi0 = np.random.uniform(-1,1,size=(Ns,))+1j*np.random.uniform(-1,1,size=(Ns,))
+    psi0 /= np.linalg.norm(psi0)
+    Psi0 = np.stack([psi0,psi0.conj()],axis=1)
+    rho0 = np.outer(psi0,psi0.conj())
+    psi0_real = psi0.real/np.linalg.norm(psi0.real)
+    kwargs = dict(atol=1e-12,rtol=1e-12)
+
+    for dtype in [np.float64,np.complex128]:
+        # the csr matrices use the preallocated right-hand side, the dense ones the generic one.
+        H_sparse = hamiltonian([sp.csr_matrix(M)],[[D,f,(0.7,)]],dtype=dtype).as_sparse_format("csr")
+        H_dense = H_sparse.as_dense_format()
+
+        cases = [(psi0,{}),(Psi0,{}),(psi0_real.astype(dtype),dict(imag_time=True))]
+        if dtype is np.float64:
+            cases.append((psi0,dict(stack_state=True)))
+
+        for v0,case_kwargs in cases:
+            case_kwargs.update(kwargs)
+            np.testing.assert_allclose(H_sparse.evolve(v0,0,times,**case_kwargs),
+                                        H_dense.evolve(v0,0,times,**case_kwargs),atol=1e-10)
+
+        np.testing.assert_allclose(H_sparse.evolve(rho0,0,times,eom="LvNE",**kwargs),
+                                    H_dense.evolve(rho0,0,times,eom="LvNE",**kwargs),atol=1e-10)
+
+def test_evolve_krylov():
+    Ns = 30
+    M = np.random.uniform(-1,1,size=(Ns,Ns))+1j*np.random.uniform(-1,1,size=(Ns,Ns))
+    M = (M.T.conj() + M)/2.0
+    D = sp.random(Ns,Ns,density=0.3,format="csr")
+    D = D + D.T
+
+    def f(t,w):
+        return np.cos(w*t)
+
+    times = np.linspace(0,5,6)
+    psi0 = np.random.uniform(-1,1,size=(Ns,))+1j*np.random.uniform(-1,1,size=(Ns,))
+    psi0 /= np.linalg.norm(psi0)
+    Psi0 = np.stack([psi0,psi0.conj()],axis=1)
+    psi0_real = psi0.real/np.linalg.norm(psi0.real)
+
+    for dynamic,tol in [([],1e-12),([[D,f,(0.7,)]],1e-9)]:
+        H = hamiltonian([M],dynamic,dtype=np.complex128)
+        kwargs = dict(atol=1e-12,rtol=1e-12)
+
+        psi_t = H.evolve(psi0,0,times,solver_name="krylov",tol=tol)
+        np.testing.assert_allclose(psi_t,H.evolve(psi0,0,times,**kwargs),atol=100*tol)
+        np.testing.assert_allclose(np.linalg.norm(psi_t,axis=0),1,atol=1e-10)
+
+        Psi_t = H.evolve(Psi0,0,times,solver_name="krylov",tol=tol)
+        np.testing.assert_allclose(Psi_t,H.evolve(Psi0,0,times,**kwargs),atol=100*tol)
+
+        psi_t = H.evolve(psi0_real,0,times,imag_time=True,solver_name="krylov",tol=tol)
+        np.testing.assert_allclose(psi_t,H.evolve(psi0_real,0,times,imag_time=True,**kwargs),atol=100*tol)
+
+def test_fused():
+    Ns = 30
+    M = sp.random(Ns,Ns,density=0.3,format="csr")
+    M = M + M.T
+    D_list = [sp.random(Ns,Ns,density=0.2,format="csr") for i in range(3)]
+    D_list = [D + D.T for D in D_list]
+
+    def f(t,w):
+        return np.cos(w*t)
+
+    times = np.linspace(0,3,4)
+    psi0 = np.random.uniform(-1,1,size=(Ns,))+1j*np.random.uniform(-1,1,size=(Ns,))
+    psi0 /= np.linalg.norm(psi0)
+    V = np.random.uniform(-1,1,size=(Ns,3))
+    rho0 = np.outer(psi0,psi0.conj())
+    kwargs = dict(atol=1e-12,rtol=1e-12)
+
+    for dtype in [np.float32,np.float64,np.complex64,np.complex128]:
+        atol = (1e-5 if dtype in [np.float32,np.complex64] else 1e-12)
+        dynamic = [[D,f,(0.5+i,)] for i,D in enumerate(D_list)]
+        H = hamiltonian([M],dynamic,dtype=dtype)
+        H_fused = hamiltonian([M],dynamic,dtype=dtype)
+        H_fused.set_fused(True)
+
+        for v in [psi0,V,V.astype(dtype)]:
+            np.testing.assert_allclose(H_fused.dot(v,time=0.3),H.dot(v,time=0.3),atol=atol)
+            np.testing.assert_allclose(H_fused.expt_value(v,time=0.3),H.expt_value(v,time=0.3),atol=atol)
+
+        if dtype in [np.float64,np.complex128]:
+            np.testing.assert_allclose(H_fused.evolve(psi0,0,times,**kwargs),H.evolve(psi0,0,times,**kwargs),atol=1e-10)
+            np.testing.assert_allclose(H_fused.evolve(rho0,0,times,eom="LvNE",**kwargs),
+                                        H.evolve(rho0,0,times,eom="LvNE",**kwargs),atol=1e-10)
+
+        # in-place operations update the fused storage.
+        H_fused *= 2
+        np.testing.assert_allclose(H_fused.dot(V,time=0.3),2*H.dot(V,time=0.3),atol=10*atol)
+
+    # the parts of the hamiltonian are not modified by the fused storage.
+    H = hamiltonian([M],[[D_list[0],f,(0.5,)]],dtype=np.float64)
+    static = H.static.copy()
+    H.set_fused(True)
+    np.testing.assert_allclose(H.dot(V,time=0.3),static.dot(V)+f(0.3,0.5)*D_list[0].dot(V),atol=1e-12)
+    np.testing.assert_allclose(H.static.toarray(),static.toarray())
+
+    # the data type of the drives is checked at every time, not only at t=0.
+    def g(t):
+        return 1.0 if t == 0 else np.exp(1j*t)
+
+    H = hamiltonian([M],[[D_list[0],g,()]],dtype=np.float64)
+    H.set_fused(True)
+    rhs = _csr_evolve_rhs(H,(Ns,),np.float64,a=-1.0)
+    v = np.ascontiguousarray(psi0.real)
+    rhs.SO(0.0,v)
+    try:
+        rhs.SO(0.5,v)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("complex drive with real state did not fail.")
+
+
+def drive(t,w):
+    return np.cos(w*t)
+
+
+def test_save_load():
+    import tempfile,shutil
+    Ns = 30
+    M = sp.random(Ns,Ns,density=0.3,format="csr")
+    M = M + M.T
+    D = sp.random(Ns,Ns,density=0.2,format="csr")
+    D = D + D.T
+
+    v = np.random.uniform(-1,1,size=(Ns,3))
+    path = tempfile.mkdtemp()
+    try:
+        for dtype in [np.float64,np.complex128]:
+            for static in [M,M.toarray()]:
+                H = hamiltonian([static],[[D,drive,(0.5,)],[D.T,np.sin,()]],dtype=dtype)
+                H.save(path)
+
+                for mmap in [True,False]:
+                    H_load = hamiltonian.load(path,mmap=mmap)
+                    assert(H_load.dtype == H.dtype)
+                    assert(H_load.is_dense == H.is_dense)
+                    for t in [0.0,0.4]:
+                        np.testing.assert_allclose(H_load.dot(v,time=t),H.dot(v,time=t),atol=1e-13)
+
+                    # memory mapped operators can still be modified (copy-on-write).
+                    H_load += H_load
+                    np.testing.assert_allclose(H_load.dot(v,time=0.4),2*H.dot(v,time=0.4),atol=1e-13)
+
+        def f(t):
+            return t
+
+        try:
+            hamiltonian([M],[[D,f,()]]).save(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("saving a local drive function did not fail.")
+    finally:
+        shutil.rmtree(path)
+
+
 test_shape()
 test_trace()
 test_hermitian_conj()
@@ -127,4 +325,9 @@ test_transpose()
 test_conj()
 test_mul_sparse()
 test_mul_dense()
-test_evolve()
\ No newline at end of file
+test_evolve()
+test_dot_time_array()
+test_evolve_sparse()
+test_evolve_krylov()
+test_fused()
+test_save_load()
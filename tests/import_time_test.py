@@ -0,0 +1,68 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+import subprocess
+
+
+"""
+This test makes sure `import quspin` stays cheap: the subpackages, the compiled cores and the heavy
+dependencies are only loaded when they are used.
+"""
+
+# budget for `import quspin` in a fresh interpreter (in seconds).
+import_budget = 0.25
+
+script = """
+import sys,time
+sys.path.insert(0,{0!r})
+t0 = time.time()
+import quspin
+dt = time.time()-t0
+print(dt)
+print(" ".join(sorted(sys.modules.keys())))
+{1}
+print(" ".join(sorted(sys.modules.keys())))
+"""
+
+def run(stmt=""):
+	out = subprocess.check_output([sys.executable,"-c",script.format(quspin_path,stmt)])
+	dt,modules,modules_after = out.decode().strip().split("\n")
+	return float(dt),set(modules.split()),set(modules_after.split())
+
+heavy = ["joblib","dill","multiprocessing.pool","quspin.basis","quspin.operators","quspin.tools",
+		 "quspin.basis.basis_1d","quspin.basis.basis_general","quspin.tools.Floquet","quspin.tools.block_tools"]
+
+dt,modules,_ = run()
+for name in heavy:
+	assert(name not in modules),"'import quspin' imports {}".format(name)
+
+assert(dt < import_budget),"'import quspin' took {0:.3f}s, budget is {1:.3f}s".format(dt,import_budget)
+
+# the compiled cores are only loaded on construction of a basis, and only the core of the basis family used.
+_,_,modules = run("from quspin.basis import spin_basis_1d")
+assert("quspin.basis.basis_1d._basis_1d_core.hcp_basis" not in modules)
+assert("quspin.basis.basis_general" not in modules)
+assert("quspin.tools.Floquet" not in modules)
+
+_,_,modules = run("from quspin.basis import spin_basis_1d; spin_basis_1d(4)")
+assert("quspin.basis.basis_1d._basis_1d_core.hcp_basis" in modules)
+assert("quspin.basis.basis_1d._basis_1d_core.boson_basis" not in modules)
+assert("quspin.basis.basis_1d._basis_1d_core.spf_basis" not in modules)
+
+_,_,modules = run("from quspin.basis import spin_basis_general; spin_basis_general(4)")
+assert("quspin.basis.basis_general._basis_general_core.hcb_core" in modules)
+assert("quspin.basis.basis_general._basis_general_core.boson_core" not in modules)
+assert("quspin.basis.basis_general._basis_general_core.higher_spin_core" not in modules)
+
+_,_,modules = run("from quspin.operators import hamiltonian")
+assert("quspin.basis.basis_1d" not in modules)
+assert("joblib" not in modules)
+
+_,_,modules = run("from quspin.tools.Floquet import Floquet")
+assert("joblib" in modules)
+assert("quspin.tools.block_tools" not in modules)
+
+print("import time checks passed!")
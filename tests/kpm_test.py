@@ -0,0 +1,68 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+from quspin.operators import hamiltonian
+from quspin.basis import spin_basis_1d
+from quspin.tools.kpm import kpm_bounds,kpm_moments,kpm_dos
+import numpy as np
+import tempfile
+
+
+L = 10
+
+basis = spin_basis_1d(L,pauli=False)
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[(-1)**i*0.4,i] for i in range(L)]
+
+static = [["xx",J],["yy",J],["zz",J],["z",h]]
+no_checks = dict(check_symm=False,check_herm=False,check_pcon=False)
+
+n_moments = 65
+
+np.random.seed(0)
+
+for dtype in [np.float64,np.complex128]:
+	H = hamiltonian(static,[],basis=basis,dtype=dtype,**no_checks)
+	E,V = H.eigh()
+
+	bounds = kpm_bounds(H)
+	assert(bounds[0] < E[0] and bounds[1] > E[-1])
+
+	a = (bounds[1]-bounds[0])/2.0
+	b = (bounds[1]+bounds[0])/2.0
+	T_n = np.cos(np.outer(np.arange(n_moments),np.arccos((E-b)/a)))
+
+	# moments of the full basis are exact.
+	mu = kpm_moments(H,n_moments,bounds,v0=np.eye(basis.Ns),block_size=64)
+	np.testing.assert_allclose(mu.mean(axis=1),T_n.mean(axis=1),atol=1E-12)
+
+	# local moments of a single state.
+	psi = np.random.uniform(-1,1,size=basis.Ns)
+	psi /= np.linalg.norm(psi)
+	mu_psi = kpm_moments(H,n_moments,bounds,v0=psi)
+	np.testing.assert_allclose(mu_psi,T_n.dot(np.abs(V.T.conj().dot(psi))**2),atol=1E-12)
+
+	# stochastic trace does not depend on blocking or threads.
+	mu_1 = kpm_moments(H,n_moments,bounds,n_vectors=12,seed=1)
+	mu_2 = kpm_moments(H,n_moments,bounds,n_vectors=12,seed=1,block_size=5,n_jobs=3)
+	np.testing.assert_allclose(mu_1,mu_2,atol=1E-13)
+	np.testing.assert_allclose(mu_1,T_n.mean(axis=1),atol=0.05)
+
+	# resuming from a checkpoint with more random vectors.
+	checkpoint = os.path.join(tempfile.mkdtemp(),"kpm.npz")
+	kpm_moments(H,n_moments,bounds,n_vectors=6,seed=1,checkpoint=checkpoint)
+	mu_3 = kpm_moments(H,n_moments,bounds,n_vectors=12,checkpoint=checkpoint)
+	np.testing.assert_allclose(mu_3,mu_1,atol=1E-13)
+	os.remove(checkpoint)
+
+	# the density of states is normalised.
+	E_grid = np.linspace(bounds[0],bounds[1],4001)
+	for kernel in ["jackson","lorentz"]:
+		rho = kpm_dos(mu_1,bounds,E_grid,kernel=kernel)
+		np.testing.assert_allclose(rho.sum()*(E_grid[1]-E_grid[0]),1.0,atol=1E-2)
+
+
+print("kpm tests passed!")
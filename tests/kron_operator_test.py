@@ -0,0 +1,99 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+from quspin.basis import spin_basis_1d,boson_basis_1d,tensor_basis,photon_basis
+from quspin.operators import hamiltonian,quantum_operator
+import numpy as np
+import tempfile,shutil
+
+
+"""
+This test makes sure operators stored in factored (kronecker product) form, `kron=True`, agree with the
+operators built from the full matrix.
+"""
+
+np.random.seed(0)
+
+L = 4
+Nph = 12
+
+def drive(t,Omega):
+	return np.cos(Omega*t)
+
+no_checks = dict(check_herm=False,check_symm=False,check_pcon=False)
+
+# Jaynes-Cummings type coupling of a spin chain to a single photon mode.
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+g = [[0.5/np.sqrt(L),i] for i in range(L)]
+h = [[0.3,i] for i in range(L)]
+w = [[1.0]]
+
+bases = [photon_basis(spin_basis_1d,L,Nph=Nph),
+		 tensor_basis(spin_basis_1d(L),boson_basis_1d(1,sps=Nph+1))]
+
+for basis in bases:
+	if isinstance(basis,photon_basis):
+		static = [["zz|",J],["+|-",g],["-|+",g],["|n",w]]
+		dynamic = [["x|",h,drive,[2.0]]]
+	else:
+		w_b = [[1.0,0]]
+		g_b = [[g_i,i,0] for g_i,i in g]
+		static = [["zz|",J],["+|-",g_b],["-|+",g_b],["|n",w_b]]
+		dynamic = [["x|",h,drive,[2.0]]]
+
+	for dtype in [np.float64,np.complex128]:
+		H = hamiltonian(static,dynamic,basis=basis,dtype=dtype,**no_checks)
+		H_kron = hamiltonian(static,dynamic,basis=basis,dtype=dtype,kron=True,**no_checks)
+
+		assert(H_kron.nbytes < H.nbytes)
+
+		v = np.random.uniform(-1,1,size=(basis.Ns,)) + 1j*np.random.uniform(-1,1,size=(basis.Ns,))
+		v /= np.linalg.norm(v)
+		V = np.random.uniform(-1,1,size=(basis.Ns,3))
+
+		for t in [0.0,0.7]:
+			np.testing.assert_allclose(H_kron.dot(v,time=t),H.dot(v,time=t),atol=1e-13)
+			np.testing.assert_allclose(H_kron.dot(V,time=t),H.dot(V,time=t),atol=1e-13)
+			np.testing.assert_allclose(H_kron.tocsr(t).toarray(),H.tocsr(t).toarray(),atol=1e-13)
+
+		times = np.linspace(0,2,5)
+		np.testing.assert_allclose(H_kron.dot(V,time=times[:3]),H.dot(V,time=times[:3]),atol=1e-13)
+		np.testing.assert_allclose(H_kron.evolve(v,0.0,times),H.evolve(v,0.0,times),atol=1e-10)
+
+		E = H.eigsh(time=0.0,k=4,which="SA",return_eigenvectors=False)
+		E_kron = H_kron.eigsh(time=0.0,k=4,which="SA",return_eigenvectors=False)
+		np.testing.assert_allclose(np.sort(E_kron),np.sort(E),atol=1e-10)
+
+		# the factored form is kept when saving, the loaded operator is stored in csr format.
+		path = tempfile.mkdtemp()
+		try:
+			H_kron.save(path)
+			assert(H_kron._kron is not None)
+			H_load = hamiltonian.load(path)
+			np.testing.assert_allclose(H_load.dot(V,time=0.3),H.dot(V,time=0.3),atol=1e-13)
+		finally:
+			shutil.rmtree(path)
+
+		# the factored form is kept by the methods above, other methods convert to csr format.
+		assert(H_kron._kron is not None)
+		np.testing.assert_allclose(H_kron.diagonal(time=0.3),H.diagonal(time=0.3),atol=1e-13)
+		assert(H_kron._kron is None)
+
+	O = quantum_operator(dict(J=static[:1],g=static[1:3],w=static[3:]),basis=basis,dtype=np.float64,**no_checks)
+	O_kron = quantum_operator(dict(J=static[:1],g=static[1:3],w=static[3:]),basis=basis,dtype=np.float64,kron=True,**no_checks)
+	pars = dict(J=0.8,g=1.3,w=-0.2)
+	np.testing.assert_allclose(O_kron.dot(v,pars=pars),O.dot(v,pars=pars),atol=1e-13)
+	np.testing.assert_allclose(O_kron.tohamiltonian(pars).dot(v),O.tohamiltonian(pars).dot(v),atol=1e-13)
+
+# total particle number conservation does not factorise.
+try:
+	hamiltonian([["+|-",g]],[],basis=photon_basis(spin_basis_1d,L,Ntot=L),kron=True,**no_checks)
+except ValueError:
+	pass
+else:
+	raise AssertionError("kron=True accepted a photon_basis with Ntot.")
+
+print("kron operator checks passed!")
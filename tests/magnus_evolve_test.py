@@ -0,0 +1,61 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+from quspin.operators import hamiltonian
+from quspin.basis import spin_basis_1d
+from quspin.tools.evolution import magnus_evolve
+import numpy as np
+
+
+L = 8
+T = 1.0 # driving period
+
+def drive(t,A,Omega):
+	return A*np.cos(Omega*t)
+
+basis = spin_basis_1d(L)
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[1.0,i] for i in range(L)]
+hz = [[(-1)**i*0.3,i] for i in range(L)]
+
+static = [["xx",J],["yy",J],["zz",J],["z",hz]]
+dynamic = [["x",h,drive,(1.5,2*np.pi/T)]]
+
+no_checks = dict(check_symm=False,check_herm=False,check_pcon=False)
+
+np.random.seed(0)
+psi_0 = np.random.uniform(-1,1,size=(basis.Ns,))+1j*np.random.uniform(-1,1,size=(basis.Ns,))
+psi_0 /= np.linalg.norm(psi_0)
+Psi_0 = np.stack([psi_0,psi_0.conj()],axis=1)
+
+times = np.linspace(0,3*T,4)
+
+for dtype in [np.float64,np.complex128]:
+	H = hamiltonian(static,dynamic,basis=basis,dtype=dtype,**no_checks)
+	psi_t = H.evolve(psi_0,0,times,atol=1E-13,rtol=1E-13)
+
+	for order,dt in [(4,T/100),(6,T/20)]:
+		psi_t_CFM = magnus_evolve(H,psi_0,0,times,dt,order=order)
+		np.testing.assert_allclose(psi_t_CFM,psi_t,atol=1E-7)
+		np.testing.assert_allclose(np.linalg.norm(psi_t_CFM,axis=0),1,atol=1E-12)
+
+		# halving the time step reduces the error by 2**order.
+		err_1 = np.linalg.norm(magnus_evolve(H,psi_0,0,times[-1],4*dt,order=order)-psi_t[:,-1])
+		err_2 = np.linalg.norm(magnus_evolve(H,psi_0,0,times[-1],2*dt,order=order)-psi_t[:,-1])
+		assert(np.log2(err_1/err_2) > order-0.5)
+
+		Psi_t_CFM = magnus_evolve(H,Psi_0,0,times,dt,order=order)
+		np.testing.assert_allclose(Psi_t_CFM,H.evolve(Psi_0,0,times,atol=1E-13,rtol=1E-13),atol=1E-7)
+
+		for i,psi in enumerate(magnus_evolve(H,psi_0,0,times,dt,order=order,iterate=True)):
+			np.testing.assert_allclose(psi,psi_t_CFM[:,i],atol=1E-14)
+
+	psi_0_real = psi_0.real/np.linalg.norm(psi_0.real)
+	np.testing.assert_allclose(magnus_evolve(H,psi_0_real,0,times,T/20,order=6,imag_time=True),
+		H.evolve(psi_0_real,0,times,imag_time=True,atol=1E-13,rtol=1E-13),atol=1E-7)
+
+
+print("magnus_evolve tests passed!")
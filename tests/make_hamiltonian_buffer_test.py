@@ -0,0 +1,72 @@
+from __future__ import print_function, division
+
+import sys,os
+qspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,qspin_path)
+
+from quspin.operators import hamiltonian
+from quspin.operators import _make_hamiltonian
+from quspin.basis import spin_basis_1d,boson_basis_1d
+import numpy as np
+import scipy.sparse as sp
+
+
+"""
+This test makes sure the operators assembled in coordinate format buffers agree with the sum of the csr matrices
+of the individual terms, also when the buffers are flushed several times during the construction.
+"""
+
+def unbuffered(basis,static,dtype):
+	H = sp.csr_matrix((basis.Ns,basis.Ns),dtype=dtype)
+	for opstr,bonds in static:
+		for bond in bonds:
+			ME,row,col = basis.Op(opstr,bond[1:],bond[0],dtype)
+			H = H + sp.csr_matrix((ME,(row,col)),shape=(basis.Ns,basis.Ns),dtype=dtype)
+
+	return H
+
+def check(basis,static,dtype):
+	kwargs = dict(basis=basis,dtype=dtype,check_herm=False,check_symm=False,check_pcon=False)
+	H_ref = unbuffered(basis,static,dtype)
+	H = hamiltonian(static,[],**kwargs).tocsr()
+	np.testing.assert_allclose(H.toarray(),H_ref.toarray(),atol=1e-13)
+	assert(np.all(H.data != 0))
+
+L = 10
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[0.37,i] for i in range(L)]
+spin_static = [["+-",J],["-+",J],["zz",J],["x",h]]
+L_b = L//2
+J_b = [[1.0,i,(i+1)%L_b] for i in range(L_b)]
+boson_static = [["+-",J_b],["-+",J_b],["nn",J_b],["n",h[:L_b]]]
+
+cases = [
+	(spin_basis_1d(L,kblock=1),spin_static,np.complex128),
+	(spin_basis_1d(L,kblock=0,pblock=-1,zblock=1),spin_static,np.float64),
+	(spin_basis_1d(L,Nup=L//2,pblock=1),spin_static[:3],np.float64),
+	(boson_basis_1d(L_b,Nb=L_b,sps=3,kblock=1),boson_static,np.complex128),
+]
+
+MAX_BUFFER_SIZE = _make_hamiltonian._MAX_BUFFER_SIZE
+nnz_bound = _make_hamiltonian._nnz_bound
+try:
+	for basis,static,dtype in cases:
+		assert(basis.Ns > 0)
+		# a single buffer for all terms.
+		check(basis,static,dtype)
+
+		# the buffer only holds the matrix elements of a single term, it is flushed several times.
+		_make_hamiltonian._MAX_BUFFER_SIZE = 1
+		check(basis,static,dtype)
+
+		# the bound on the number of matrix elements is exceeded, the buffer is reallocated.
+		_make_hamiltonian._nnz_bound = lambda basis:1
+		check(basis,static,dtype)
+
+		_make_hamiltonian._MAX_BUFFER_SIZE = MAX_BUFFER_SIZE
+		_make_hamiltonian._nnz_bound = nnz_bound
+finally:
+	_make_hamiltonian._MAX_BUFFER_SIZE = MAX_BUFFER_SIZE
+	_make_hamiltonian._nnz_bound = nnz_bound
+
+print("buffered operator assembly tests passed!")
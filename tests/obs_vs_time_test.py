@@ -99,6 +99,17 @@ for _i in dtypes.keys():
 	np.testing.assert_allclose(psi_t,psi_t2,atol=atol,rtol=rtol,err_msg='pure: Failed state comparison!')
 	np.testing.assert_allclose(Sent,Sent2,atol=atol,err_msg='pure: Failed ent entropy comparison!')
 
+	# generated states are processed in blocks of chunk_size states.
+	for chunk_size in [1,7,32]:
+		psi_t=H.evolve(psi0,0.0,t,iterate=True,eom="SE",rtol=solver_rtol,atol=solver_atol)
+		Obs3 = obs_vs_time(psi_t,t,Obs_list,Sent_args=Sent_args,chunk_size=chunk_size)
+
+		Expn3 = np.array([Obs3['Ozz_t'],Obs3['Ozz']])
+		Sent3 = Obs3['Sent_time']['Sent_A']
+
+		np.testing.assert_allclose(Expn3,Expn2,atol=atol,rtol=rtol,err_msg='pure chunks: Failed observable comparison!')
+		np.testing.assert_allclose(Sent3,Sent2,atol=atol,err_msg='pure chunks: Failed ent entropy comparison!')
+
 
 	rho_t=H.evolve(rho0,0.0,t,iterate=True,eom="LvNE",rtol=solver_rtol,atol=solver_atol)
 	rho_t2=H.evolve(rho0,0.0,t,eom="LvNE",rtol=solver_rtol,atol=solver_atol)
@@ -0,0 +1,60 @@
+from __future__ import print_function, division
+
+import sys,os
+quspin_path = os.path.join(os.getcwd(),"../")
+sys.path.insert(0,quspin_path)
+
+from quspin.operators import hamiltonian
+from quspin.basis import spin_basis_1d,spin_basis_general
+import numpy as np
+import warnings
+
+
+"""
+This test makes sure the symmetry, hermiticity and particle conservation checks pass/fail
+correctly and never wait for user input.
+"""
+
+L = 6
+T = (np.arange(L)+1)%L
+P = np.arange(L)[::-1]
+
+J = [[1.0,i,(i+1)%L] for i in range(L)]
+h = [[1.0,i] for i in range(L)]
+
+bases = [spin_basis_1d(L,Nup=L//2,kblock=0,pblock=1),
+		 spin_basis_general(L,Nup=L//2,kblock=(T,0),pblock=(P,0))]
+
+def drive(t,Omega):
+	return np.cos(Omega*t)
+
+def expect_fail(static,dynamic,basis,**checks):
+	no_checks = dict(check_symm=False,check_herm=False,check_pcon=False)
+	no_checks.update(checks)
+	try:
+		with warnings.catch_warnings():
+			warnings.simplefilter("ignore")
+			hamiltonian(static,dynamic,basis=basis,dtype=np.float64,**no_checks)
+	except TypeError as e:
+		assert("(opstr, indices, coupling" in str(e))
+	else:
+		raise AssertionError("check did not fail for static={0}, dynamic={1}.".format(static,dynamic))
+
+for basis in bases:
+	static = [["zz",J],["+-",J],["-+",J]]
+	dynamic = [["zz",J,drive,[1.0]]]
+	H = hamiltonian(static,dynamic,basis=basis,dtype=np.float64)
+
+	# broken translation symmetry
+	expect_fail([["zz",J[:-1]]],[],basis,check_symm=True)
+	expect_fail([],[["zz",J[:-1],drive,[1.0]]],basis,check_symm=True)
+	# non-hermitian couplings
+	expect_fail([["+-",J]],[],basis,check_herm=True)
+	expect_fail([],[["+-",J,drive,[1.0]]],basis,check_herm=True)
+
+# particle number is not conserved
+basis = spin_basis_general(L,Nup=L//2)
+expect_fail([["+",h]],[],basis,check_pcon=True)
+expect_fail([],[["++",J,drive,[1.0]]],basis,check_pcon=True)
+
+print("operator list checks passed!")
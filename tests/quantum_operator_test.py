@@ -5,7 +5,8 @@ quspin_path = os.path.join(os.getcwd(),"../")
 sys.path.insert(0,quspin_path)
 
 from quspin.operators import quantum_operator,hamiltonian
-from quspin.basis import spin_basis_1d
+from quspin.operators._operator_io import _save_operator,_load_operator
+from quspin.basis import spin_basis_1d,tensor_basis
 import numpy as np
 import scipy.sparse as sp
 
@@ -101,8 +102,91 @@ def eigvalsh_test():
 	assert(np.linalg.norm(E1-E2)/4.0<eps)
 
 
+def fused_test():
+	L = 6
+	basis = spin_basis_1d(L)
+	J = [[1.0,i,(i+1)%L] for i in range(L)]
+	h = [[1.0,i] for i in range(L)]
+	input_dict = {"Jxx":[["xx",J]],"Jzz":[["zz",J]],"hx":[["x",h]],"hz":[["z",h]]}
+	op_dict = quantum_operator(input_dict,basis=basis,dtype=np.float64,check_herm=False,check_symm=False,check_pcon=False)
+	assert(op_dict._get_fused() is None)
+	op_dict.set_fused(True)
+	mats = {key:hamiltonian(static,[],basis=basis,dtype=np.float64,check_herm=False,check_symm=False,check_pcon=False).tocsr() 
+				for key,static in input_dict.items()}
+
+	v = np.random.uniform(-1,1,size=(basis.Ns,3))
+
+	for lam in np.linspace(0,1,5):
+		pars = {"Jxx":lam,"hx":1.0-lam,"hz":0.3j}
+		M = mats["Jxx"]*lam + mats["Jzz"] + mats["hx"]*(1.0-lam) + mats["hz"]*0.3j
+
+		assert(abs(op_dict.tocsr(pars=dict(pars))-M).max()<eps)
+		assert(abs(op_dict.tocsr(pars=dict(pars),copy=False)-M).max()<eps)
+		assert(np.linalg.norm(op_dict.dot(v,pars=dict(pars))-M.dot(v))<eps)
+		assert(np.linalg.norm(op_dict.dot(v[:,0],pars=dict(pars),check=False)-M.dot(v[:,0]))<eps)
+
+	# the buffer is reused between calls.
+	assert(op_dict.tocsr(pars={"Jxx":0.1},copy=False) is op_dict.tocsr(pars={"Jxx":0.2},copy=False))
+	# copies do not carry the explicit zeros of the union pattern.
+	assert(np.all(op_dict.tocsr(pars={"Jxx":0.0}).data != 0))
+	assert(np.all(op_dict.tocsc(pars={"Jxx":0.0}).data != 0))
+
+	H = op_dict.tohamiltonian(pars={"Jxx":0.5,"hx":(np.cos,())})
+	M = mats["Jxx"]*0.5 + mats["Jzz"] + mats["hx"]*np.cos(0.4) + mats["hz"]
+	assert(abs(H.tocsr(time=0.4)-M).max()<eps)
+
+
+def save_load_test():
+	import tempfile,shutil
+	L = 6
+	basis = spin_basis_1d(L)
+	J = [[1.0,i,(i+1)%L] for i in range(L)]
+	h = [[1.0,i] for i in range(L)]
+	input_dict = {"Jxx":[["xx",J]],"Jzz":[["zz",J]],"hx":[["x",h]]}
+	op_dict = quantum_operator(input_dict,basis=basis,dtype=np.float64,check_herm=False,check_symm=False,check_pcon=False)
+
+	v = np.random.uniform(-1,1,size=(basis.Ns,3))
+	pars = {"Jxx":0.3,"hx":-1.2}
+
+	path = tempfile.mkdtemp()
+	try:
+		op_dict.save(path)
+		for mmap in [True,False]:
+			op_load = quantum_operator.load(path,mmap=mmap,basis=basis)
+			assert(op_load.basis is basis)
+			assert(abs(op_load.tocsr(pars=dict(pars))-op_dict.tocsr(pars=dict(pars))).max()<eps)
+			assert(np.linalg.norm(op_load.dot(v,pars=dict(pars))-op_dict.dot(v,pars=dict(pars)))<eps)
+
+		try:
+			hamiltonian.load(path)
+		except TypeError:
+			pass
+		else:
+			raise AssertionError("loading a quantum_operator as hamiltonian did not fail.")
+
+		# keys which are not strings keep their type.
+		M = sp.random(4,4,density=0.5,format="csr")
+		keys = ["J",None,3,("J",1),frozenset([1,2])]
+		_save_operator(path,"quantum_operator",np.float64,M.shape,None,[(key,M) for key in keys])
+		_,static,_ = _load_operator(path,"quantum_operator")
+		assert([key for key,_ in static] == keys)
+
+		# operators in factored form are saved without converting them to csr format.
+		J_half = [[1.0,i,i+1] for i in range(L//2-1)]
+		kron_dict = {"Jxx":[["xx|",J_half],["|xx",J_half]],"Jzz":[["zz|",J_half]],"hx":[["x|",h[:L//2]],["|x",h[:L//2]]]}
+		op_kron = quantum_operator(kron_dict,basis=tensor_basis(spin_basis_1d(L//2),spin_basis_1d(L//2)),
+						dtype=np.float64,check_herm=False,check_symm=False,check_pcon=False,kron=True)
+		op_kron.save(path)
+		assert(op_kron._kron is not None)
+		op_load = quantum_operator.load(path)
+		assert(np.linalg.norm(op_load.dot(v,pars=dict(pars))-op_kron.dot(v,pars=dict(pars)))<eps)
+	finally:
+		shutil.rmtree(path)
+
 
 dot_test()
 eigsh_test()
 eigh_test()
-eigvalsh_test()
\ No newline at end of file
+fused_test()
+eigvalsh_test()
+save_load_test()